@@ -2,7 +2,17 @@ import sys, os
 hpbandster = os.path.abspath(os.path.join(__file__, '..', '..', 'submodules', 'HpBandSter'))
 sys.path.append(hpbandster)
 
-from autoPyTorch.core.autonet_classes import AutoNetClassification, AutoNetMultilabel, AutoNetRegression, AutoNetImageClassification, AutoNetImageClassificationMultipleDatasets
-from autoPyTorch.data_management.data_manager import DataManager
-from autoPyTorch.utils.hyperparameter_search_space_update import HyperparameterSearchSpaceUpdates
-from autoPyTorch.core.ensemble import AutoNetEnsemble
+from autoPyTorch.utils.lazy_import import lazy_import
+
+# heavy dependencies are only imported when the attributes are accessed (PEP 562)
+__all__ = ["AutoNetClassification", "AutoNetMultilabel", "AutoNetRegression", "AutoNetImageClassification", "AutoNetImageClassificationMultipleDatasets", "DataManager", "HyperparameterSearchSpaceUpdates", "AutoNetEnsemble"]
+__getattr__, __dir__ = lazy_import(__name__, {
+    "AutoNetClassification": "autoPyTorch.core.autonet_classes",
+    "AutoNetMultilabel": "autoPyTorch.core.autonet_classes",
+    "AutoNetRegression": "autoPyTorch.core.autonet_classes",
+    "AutoNetImageClassification": "autoPyTorch.core.autonet_classes",
+    "AutoNetImageClassificationMultipleDatasets": "autoPyTorch.core.autonet_classes",
+    "DataManager": "autoPyTorch.data_management.data_manager",
+    "HyperparameterSearchSpaceUpdates": "autoPyTorch.utils.hyperparameter_search_space_update",
+    "AutoNetEnsemble": "autoPyTorch.core.ensemble"
+})
@@ -1,3 +1,15 @@
-from autoPyTorch.components.metrics.balanced_accuracy import balanced_accuracy
-from autoPyTorch.components.metrics.pac_score import pac_metric
-from autoPyTorch.components.metrics.standard_metrics import accuracy, auc_metric, mean_distance, multilabel_accuracy, cross_entropy, top1, top3, top5
+from autoPyTorch.utils.lazy_import import lazy_import
+
+__all__ = ["balanced_accuracy", "pac_metric", "accuracy", "auc_metric", "mean_distance", "multilabel_accuracy", "cross_entropy", "top1", "top3", "top5"]
+__getattr__, __dir__ = lazy_import(__name__, {
+    "balanced_accuracy": "autoPyTorch.components.metrics.balanced_accuracy",
+    "pac_metric": "autoPyTorch.components.metrics.pac_score",
+    "accuracy": "autoPyTorch.components.metrics.standard_metrics",
+    "auc_metric": "autoPyTorch.components.metrics.standard_metrics",
+    "mean_distance": "autoPyTorch.components.metrics.standard_metrics",
+    "multilabel_accuracy": "autoPyTorch.components.metrics.standard_metrics",
+    "cross_entropy": "autoPyTorch.components.metrics.standard_metrics",
+    "top1": "autoPyTorch.components.metrics.standard_metrics",
+    "top3": "autoPyTorch.components.metrics.standard_metrics",
+    "top5": "autoPyTorch.components.metrics.standard_metrics"
+})
@@ -1,5 +1,12 @@
-from autoPyTorch.components.networks.feature.embedding import LearnedEntityEmbedding, NoEmbedding
-from autoPyTorch.components.networks.feature.resnet import ResNet
-from autoPyTorch.components.networks.feature.mlpnet import MlpNet
-from autoPyTorch.components.networks.feature.shapedmlpnet import ShapedMlpNet
-from autoPyTorch.components.networks.feature.shapedresnet import ShapedResNet
\ No newline at end of file
+from autoPyTorch.utils.lazy_import import lazy_import
+
+__all__ = ["LearnedEntityEmbedding", "NoEmbedding", "ResNet", "MlpNet", "ShapedMlpNet", "ShapedResNet", "PackedMlpNet"]
+__getattr__, __dir__ = lazy_import(__name__, {
+    "LearnedEntityEmbedding": "autoPyTorch.components.networks.feature.embedding",
+    "NoEmbedding": "autoPyTorch.components.networks.feature.embedding",
+    "ResNet": "autoPyTorch.components.networks.feature.resnet",
+    "MlpNet": "autoPyTorch.components.networks.feature.mlpnet",
+    "ShapedMlpNet": "autoPyTorch.components.networks.feature.shapedmlpnet",
+    "ShapedResNet": "autoPyTorch.components.networks.feature.shapedresnet",
+    "PackedMlpNet": "autoPyTorch.components.networks.feature.packed_mlpnet"
+})
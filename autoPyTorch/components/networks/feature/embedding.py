@@ -9,6 +9,7 @@ import ConfigSpace.conditions as CSC
 import ConfigSpace.hyperparameters as CSH
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import numpy as np
 
 from autoPyTorch.utils.config_space_hyperparameter import get_hyperparameter, add_hyperparameter
@@ -18,8 +19,22 @@ __author__ = "Max Dippel, Michael Burkart and Matthias Urban"
 __version__ = "0.0.1"
 __license__ = "BSD"
 
+class CodeEmbedding(nn.Linear):
+    """ Entity embedding layer that looks up the rows of the weight matrix by category code.
+    Equivalent to nn.Linear applied to the one-hot encoding of the codes, without materializing it.
+    The parameters are those of nn.Linear, such that the initializers treat both the same. Unknown categories (code num_in) map to the bias."""
+
+    def forward(self, codes):
+        weight = torch.cat([self.weight.t(), self.weight.new_zeros(1, self.out_features)])
+        return F.embedding(codes, weight) + self.bias
+
+
 class LearnedEntityEmbedding(nn.Module):
     """ Parent class for MlpNet, ResNet, ... Can use entity embedding for cagtegorical features"""
+
+    # the one-hot encoding is skipped and the categorical features are passed as category codes
+    uses_category_codes = True
+
     def __init__(self, config, in_features, one_hot_encoder):
         """
         Initialize the BaseFeatureNet.
@@ -33,6 +48,7 @@ class LearnedEntityEmbedding(nn.Module):
         self.config = config
         self.n_feats = in_features
         self.one_hot_encoder = one_hot_encoder
+        self.category_codes = getattr(one_hot_encoder, "category_codes", False)
 
         self.num_numerical = len([f for f in one_hot_encoder.categorical_features if not f])
         self.num_input_features = [len(c) for c in one_hot_encoder.categories_]
@@ -46,6 +62,9 @@ class LearnedEntityEmbedding(nn.Module):
 
 
     def forward(self, x):
+        if self.category_codes:
+            return self._forward_category_codes(x)
+
         # pass the columns of each categorical feature through entity embedding layer
         # before passing it through the model
         concat_seq = []
@@ -54,7 +73,7 @@ class LearnedEntityEmbedding(nn.Module):
         layer_pointer = 0
         for num_in, embed in zip(self.num_input_features, self.embed_features):
             if not embed:
-                x_pointer += 1
+                x_pointer += num_in
                 continue
             if x_pointer > last_concat:
                 concat_seq.append(x[:, last_concat : x_pointer])
@@ -66,6 +85,23 @@ class LearnedEntityEmbedding(nn.Module):
         
         concat_seq.append(x[:, last_concat:])
         return torch.cat(concat_seq, dim=1)
+
+    def _forward_category_codes(self, x):
+        # the first columns contain the codes of the categorical features, one column per feature
+        num_categorical = len(self.num_input_features)
+        # resampling strategies may interpolate between codes
+        codes = torch.round(x[:, :num_categorical]).long()
+        concat_seq = []
+        layer_pointer = 0
+        for i, (num_in, embed) in enumerate(zip(self.num_input_features, self.embed_features)):
+            code = codes[:, i].clamp(0, num_in)
+            if embed:
+                concat_seq.append(self.ee_layers[layer_pointer](code))
+                layer_pointer += 1
+            else:
+                concat_seq.append(F.one_hot(code, num_in + 1)[:, :num_in].to(x.dtype))
+        concat_seq.append(x[:, num_categorical:])
+        return torch.cat(concat_seq, dim=1)
     
     def _create_ee_layers(self, in_features):
         # entity embeding layers are Linear Layers
@@ -73,7 +109,7 @@ class LearnedEntityEmbedding(nn.Module):
          for i, (num_in, embed, num_out) in enumerate(zip(self.num_input_features, self.embed_features, self.num_output_dimensions)):
             if not embed:
                 continue
-            layers.append(nn.Linear(num_in, num_out))
+            layers.append(CodeEmbedding(num_in, num_out) if self.category_codes else nn.Linear(num_in, num_out))
          return layers
 
     @staticmethod
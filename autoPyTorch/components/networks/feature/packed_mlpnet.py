@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Horizontal fusion of several shape-compatible multilayer perceptrons into one batched model.
+"""
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+from autoPyTorch.components.networks.feature.embedding import NoEmbedding
+from autoPyTorch.components.networks.feature.mlpnet import MlpNet
+
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+
+def get_packing_signature(network, batch_size=None):
+    """Compute the signature that decides whether networks can be trained together.
+
+    Networks with equal signatures have the same number of layers, inputs, outputs and the same activation.
+    Their layers can therefore be padded to equal width, stacked and trained with batched matrix multiplications.
+
+    Arguments:
+        network {MlpNet} -- The network to compute the signature for.
+        batch_size {int} -- The batch size used to train the network (default: {None}).
+
+    Returns:
+        tuple -- The signature or None if the network cannot be packed.
+    """
+    if not isinstance(network, MlpNet) or not isinstance(network.embedding, NoEmbedding):
+        return None
+    linear_layers = list()
+    for module in network.layers:
+        if isinstance(module, nn.Linear):
+            linear_layers.append(module)
+        elif not isinstance(module, (nn.Dropout, network.activation)):
+            return None
+    return (len(linear_layers), linear_layers[0].in_features, linear_layers[-1].out_features, network.config["activation"],
+            network.final_activation.__class__.__name__, batch_size)
+
+
+def group_packable_networks(networks, batch_sizes=None, max_pack_size=None, keys=None):
+    """Group networks that can be packed into one PackedMlpNet.
+
+    Arguments:
+        networks {list} -- List of networks.
+        batch_sizes {list} -- The batch size each network is trained with (default: {None}).
+        max_pack_size {int} -- Maximum number of networks in one group (default: {None}).
+        keys {list} -- Only networks with equal keys are grouped, e.g. a fingerprint of their training data.
+            Networks with key None are not grouped (default: {None}).
+
+    Returns:
+        list -- List of lists of indices into networks. Each list is one group.
+    """
+    batch_sizes = batch_sizes or [None] * len(networks)
+    keys = keys or [()] * len(networks)
+    groups = dict()
+    result = list()
+    for i, (network, batch_size, key) in enumerate(zip(networks, batch_sizes, keys)):
+        signature = get_packing_signature(network, batch_size)
+        if signature is None or key is None:
+            result.append([i])
+            continue
+        group = groups.setdefault((signature, key), [])
+        if max_pack_size and len(group) >= max_pack_size:
+            result.append(group)
+            group = groups[(signature, key)] = []
+        group.append(i)
+    return result + [group for group in groups.values() if group]
+
+
+class PackedMlpNet(nn.Module):
+    """Trains several shape-compatible MlpNets at once.
+
+    The parameters stay owned by the packed networks, which allows each of them to have its own
+    optimizer. In every forward pass the weights of each layer are zero-padded to the widest network, stacked and applied with
+    a single batched matrix multiplication. Padded units only meet zero weights in the next layer, so they do not change
+    the outputs or the gradients. The output has shape (num_networks, batch_size, out_features).
+    """
+
+    def __init__(self, networks):
+        """Initialize the packed network.
+
+        Arguments:
+            networks {list} -- List of MlpNets with equal packing signature.
+        """
+        super(PackedMlpNet, self).__init__()
+        signatures = set(get_packing_signature(network) for network in networks)
+        if len(signatures) != 1 or None in signatures:
+            raise ValueError("Only networks with equal number of layers, inputs, outputs and activation can be packed.")
+        self.networks = nn.ModuleList(networks)
+        self.num_networks = len(networks)
+        self.activation = networks[0].activation()
+        self.final_activation = networks[0].final_activation
+        self.linear_layers = [[m for m in network.layers if isinstance(m, nn.Linear)] for network in networks]
+        self.widths = [max(layers[i].out_features for layers in self.linear_layers) for i in range(len(self.linear_layers[0]))]
+
+        # dropout probability of each hidden layer in each network
+        dropout = [[m.p for m in network.layers if isinstance(m, nn.Dropout)] for network in networks]
+        num_hidden = len(self.linear_layers[0]) - 1
+        dropout = [d if d else [0] * num_hidden for d in dropout]
+        self.register_buffer("dropout", torch.tensor(dropout, dtype=torch.float).t().reshape(num_hidden, self.num_networks, 1, 1))
+
+    def forward(self, x):
+        x = x.unsqueeze(0).expand(self.num_networks, -1, -1)
+        num_layers = len(self.linear_layers[0])
+        for i in range(num_layers):
+            width, in_width = self.widths[i], x.size(2)
+            weight = torch.stack([self._pad(layers[i].weight, width, in_width) for layers in self.linear_layers])
+            bias = torch.stack([F.pad(layers[i].bias, (0, width - layers[i].out_features)) for layers in self.linear_layers]).unsqueeze(1)
+            x = torch.baddbmm(bias, x, weight.transpose(1, 2))
+            if i < num_layers - 1:
+                x = self.activation(x)
+                x = self._dropout(x, self.dropout[i])
+
+        if not self.training and self.final_activation is not None:
+            x = torch.stack([self.final_activation(output) for output in x])
+        return x
+
+    def _pad(self, weight, rows, columns):
+        if weight.shape == (rows, columns):
+            return weight
+        return F.pad(weight, (0, columns - weight.size(1), 0, rows - weight.size(0)))
+
+    def _dropout(self, x, p):
+        if not self.training or not (p > 0).any():
+            return x
+        keep = 1 - p
+        mask = (torch.rand_like(x) < keep).to(x.dtype)
+        return x * mask / keep.clamp(min=1e-7)
@@ -1,4 +1,9 @@
-from autoPyTorch.components.networks.image.convnet import ConvNet
-from autoPyTorch.components.networks.image.densenet import DenseNet
-from autoPyTorch.components.networks.image.resnet import ResNet
-from autoPyTorch.components.networks.image.mobilenet import MobileNet
+from autoPyTorch.utils.lazy_import import lazy_import
+
+__all__ = ["ConvNet", "DenseNet", "ResNet", "MobileNet"]
+__getattr__, __dir__ = lazy_import(__name__, {
+    "ConvNet": "autoPyTorch.components.networks.image.convnet",
+    "DenseNet": "autoPyTorch.components.networks.image.densenet",
+    "ResNet": "autoPyTorch.components.networks.image.resnet",
+    "MobileNet": "autoPyTorch.components.networks.image.mobilenet"
+})
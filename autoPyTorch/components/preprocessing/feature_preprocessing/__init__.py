@@ -1,8 +1,13 @@
-from autoPyTorch.components.preprocessing.feature_preprocessing.truncated_svd import TruncatedSVD
-from autoPyTorch.components.preprocessing.feature_preprocessing.fast_ica import FastICA
-from autoPyTorch.components.preprocessing.feature_preprocessing.polynomial_features import PolynomialFeatures
-from autoPyTorch.components.preprocessing.feature_preprocessing.kitchen_sinks import RandomKitchenSinks
-from autoPyTorch.components.preprocessing.feature_preprocessing.kernel_pca import KernelPCA
-from autoPyTorch.components.preprocessing.feature_preprocessing.nystroem import Nystroem
-from autoPyTorch.components.preprocessing.preprocessor_base import PreprocessorBase
-from autoPyTorch.components.preprocessing.feature_preprocessing.power_transformer import PowerTransformer
\ No newline at end of file
+from autoPyTorch.utils.lazy_import import lazy_import
+
+__all__ = ["TruncatedSVD", "FastICA", "PolynomialFeatures", "RandomKitchenSinks", "KernelPCA", "Nystroem", "PreprocessorBase", "PowerTransformer"]
+__getattr__, __dir__ = lazy_import(__name__, {
+    "TruncatedSVD": "autoPyTorch.components.preprocessing.feature_preprocessing.truncated_svd",
+    "FastICA": "autoPyTorch.components.preprocessing.feature_preprocessing.fast_ica",
+    "PolynomialFeatures": "autoPyTorch.components.preprocessing.feature_preprocessing.polynomial_features",
+    "RandomKitchenSinks": "autoPyTorch.components.preprocessing.feature_preprocessing.kitchen_sinks",
+    "KernelPCA": "autoPyTorch.components.preprocessing.feature_preprocessing.kernel_pca",
+    "Nystroem": "autoPyTorch.components.preprocessing.feature_preprocessing.nystroem",
+    "PreprocessorBase": "autoPyTorch.components.preprocessing.preprocessor_base",
+    "PowerTransformer": "autoPyTorch.components.preprocessing.feature_preprocessing.power_transformer"
+})
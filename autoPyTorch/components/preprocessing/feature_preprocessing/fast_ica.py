@@ -10,6 +10,9 @@ from autoPyTorch.components.preprocessing.preprocessor_base import PreprocessorB
 
 
 class FastICA(PreprocessorBase):
+    supports_sparse = False
+    fit_cost_exponent = 1
+
     def __init__(self, hyperparameter_config):
         self.algorithm = hyperparameter_config['algorithm']
         self.whiten = hyperparameter_config['whiten']
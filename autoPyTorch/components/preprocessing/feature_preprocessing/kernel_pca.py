@@ -11,6 +11,9 @@ from autoPyTorch.components.preprocessing.preprocessor_base import PreprocessorB
 
 
 class KernelPCA(PreprocessorBase):
+    # the kernel matrix is quadratic in the number of samples
+    fit_cost_exponent = 2
+
     def __init__(self, hyperparameter_config):
         self.n_components = int(hyperparameter_config['n_components'])
         self.kernel = hyperparameter_config['kernel']
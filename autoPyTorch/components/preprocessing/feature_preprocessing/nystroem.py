@@ -9,6 +9,8 @@ from autoPyTorch.components.preprocessing.preprocessor_base import PreprocessorB
 
 
 class Nystroem(PreprocessorBase):
+    fit_cost_exponent = 1
+
     def __init__(self, hyperparameter_config):
         self.kernel = hyperparameter_config['kernel']
         self.n_components = int(hyperparameter_config['n_components'])
@@ -11,6 +11,9 @@ from autoPyTorch.components.preprocessing.preprocessor_base import PreprocessorB
 
 
 class PowerTransformer(PreprocessorBase):
+    supports_sparse = False
+    fit_cost_exponent = 1
+
     def __init__(self, hyperparameter_config):
         self.preprocessor = None
         self.method = hyperparameter_config["method"] if "method" in hyperparameter_config else "yeo-johnson"
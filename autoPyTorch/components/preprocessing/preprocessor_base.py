@@ -1,6 +1,13 @@
 import ConfigSpace
 
 class PreprocessorBase():
+    # whether fit and transform accept sparse feature matrices. Otherwise, sparse data is densified first.
+    supports_sparse = True
+
+    # the cost of fitting grows with num_samples ** fit_cost_exponent. Expensive preprocessors are fit on a subsample of the data.
+    # None: cheap to fit, always fit on all samples.
+    fit_cost_exponent = None
+
     def __init__(self, hyperparameter_config):
         pass
 
@@ -1,7 +1,12 @@
-from autoPyTorch.components.preprocessing.resampling.random import (RandomOverSamplingWithReplacement,
-                                                                RandomUnderSamplingWithReplacement)
-from autoPyTorch.components.preprocessing.resampling.smote import SMOTE
-from autoPyTorch.components.preprocessing.resampling.target_size_strategies import (TargetSizeStrategyAverageSample,
-                                                                                TargetSizeStrategyDownsample,
-                                                                                TargetSizeStrategyMedianSample,
-                                                                                TargetSizeStrategyUpsample)
\ No newline at end of file
+from autoPyTorch.utils.lazy_import import lazy_import
+
+__all__ = ["RandomOverSamplingWithReplacement", "RandomUnderSamplingWithReplacement", "SMOTE", "TargetSizeStrategyAverageSample", "TargetSizeStrategyDownsample", "TargetSizeStrategyMedianSample", "TargetSizeStrategyUpsample"]
+__getattr__, __dir__ = lazy_import(__name__, {
+    "RandomOverSamplingWithReplacement": "autoPyTorch.components.preprocessing.resampling.random",
+    "RandomUnderSamplingWithReplacement": "autoPyTorch.components.preprocessing.resampling.random",
+    "SMOTE": "autoPyTorch.components.preprocessing.resampling.smote",
+    "TargetSizeStrategyAverageSample": "autoPyTorch.components.preprocessing.resampling.target_size_strategies",
+    "TargetSizeStrategyDownsample": "autoPyTorch.components.preprocessing.resampling.target_size_strategies",
+    "TargetSizeStrategyMedianSample": "autoPyTorch.components.preprocessing.resampling.target_size_strategies",
+    "TargetSizeStrategyUpsample": "autoPyTorch.components.preprocessing.resampling.target_size_strategies"
+})
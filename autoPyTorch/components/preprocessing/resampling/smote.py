@@ -2,16 +2,49 @@ from autoPyTorch.components.preprocessing.resampling_base import ResamplingMetho
 from autoPyTorch.utils.config_space_hyperparameter import add_hyperparameter, get_hyperparameter
 import ConfigSpace
 import ConfigSpace.hyperparameters as CSH
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+import numpy as np
+import scipy.sparse
 
 class SMOTE(ResamplingMethodBase):
+    # number of synthetic samples generated at once
+    chunk_size = 65536
+
+    # approximate neighbours are searched among a random subset of this many samples of the class
+    approximate_reference_size = 10000
+
     def __init__(self, hyperparameter_config):
         self.k_neighbors = hyperparameter_config["k_neighbors"]
 
     def resample(self, X, y, target_size_strategy, seed):
-        from imblearn.over_sampling import SMOTE as imblearn_SMOTE
-        k_neighbors = self.k_neighbors
-        resampler = imblearn_SMOTE(sampling_strategy=target_size_strategy, k_neighbors=k_neighbors, random_state=seed)
-        return resampler.fit_resample(X, y)
+        if scipy.sparse.issparse(X):
+            from imblearn.over_sampling import SMOTE as imblearn_SMOTE
+            resampler = imblearn_SMOTE(sampling_strategy=target_size_strategy, k_neighbors=self.k_neighbors, random_state=seed)
+            return resampler.fit_resample(X, y)
+
+        random = np.random.RandomState(seed)
+        X_resampled, y_resampled = [X], [y]
+        for target, target_size in sorted(target_size_strategy.items()):
+            X_class = np.ascontiguousarray(X[y == target])
+            num_samples = target_size - X_class.shape[0]
+            if num_samples <= 0:
+                continue
+            if X_class.shape[0] < 2:
+                raise ValueError("SMOTE needs at least two samples of class %s" % str(target))
+            k_neighbors = min(self.k_neighbors, X_class.shape[0] - 1)
+            neighbors = neighbors_cache.get(X_class, k_neighbors, self.approximate_neighbors, n_jobs=self.n_jobs, directory=self.cache_dir)
+
+            for start in range(0, num_samples, self.chunk_size):
+                chunk_size = min(self.chunk_size, num_samples - start)
+                samples = random.randint(0, X_class.shape[0], size=chunk_size)
+                sample_neighbors = neighbors[samples, random.randint(0, k_neighbors, size=chunk_size)]
+                steps = random.uniform(size=(chunk_size, 1)).astype(X_class.dtype, copy=False)
+                X_resampled.append(X_class[samples] + steps * (X_class[sample_neighbors] - X_class[samples]))
+                y_resampled.append(np.full(chunk_size, target, dtype=y.dtype))
+        return np.concatenate(X_resampled), np.concatenate(y_resampled)
 
     @staticmethod
     def get_hyperparameter_search_space(
@@ -20,4 +53,109 @@ class SMOTE(ResamplingMethodBase):
         k_neighbors = get_hyperparameter(CSH.UniformIntegerHyperparameter, "k_neighbors", k_neighbors)
         cs = ConfigSpace.ConfigurationSpace()
         cs.add_hyperparameter(k_neighbors)
-        return cs
\ No newline at end of file
+        return cs
+
+
+class NeighborsCache():
+    """Cache of the nearest neighbours of the samples of a class.
+
+    The cache is keyed by the content of the samples, such that the neighbours of a split and class are computed once and
+    reused by all configurations with the same preprocessing, regardless of k_neighbors and the target size.
+    Evaluations in other processes, e.g. with pynisher, share the neighbours through files in a directory.
+    """
+
+    def __init__(self, max_entries=8, min_neighbors=10):
+        self.neighbors = OrderedDict()
+        self.max_entries = max_entries
+        self.min_neighbors = min_neighbors  # compute at least this many neighbours, to serve other values of k_neighbors
+
+    def get(self, X, k_neighbors, approximate=False, n_jobs=None, directory=None):
+        """Get the nearest neighbours of each sample, excluding the sample itself.
+
+        Arguments:
+            X {array} -- The samples of a class.
+            k_neighbors {int} -- The number of neighbours.
+
+        Keyword Arguments:
+            approximate {bool} -- Search the neighbours among a random subset of the samples. (default: {False})
+            n_jobs {int} -- The number of threads of the search. None for the number of processors. (default: {None})
+            directory {str} -- Directory where the neighbours are shared with other processes. (default: {None})
+
+        Returns:
+            array -- Indices of the neighbours, sorted by distance. Shape (num_samples, k_neighbors).
+        """
+        content_hash = hashlib.sha256(X.data)
+        content_hash.update(str((X.dtype, X.shape)).encode())
+        key = (content_hash.hexdigest(), approximate)
+        if key in self.neighbors and self.neighbors[key].shape[1] >= k_neighbors:
+            self.neighbors.move_to_end(key)
+            return self.neighbors[key][:, :k_neighbors]
+
+        filename = None if directory is None else os.path.join(directory, "neighbors_%s_%d.npy" % key)
+        neighbors = load_neighbors(filename)
+        if neighbors is None or neighbors.shape[1] < k_neighbors:
+            reference_size = SMOTE.approximate_reference_size if approximate else None
+            num_neighbors = max(k_neighbors, min(self.min_neighbors, X.shape[0] - 1, (reference_size or X.shape[0]) - 1))
+            neighbors = compute_neighbors(X, num_neighbors, reference_size, n_jobs=n_jobs)
+            save_neighbors(neighbors, filename)
+        self.neighbors[key] = neighbors
+        self.neighbors.move_to_end(key)
+        while len(self.neighbors) > self.max_entries:
+            self.neighbors.popitem(last=False)
+        return self.neighbors[key][:, :k_neighbors]
+
+
+def compute_neighbors(X, k_neighbors, reference_size=None, n_jobs=None):
+    """Compute the nearest neighbours of each sample, excluding the sample itself.
+
+    Arguments:
+        X {array} -- The samples.
+        k_neighbors {int} -- The number of neighbours.
+
+    Keyword Arguments:
+        reference_size {int} -- Search the neighbours among a random subset of this many samples. None for exact neighbours. (default: {None})
+        n_jobs {int} -- The number of threads of the search. None for the number of processors. (default: {None})
+
+    Returns:
+        array -- Indices of the neighbours, sorted by distance. Shape (num_samples, k_neighbors).
+    """
+    from sklearn.neighbors import NearestNeighbors
+    reference = np.arange(X.shape[0])
+    if reference_size is not None and reference_size <= k_neighbors:
+        raise ValueError("The reference set must be larger than the number of neighbours")
+    if reference_size is not None and reference_size < X.shape[0]:
+        # fixed seed: the neighbours do not depend on the configuration and can be cached
+        reference = np.sort(np.random.RandomState(0).choice(X.shape[0], reference_size, replace=False))
+
+    nearest_neighbors = NearestNeighbors(n_neighbors=k_neighbors + 1, n_jobs=n_jobs or -1).fit(X[reference])
+    neighbors = reference[nearest_neighbors.kneighbors(X, return_distance=False)]
+
+    # drop each sample from its own neighbours. Samples not in the reference set drop their farthest neighbour.
+    is_self = neighbors == np.arange(X.shape[0])[:, np.newaxis]
+    is_self[~np.any(is_self, axis=1), -1] = True
+    return neighbors[~is_self].reshape(X.shape[0], k_neighbors)
+
+
+def load_neighbors(filename):
+    """Load the neighbours stored by another process, memory-mapped. Returns None, if there are none."""
+    if filename is None:
+        return None
+    try:
+        return np.load(filename, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+
+def save_neighbors(neighbors, filename):
+    """Store the neighbours for other processes. The file is replaced atomically, such that readers never see partial neighbours."""
+    if filename is None:
+        return
+    try:
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(filename), suffix=".tmp", delete=False) as f:
+            np.save(f, neighbors)
+        os.replace(f.name, filename)
+    except OSError:
+        pass  # the neighbours are not shared, e.g. because the directory has been removed
+
+
+neighbors_cache = NeighborsCache()
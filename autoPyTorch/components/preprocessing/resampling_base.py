@@ -25,6 +25,13 @@ class TargetSizeStrategyBase():
 
 
 class ResamplingMethodBase():
+    # methods based on nearest neighbours may search approximate neighbours, set by the ResamplingStrategySelector
+    approximate_neighbors = False
+    # number of threads of the nearest neighbour search, set by the ResamplingStrategySelector. None for the number of processors.
+    n_jobs = None
+    # directory where expensive intermediate results are shared between evaluations, set by the ResamplingStrategySelector
+    cache_dir = None
+
     def __init__(self, hyperparameter_config):
         pass
 
@@ -1,4 +1,8 @@
 from autoPyTorch.components.training.base_training import BaseTrainingTechnique
+from autoPyTorch.utils.config.config_option import ConfigOption
+import numpy as np
+import scipy.sparse
+import math
 import time
 
 class BudgetTypeTime(BaseTrainingTechnique):
@@ -77,3 +81,128 @@ class BudgetTypeTrainingTime(BaseTrainingTechnique):
             trainer.logger.debug("Budget exhausted!")
             return True
         return False
+
+class BudgetTypeSteps(BaseTrainingTechnique):
+    """The budget is the number of optimizer steps (mini-batches)."""
+    # 0 means the budgets are derived from the dataset size, see get_default_budgets
+    default_min_budget = 0
+    default_max_budget = 0
+
+    # OVERRIDE
+    def set_up(self, trainer, pipeline_config, **kwargs):
+        super(BudgetTypeSteps, self).set_up(trainer, pipeline_config)
+        self.target = trainer.budget
+        # continue counting, if the model has been trained before
+        self.steps = trainer.model.budget_trained
+
+    # OVERRIDE
+    def on_batch_end(self, trainer, **kwargs):
+        self.steps += 1
+        trainer.model.budget_trained = self.steps
+        return self.steps >= self.target
+
+    # OVERRIDE
+    def on_epoch_end(self, trainer, **kwargs):
+        trainer.logger.debug("Budget used: " + str(self.steps) + "/" + str(self.target))
+
+        if self.steps >= self.target:
+            trainer.logger.debug("Budget exhausted!")
+            return True
+        return False
+
+    @staticmethod
+    def get_pipeline_config_options():
+        options = [
+            ConfigOption("steps_min_budget_epochs", default=0.1, type=float,
+                info="If budget type is steps and no min_budget is given, it is set to the steps of this many epochs."),
+            ConfigOption("steps_max_budget_epochs", default=5, type=float,
+                info="If budget type is steps and no max_budget is given, it is set to the steps of this many epochs."),
+            ConfigOption("steps_reference_batch_size", default=128, type=int,
+                info="Batch size used to convert epochs to steps when deriving the default budgets for budget type steps.")
+        ]
+        return options
+
+    @staticmethod
+    def get_default_budgets(pipeline_config, num_train_samples):
+        """Derive min and max budget from the number of training samples.
+        
+        Arguments:
+            pipeline_config {dict} -- The configuration of the pipeline.
+            num_train_samples {int} -- The number of samples used for training.
+        
+        Returns:
+            tuple -- min budget and max budget
+        """
+        steps_per_epoch = max(1, math.ceil(num_train_samples / pipeline_config["steps_reference_batch_size"]))
+        min_budget = max(1, round(pipeline_config["steps_min_budget_epochs"] * steps_per_epoch))
+        max_budget = max(min_budget, round(pipeline_config["steps_max_budget_epochs"] * steps_per_epoch))
+        return min_budget, max_budget
+
+class BudgetTypeDataFraction(BaseTrainingTechnique):
+    """The budget is the fraction of the training data used for training.
+    The subsamples are nested: the subsample of a larger budget contains the subsample of any smaller budget."""
+    default_min_budget = 0.01
+    default_max_budget = 1
+
+    # OVERRIDE
+    def set_up(self, trainer, pipeline_config, **kwargs):
+        super(BudgetTypeDataFraction, self).set_up(trainer, pipeline_config)
+        self.max_epochs = pipeline_config["data_fraction_max_epochs"]
+
+    # OVERRIDE
+    def on_epoch_end(self, trainer, epoch, **kwargs):
+        trainer.model.budget_trained = trainer.budget
+        trainer.logger.debug("Epochs trained on " + str(trainer.budget) + " of the data: " + str(epoch) + "/" + str(self.max_epochs))
+
+        if epoch >= self.max_epochs:
+            trainer.logger.debug("Budget exhausted!")
+            return True
+        return False
+
+    @staticmethod
+    def get_pipeline_config_options():
+        options = [
+            ConfigOption("data_fraction_max_epochs", default=25, type=int,
+                info="Number of epochs to train on the subsample, if budget type is data_fraction.")
+        ]
+        return options
+
+    @staticmethod
+    def get_nested_subsample(indices, Y, fraction, seed):
+        """Get a stratified subsample of the given indices.
+        For a fixed seed, the subsamples of increasing fractions are nested.
+
+        Arguments:
+            indices {array} -- The indices to subsample from.
+            Y {array} -- The targets. Used for stratification if they look like class labels.
+            fraction {float} -- The fraction of indices to keep.
+            seed {int} -- A random seed.
+
+        Returns:
+            array -- The sorted subsample of indices.
+        """
+        indices = np.asarray(indices)
+        if fraction >= 1:
+            return indices
+
+        labels = Y[indices]
+        if scipy.sparse.issparse(labels):
+            labels = labels.toarray()
+        labels = np.asarray(labels)
+        if labels.ndim == 2 and labels.shape[1] > 1:
+            labels = labels.argmax(axis=1)
+        labels = labels.reshape(-1)
+
+        # only stratify if targets are class labels
+        classes = np.unique(labels)
+        is_discrete = np.issubdtype(labels.dtype, np.integer) or np.all(np.mod(labels, 1) == 0)
+        if not is_discrete or len(classes) > max(2, math.sqrt(len(labels))):
+            classes, labels = [0], np.zeros(len(labels))
+
+        rng = np.random.RandomState(seed)
+        subsample = list()
+        for c in classes:
+            members = indices[labels == c]
+            permutation = rng.permutation(len(members))
+            subsample.append(members[permutation[:int(math.ceil(fraction * len(members)))]])
+        return np.sort(np.concatenate(subsample))
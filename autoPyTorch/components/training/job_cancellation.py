@@ -0,0 +1,65 @@
+import os
+import time
+
+from autoPyTorch.components.training.base_training import BaseTrainingTechnique
+
+class JobCancellation(BaseTrainingTechnique):
+    """ Stop training at the next batch, when the optimization algorithm reached its runtime limit.
+    The master signals the cancellation by creating a file, such that workers on other hosts and
+    training processes forked by pynisher see it as well. The training is wrapped up as usual and the
+    partial learning curve is reported. Single jobs can be cancelled as well, e.g. based on their streamed learning curves.
+    """
+    check_interval = 1
+
+    def __init__(self, hyperparameter_config_id=None, training_components=None):
+        """Initialize the technique.
+
+        Keyword Arguments:
+            hyperparameter_config_id {tuple} -- The id of the trained configuration, to be able to cancel this job only (default: {None})
+            training_components {dict} -- See BaseTrainingTechnique (default: {None})
+        """
+        super(JobCancellation, self).__init__(training_components=training_components)
+        self.hyperparameter_config_id = hyperparameter_config_id
+
+    # OVERRIDE
+    def set_up(self, trainer, pipeline_config, **kwargs):
+        super(JobCancellation, self).set_up(trainer, pipeline_config)
+        self.cancel_files = [get_job_cancel_file(pipeline_config)]
+        if self.hyperparameter_config_id is not None:
+            self.cancel_files.append(get_job_cancel_file(pipeline_config, self.hyperparameter_config_id))
+        self.last_check = 0
+        trainer.model.training_cancelled = False
+
+    # OVERRIDE
+    def on_batch_end(self, trainer, **kwargs):
+        # do not hit the file system after every batch
+        if time.time() - self.last_check < self.check_interval:
+            return False
+        self.last_check = time.time()
+
+        if any(f is not None and os.path.exists(f) for f in self.cancel_files):
+            trainer.logger.info("Job has been cancelled by the optimization algorithm. Stop training.")
+            trainer.model.training_cancelled = True
+        return trainer.model.training_cancelled
+
+    # OVERRIDE
+    def on_epoch_end(self, trainer, **kwargs):
+        return trainer.model.training_cancelled
+
+
+def get_job_cancel_file(pipeline_config, hyperparameter_config_id=None):
+    """Get the file whose existence signals to cancel all running jobs of the run, or the jobs of the given configuration.
+    None, if there is no optimization run."""
+    if "working_dir" not in pipeline_config or "run_id" not in pipeline_config:
+        return None
+    filename = "cancel_jobs_" + str(pipeline_config["run_id"])
+    if hyperparameter_config_id is not None:
+        filename += "_" + "_".join(map(str, hyperparameter_config_id))
+    return os.path.abspath(os.path.join(pipeline_config["working_dir"], filename))
+
+
+def is_partial_result(result):
+    """Whether training has been cancelled for the given result of an evaluation."""
+    infos = result.get("info") if isinstance(result, dict) else None
+    infos = infos if isinstance(infos, list) else [infos]
+    return any(isinstance(info, dict) and info.get("partial", False) for info in infos)
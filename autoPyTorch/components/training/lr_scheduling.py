@@ -10,9 +10,18 @@ class LrScheduling(BaseTrainingTechnique):
         self.lr_step_after_batch = lr_step_after_batch
         self.lr_step_with_time = lr_step_with_time
         self.allow_snapshot = allow_snapshot
+        self.fractional_epochs = False
+        self.epoch_fraction = 1
+
+    # OVERRIDE
+    def set_up(self, trainer, pipeline_config, **kwargs):
+        super(LrScheduling, self).set_up(trainer, pipeline_config)
+        # with a step budget, the last epoch might be stopped before all batches have been processed
+        self.fractional_epochs = pipeline_config.get("budget_type") == "steps"
 
     # OVERRIDE
     def on_batch_end(self, batch_loss, trainer, epoch, step, num_steps, **kwargs):
+        self.epoch_fraction = (step + 1) / num_steps
         if not self.lr_step_after_batch:
             return
 
@@ -36,6 +45,8 @@ class LrScheduling(BaseTrainingTechnique):
             else:
                 log["lr_scheduler_converged"] = self.perform_scheduling(trainer, time.time() - trainer.fit_start_time, log['loss'])
         else:
+            if self.fractional_epochs and self.epoch_fraction < 1:
+                epoch = epoch - 1 + self.epoch_fraction
             if isinstance(log['loss'], list):
                 log["lr_scheduler_converged"]  = self.perform_scheduling(trainer, epoch, log['loss'][-1])
             else:
@@ -0,0 +1,283 @@
+import hashlib
+import threading
+
+import numpy as np
+import torch
+from torch.utils.data import TensorDataset
+from torch.utils.data.dataset import Subset
+
+from autoPyTorch.components.networks.feature.packed_mlpnet import PackedMlpNet, group_packable_networks
+
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+
+class PackedJob(object):
+    """The training of a single configuration that may be packed with other configurations."""
+
+    def __init__(self, trainer, train_loader, valid_loader, log_epoch, epoch=0):
+        """Initialize the job.
+
+        Arguments:
+            trainer {Trainer} -- The prepared trainer of the configuration.
+            train_loader {DataLoader} -- Data for training.
+            valid_loader {DataLoader} -- Data for validation.
+            log_epoch {function} -- Called with trainer, log, epoch, optimize_metric_results, train_loss, valid_metric_results
+                and stop_training after each epoch. Returns the log of the next epoch and whether to stop training, see TrainNode.log_epoch.
+
+        Keyword Arguments:
+            epoch {int} -- The epoch to start with (default: {0})
+        """
+        self.trainer = trainer
+        self.train_loader = train_loader
+        self.valid_loader = valid_loader
+        self.log_epoch = log_epoch
+        self.epoch = epoch
+        self.log = dict()
+        self.data_fingerprint = get_data_fingerprint(train_loader, valid_loader)
+
+        self.group = None
+        self.done = False
+        self.exception = None
+
+
+class PackedEvaluation(object):
+    """Trains the configurations of jobs that are evaluated at the same time together.
+
+    Each job calls either train or leave exactly once. As soon as all jobs did, the jobs that called train are grouped
+    by the shape of their network, batch size and training data. Each group of more than one job is trained
+    by the thread of its first job with a PackedTrainer, while the threads of the other jobs wait for the result.
+    """
+
+    def __init__(self, num_jobs, max_pack_size=None):
+        """Initialize the packed evaluation.
+
+        Arguments:
+            num_jobs {int} -- The number of jobs evaluated at the same time.
+
+        Keyword Arguments:
+            max_pack_size {int} -- Maximum number of configurations trained together (default: {None})
+        """
+        self.num_pending = num_jobs
+        self.max_pack_size = max_pack_size
+        self.jobs = list()
+        self.condition = threading.Condition()
+
+    def train(self, job):
+        """Wait for the other jobs and train the job packed with compatible ones.
+
+        Arguments:
+            job {PackedJob} -- The job to train.
+
+        Returns:
+            bool -- Whether the job has been trained. If not, no compatible job has been found and it has to be trained separately.
+        """
+        with self.condition:
+            self.jobs.append(job)
+            self._arrive()
+            while job.group is None:
+                self.condition.wait()
+
+        if len(job.group) == 1:
+            return False
+
+        if job.group[0] is job:
+            try:
+                PackedTrainer(job.group).fit(job.train_loader, job.valid_loader)
+            except Exception as e:
+                for other in job.group:
+                    other.exception = e
+            finally:
+                with self.condition:
+                    for other in job.group:
+                        other.done = True
+                    self.condition.notify_all()
+        else:
+            with self.condition:
+                while not job.done:
+                    self.condition.wait()
+
+        if job.exception is not None:
+            raise job.exception
+        return True
+
+    def leave(self):
+        """Notify that a job will not be trained packed, e.g. because its configuration cannot be packed or it failed before training."""
+        with self.condition:
+            self._arrive()
+
+    def _arrive(self):
+        self.num_pending -= 1
+        if self.num_pending > 0:
+            return
+        groups = group_packable_networks(networks=[job.trainer.model for job in self.jobs],
+            batch_sizes=[job.train_loader.batch_size for job in self.jobs],
+            max_pack_size=self.max_pack_size, keys=[job.data_fingerprint for job in self.jobs])
+        for group in groups:
+            group = [self.jobs[i] for i in group]
+            for job in group:
+                job.group = group
+        self.condition.notify_all()
+
+
+class PackedTrainer(object):
+    """Train several shape-compatible configurations at once on the same data batches.
+
+    Each configuration keeps its own Trainer with network, optimizer, training techniques and learning curve.
+    Only the forward and backward pass are fused, see PackedMlpNet.
+    """
+
+    def __init__(self, jobs):
+        """Initialize the trainer.
+
+        Arguments:
+            jobs {list} -- The PackedJobs to train. Their networks must have equal packing signatures.
+        """
+        self.jobs = jobs
+        self.device = jobs[0].trainer.device
+
+    def train(self, jobs, train_loader):
+        """Train the networks of the jobs for a single epoch.
+
+        Arguments:
+            jobs {list} -- The jobs to train.
+            train_loader {DataLoader} -- The data loader shared by all jobs.
+
+        Returns:
+            list -- Tuple (metric results, loss, stop training) for each job.
+        """
+        trainers = [job.trainer for job in jobs]
+        model = PackedMlpNet([trainer.model for trainer in trainers]).to(self.device)
+        model.train()
+
+        loss_sums = np.zeros(len(jobs))
+        N = np.zeros(len(jobs))
+        outputs_data = [list() for _ in jobs]
+        targets_data = [list() for _ in jobs]
+        running = [True] * len(jobs)
+
+        for step, (data, targets) in enumerate(train_loader):
+            data = data.to(self.device)
+            targets = targets.to(self.device)
+            batch_size = data.size(0)
+
+            criterions = list()
+            for job, trainer, is_running in zip(jobs, trainers, running):
+                _, criterion_kwargs = trainer.loss_computation.prepare_data(data, targets)
+                criterions.append(trainer.loss_computation.criterion(**criterion_kwargs))
+                if is_running:
+                    for t in trainer.training_techniques:
+                        t.on_batch_start(trainer=trainer, epoch=job.epoch + 1, step=step, num_steps=len(train_loader))
+                    trainer.optimizer.zero_grad()
+
+            # the loss of one network only depends on its own parameters, so the gradient of the sum is exact
+            outputs = model(data)
+            losses = [criterion(trainer.criterion, output) for criterion, trainer, output in zip(criterions, trainers, outputs)]
+            sum(loss for loss, is_running in zip(losses, running) if is_running).backward()
+
+            for i, (job, trainer) in enumerate(zip(jobs, trainers)):
+                if not running[i]:
+                    continue
+                trainer.optimizer.step()
+
+                output = outputs[i].detach()
+                if trainer.model.final_activation is not None:
+                    output = trainer.model.final_activation(output)
+                outputs_data[i].append(output.cpu().numpy())
+                targets_data[i].append(targets.cpu().numpy())
+                loss_sums[i] += losses[i].item() * batch_size
+                N[i] += batch_size
+
+                if any([t.on_batch_end(batch_loss=losses[i].item(), trainer=trainer, epoch=job.epoch + 1, step=step, num_steps=len(train_loader))
+                        for t in trainer.training_techniques]):
+                    running[i] = False
+
+            if not any(running):
+                break
+
+        return [(trainer.compute_metrics(outputs_data[i], targets_data[i]), loss_sums[i] / N[i], not running[i])
+                for i, trainer in enumerate(trainers)]
+
+    def evaluate(self, jobs, test_loader):
+        """Evaluate the networks of the jobs.
+
+        Arguments:
+            jobs {list} -- The jobs to evaluate.
+            test_loader {DataLoader} -- The data to evaluate on.
+
+        Returns:
+            list -- The metric results of each job.
+        """
+        trainers = [job.trainer for job in jobs]
+        model = PackedMlpNet([trainer.model for trainer in trainers]).to(self.device)
+        model.eval()
+        outputs_data = [list() for _ in jobs]
+        targets_data = list()
+
+        with torch.no_grad():
+            for data, targets in test_loader:
+                outputs = model(data.to(self.device))
+                for i, output in enumerate(outputs):
+                    outputs_data[i].append(output.cpu().numpy())
+                targets_data.append(targets.cpu().numpy())
+
+        model.train()
+        return [trainer.compute_metrics(outputs, targets_data) for trainer, outputs in zip(trainers, outputs_data)]
+
+    def fit(self, train_loader, valid_loader):
+        """Train all jobs until their training techniques stop them, e.g. when their budget is reached.
+
+        Arguments:
+            train_loader {DataLoader} -- The data loader shared by all jobs.
+            valid_loader {DataLoader} -- The validation data or None.
+        """
+        active = list(self.jobs)
+        while active:
+            for job in active:
+                job.trainer.on_epoch_start(log=job.log, epoch=job.epoch)
+
+            train_results = self.train(active, train_loader)
+            valid_results = [None] * len(active)
+            if valid_loader is not None and any(job.trainer.eval_valid_each_epoch for job in active):
+                valid_results = self.evaluate(active, valid_loader)
+
+            remaining = list()
+            for job, (optimize_metric_results, train_loss, stop_training), valid_metric_results in zip(active, train_results, valid_results):
+                job.log, stop_training = job.log_epoch(trainer=job.trainer, log=job.log, epoch=job.epoch,
+                    optimize_metric_results=optimize_metric_results, train_loss=train_loss,
+                    valid_metric_results=valid_metric_results if job.trainer.eval_valid_each_epoch else None,
+                    stop_training=stop_training)
+                if not stop_training:
+                    job.epoch += 1
+                    remaining.append(job)
+            active = remaining
+
+
+def get_data_fingerprint(train_loader, valid_loader):
+    """Compute a fingerprint of the data and sampling of the data loaders. Jobs are only packed, if their fingerprints are equal.
+
+    Arguments:
+        train_loader {DataLoader} -- Data for training.
+        valid_loader {DataLoader} -- Data for validation.
+
+    Returns:
+        str -- The fingerprint or None, if the data is not stored in a TensorDataset and cannot be compared.
+    """
+    dataset = train_loader.dataset
+    if not isinstance(dataset, TensorDataset):
+        return None
+    if valid_loader is not None and not (isinstance(valid_loader.dataset, Subset) and valid_loader.dataset.dataset is dataset):
+        return None
+
+    fingerprint = hashlib.sha1()
+    for tensor in dataset.tensors:
+        array = tensor.detach().cpu().numpy()
+        fingerprint.update(str((array.shape, array.dtype.str)).encode())
+        fingerprint.update(np.ascontiguousarray(array).tobytes())
+    fingerprint.update(type(train_loader.sampler).__name__.encode())
+    fingerprint.update(np.asarray(getattr(train_loader.sampler, "indices", [])).tobytes())
+    fingerprint.update(str(train_loader.drop_last).encode())
+    if valid_loader is not None:
+        fingerprint.update(np.asarray(valid_loader.dataset.indices).tobytes())
+    return fingerprint.hexdigest()
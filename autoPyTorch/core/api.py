@@ -23,6 +23,7 @@ from autoPyTorch.pipeline.nodes.image.network_selector_datasetinfo import Networ
 
 
 from autoPyTorch.utils.config.config_file_parser import ConfigFileParser
+from autoPyTorch.utils.out_of_core import load_array
 
 class AutoNet():
     """Find an optimal neural network given a ML-task using BOHB"""
@@ -125,7 +126,7 @@ class AutoNet():
         """Fit AutoNet to training data.
         
         Arguments:
-            X_train {array} -- Training data.
+            X_train {array} -- Training data. Can also be a np.memmap or the path to a .npy or .parquet file, which is processed out of core.
             Y_train {array} -- Targets of training data.
         
         Keyword Arguments:
@@ -338,7 +339,10 @@ class AutoNet():
             if array is None or scipy.sparse.issparse(array):
                 result.append(array)
                 continue
-            
+
+            if isinstance(array, (str, os.PathLike)):
+                # memory-mapped, not read into memory
+                array = load_array(array)
             result.append(np.asanyarray(array))
             if not result[-1].shape:
                 raise RuntimeError("Given data-array is of unexpected type %s. Please pass numpy arrays instead." % type(array))
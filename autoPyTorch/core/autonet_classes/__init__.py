@@ -1,5 +1,10 @@
-from autoPyTorch.core.autonet_classes.autonet_feature_classification import AutoNetClassification
-from autoPyTorch.core.autonet_classes.autonet_feature_regression import AutoNetRegression
-from autoPyTorch.core.autonet_classes.autonet_feature_multilabel import AutoNetMultilabel
-from autoPyTorch.core.autonet_classes.autonet_image_classification import AutoNetImageClassification
-from autoPyTorch.core.autonet_classes.autonet_image_classification_multiple_datasets import AutoNetImageClassificationMultipleDatasets
+from autoPyTorch.utils.lazy_import import lazy_import
+
+__all__ = ["AutoNetClassification", "AutoNetRegression", "AutoNetMultilabel", "AutoNetImageClassification", "AutoNetImageClassificationMultipleDatasets"]
+__getattr__, __dir__ = lazy_import(__name__, {
+    "AutoNetClassification": "autoPyTorch.core.autonet_classes.autonet_feature_classification",
+    "AutoNetRegression": "autoPyTorch.core.autonet_classes.autonet_feature_regression",
+    "AutoNetMultilabel": "autoPyTorch.core.autonet_classes.autonet_feature_multilabel",
+    "AutoNetImageClassification": "autoPyTorch.core.autonet_classes.autonet_image_classification",
+    "AutoNetImageClassificationMultipleDatasets": "autoPyTorch.core.autonet_classes.autonet_image_classification_multiple_datasets"
+})
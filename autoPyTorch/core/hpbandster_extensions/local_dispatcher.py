@@ -0,0 +1,153 @@
+from hpbandster.core.dispatcher import Job
+import hpbandster.core.master
+import contextlib
+import logging
+import threading
+import traceback
+import collections
+
+
+class LocalDispatcher(object):
+    """
+        Dispatcher that runs the jobs of the master on a worker in the same process.
+        Configs and results are passed in memory, no nameserver and no network are necessary.
+        Has the same interface as the dispatcher of hpbandster, such that the master does not notice the difference.
+    """
+
+    def __init__(self, new_result_callback, run_id='0', ping_interval=10, nameserver='localhost',
+                 nameserver_port=None, host=None, logger=None, queue_callback=None):
+        self.new_result_callback = new_result_callback
+        self.queue_callback = queue_callback
+        self.run_id = run_id
+        self.logger = logger or logging.getLogger('hpbandster')
+
+        self.worker = None
+        self.pack_size = 1
+        self.pack_timeout = 0.5
+        self.waiting_jobs = collections.deque()
+        self.shutdown_all_threads = False
+        self.runner_cond = threading.Condition()
+
+    def add_worker(self, worker, pack_size=1, pack_timeout=0.5):
+        """
+            Set the worker that computes the jobs.
+
+            Parameters:
+            -----------
+            worker: Worker
+                the worker. It must not be started, its compute method is called directly.
+            pack_size: int
+                maximum number of jobs with equal budget passed to compute_packed of the worker at once.
+                The master keeps that many jobs queued.
+            pack_timeout: float
+                time in seconds to wait for the master to submit a full pack of jobs.
+        """
+        with self.runner_cond:
+            self.worker = worker
+            self.pack_size = pack_size
+            self.pack_timeout = pack_timeout
+            self.runner_cond.notify_all()
+        if self.queue_callback is not None:
+            self.queue_callback(pack_size)
+
+    def run(self):
+        # jobs run in a daemon thread, such that shutdown does not wait for a job that exceeded the grace period
+        job_runner = threading.Thread(target=self.job_runner, name='local job_runner')
+        job_runner.daemon = True
+        job_runner.start()
+        self.logger.info('DISPATCHER: started the local \'job_runner\' thread')
+
+        with self.runner_cond:
+            while not self.shutdown_all_threads:
+                self.runner_cond.wait()
+        self.logger.info('DISPATCHER: shut down complete')
+
+    def job_runner(self):
+        while True:
+            with self.runner_cond:
+                while not self.shutdown_all_threads and (len(self.waiting_jobs) == 0 or self.worker is None):
+                    self.runner_cond.wait()
+                if self.pack_size > 1:
+                    # the master submits the jobs of a pack one after another
+                    self.runner_cond.wait_for(lambda: self.shutdown_all_threads or len(self.waiting_jobs) >= self.pack_size,
+                        timeout=self.pack_timeout)
+                if self.shutdown_all_threads:
+                    return
+                jobs = self.pop_jobs()
+
+            for job in jobs:
+                self.logger.debug('DISPATCHER: starting job %s' % str(job.id))
+                job.time_it('started')
+                job.worker_name = self.worker.worker_id
+            if len(jobs) == 1:
+                try:
+                    job.result = self.worker.compute(config_id=job.id, **job.kwargs)
+                except Exception:
+                    job.exception = traceback.format_exc()
+            else:
+                results = self.worker.compute_packed([dict(config_id=job.id, **job.kwargs) for job in jobs])
+                for job, (result, exception) in zip(jobs, results):
+                    job.result, job.exception = result, exception
+            for job in jobs:
+                job.time_it('finished')
+                self.logger.debug('DISPATCHER: job %s finished' % str(job.id))
+
+            with self.runner_cond:
+                if self.shutdown_all_threads:
+                    return
+            # master might submit the next job in the callback
+            for job in jobs:
+                self.new_result_callback(job)
+
+    def pop_jobs(self):
+        """
+            Remove the next job and up to pack_size - 1 further waiting jobs with the same budget from the queue.
+            Must be called while holding runner_cond.
+        """
+        jobs = [self.waiting_jobs.popleft()]
+        remaining = collections.deque()
+        while self.waiting_jobs:
+            job = self.waiting_jobs.popleft()
+            if len(jobs) < self.pack_size and job.kwargs.get('budget') == jobs[0].kwargs.get('budget'):
+                jobs.append(job)
+            else:
+                remaining.append(job)
+        self.waiting_jobs = remaining
+        return jobs
+
+    def submit_job(self, id, **kwargs):
+        with self.runner_cond:
+            job = Job(id, **kwargs)
+            job.time_it('submitted')
+            self.waiting_jobs.append(job)
+            self.runner_cond.notify_all()
+
+    def number_of_workers(self):
+        with self.runner_cond:
+            return 0 if self.worker is None else 1
+
+    def trigger_discover_worker(self):
+        pass
+
+    def shutdown(self, shutdown_workers=False):
+        if shutdown_workers and self.worker is not None:
+            self.worker.shutdown()
+        with self.runner_cond:
+            self.shutdown_all_threads = True
+            self.runner_cond.notify_all()
+
+
+_dispatcher_lock = threading.Lock()
+
+@contextlib.contextmanager
+def local_dispatcher():
+    """
+        Masters created in this context use a LocalDispatcher instead of connecting to a nameserver.
+    """
+    with _dispatcher_lock:
+        dispatcher = hpbandster.core.master.Dispatcher
+        hpbandster.core.master.Dispatcher = LocalDispatcher
+        try:
+            yield
+        finally:
+            hpbandster.core.master.Dispatcher = dispatcher
@@ -30,19 +30,24 @@ def run_with_time(self, runtime=1, n_iterations=float("inf"), min_n_workers=1, i
     self.thread_cond.acquire()
 
     start_time = time.time()
+    deadline = start_time + runtime
+    timelimit_reached = False
 
     while True:
 
-        self._queue_wait()
+        _queue_wait(self, deadline)
 
         # Check if timelimit is reached
         if (runtime < time.time() - start_time):
             self.logger.info('HBMASTER: Timelimit reached: wait for remaining %i jobs'%self.num_running_jobs)
+            timelimit_reached = True
             break
         
         next_run = None
         # find a new run to schedule
         for i in self.active_iterations():
+            if getattr(self, "cost_model", None) is not None:
+                self.cost_model.order_queued_runs(self.iterations[i])
             next_run = self.iterations[i].get_next_run()
             if not next_run is None: break
 
@@ -59,7 +64,7 @@ def run_with_time(self, runtime=1, n_iterations=float("inf"), min_n_workers=1, i
         # at this point there is no imediate run that can be scheduled,
         # so wait for some job to finish if there are active iterations
         if self.active_iterations():
-            self.thread_cond.wait()
+            _wait(self, deadline)
         else:
             break
 
@@ -79,10 +84,18 @@ def run_with_time(self, runtime=1, n_iterations=float("inf"), min_n_workers=1, i
 
     self.logger.debug('HBMASTER: Canceled %i remaining runs'%n_canceled)
 
+    # let running jobs stop early and report partial results
+    if timelimit_reached and self.num_running_jobs > 0 and getattr(self, "on_timelimit", None) is not None:
+        self.on_timelimit()
+
     # wait for remaining jobs
-    while self.num_running_jobs > 0:
-        self.thread_cond.wait(60)
+    grace_deadline = time.time() + getattr(self, "shutdown_grace_period", float("inf"))
+    while self.num_running_jobs > 0 and time.time() < grace_deadline:
+        timeout = _remaining(grace_deadline)
+        self.thread_cond.wait(60 if timeout is None else min(60, timeout))
         self.logger.debug('HBMASTER: Job finished: wait for remaining %i jobs'%self.num_running_jobs)
+    if self.num_running_jobs > 0:
+        self.logger.info('HBMASTER: Grace period exceeded: stop waiting for remaining %i jobs'%self.num_running_jobs)
 
     self.thread_cond.release()
     
@@ -92,3 +105,29 @@ def run_with_time(self, runtime=1, n_iterations=float("inf"), min_n_workers=1, i
     ws_data = [i.data for i in self.warmstart_iteration]
     
     return Result([copy.deepcopy(i.data) for i in self.iterations] + ws_data, self.config)
+
+
+def _queue_wait(self, deadline):
+    """Like Master._queue_wait, but stops waiting at the deadline."""
+    if self.num_running_jobs >= self.job_queue_sizes[1]:
+        while self.num_running_jobs > self.job_queue_sizes[0] and time.time() < deadline:
+            self.logger.debug('HBMASTER: running jobs: %i, queue sizes: %s -> wait'%(self.num_running_jobs, str(self.job_queue_sizes)))
+            _wait(self, deadline)
+
+def _wait(self, deadline):
+    """Wait for a job to finish, but not beyond the deadline.
+    If the master has an on_wait hook, e.g. to monitor the running jobs, it is called at least every wait_interval seconds."""
+    on_wait = getattr(self, "on_wait", None)
+    timeout = _remaining(deadline)
+    if on_wait is not None:
+        wait_interval = getattr(self, "wait_interval", 10)
+        timeout = wait_interval if timeout is None else min(timeout, wait_interval)
+    self.thread_cond.wait(timeout)
+    if on_wait is not None:
+        on_wait()
+
+def _remaining(deadline):
+    """Seconds until the deadline. None for no deadline, because waiting forever does not accept infinity."""
+    if deadline == float("inf"):
+        return None
+    return max(0, deadline - time.time())
@@ -1,4 +1,6 @@
 import logging
+import threading
+import traceback
 import torch
 import time
 import numpy as np
@@ -6,6 +8,11 @@ import Pyro4
 from hpbandster.core.worker import Worker
 
 from autoPyTorch.components.training.budget_types import BudgetTypeTime
+from autoPyTorch.utils.resume import get_evaluation_key
+from autoPyTorch.utils.evaluation_cache import get_cache_key, get_data_fingerprint
+from autoPyTorch.utils.cost_model import CostModel
+from autoPyTorch.components.training.job_cancellation import is_partial_result
+from autoPyTorch.components.training.packed_training import PackedEvaluation
 
 __author__ = "Max Dippel, Michael Burkart and Matthias Urban"
 __version__ = "0.0.1"
@@ -16,7 +23,7 @@ class AutoNetWorker(Worker):
 
     def __init__(self, pipeline, pipeline_config,
             X_train, Y_train, X_valid, Y_valid, dataset_info, budget_type, max_budget,
-            shutdownables, use_pynisher, *args, **kwargs):
+            shutdownables, use_pynisher, *args, evaluated_results=None, evaluation_cache=None, **kwargs):
         """Initialize the worker.
         
         Arguments:
@@ -31,6 +38,10 @@ class AutoNetWorker(Worker):
             max_budget {float} -- The maximum budget
             shutdownables {list} -- For each element of the object, the shutdown() method is called when the worker is shutting down.
             use_pynisher {bool} -- Whether to use pynisher to guarantee resource limits
+
+        Keyword Arguments:
+            evaluated_results {dict} -- Results of a resumed run. These evaluations will not be repeated. (default: {None})
+            evaluation_cache {EvaluationCache} -- Cache of results shared across runs (default: {None})
         """
         self.X_train = X_train #torch.from_numpy(X_train).float()
         self.Y_train = Y_train #torch.from_numpy(Y_train).long()
@@ -38,12 +49,17 @@ class AutoNetWorker(Worker):
         self.Y_valid = Y_valid
         self.dataset_info = dataset_info
         self.shutdownables = shutdownables
+        self.evaluated_results = evaluated_results or dict()
+        self.evaluation_cache = evaluation_cache
+        self.data_fingerprint = get_data_fingerprint(X_train, Y_train, X_valid, Y_valid) if evaluation_cache is not None else None
+        self.cost_model = CostModel(pipeline_config, dataset_info) if pipeline_config.get("use_cost_model", False) else None
 
         self.max_budget = max_budget
         self.budget_type = budget_type
 
         self.pipeline = pipeline
         self.pipeline_config = pipeline_config
+        self.packed_pipelines = []
 
         self.autonet_logger = logging.getLogger('autonet')
 
@@ -56,10 +72,29 @@ class AutoNetWorker(Worker):
         super().__init__(*args, **kwargs)
     
     # OVERRIDE
-    def compute(self, config, budget, working_directory, config_id, **kwargs):
+    def compute(self, config, budget, working_directory, config_id, pipeline=None, **kwargs):
 
         self.autonet_logger.debug("Budget " + str(budget) + " config: " + str(config))
 
+        evaluation_key = get_evaluation_key(config, budget)
+        if evaluation_key in self.evaluated_results:
+            self.autonet_logger.info("Config has already been evaluated with budget " + str(budget) + " in a previous run")
+            return self.evaluated_results[evaluation_key]
+
+        cache_key = None
+        if self.evaluation_cache is not None:
+            cache_key = get_cache_key(config, budget, self.budget_type.__name__, self.pipeline_config, self.data_fingerprint)
+            result = self.evaluation_cache.get(cache_key)
+            if result is not None:
+                self.autonet_logger.info("Found result of config with budget " + str(budget) + " in evaluation cache")
+                return result
+
+        # reject configurations before a process is forked for them. The prior is too coarse to reject anything.
+        if self.cost_model is not None and self.cost_model.is_memory_calibrated():
+            predicted_memory = self.cost_model.predict_memory(config)
+            if predicted_memory > self.pipeline_config['memory_limit_mb']:
+                raise Exception("Predicted memory usage of " + str(int(predicted_memory)) + " MB exceeds the memory limit with budget " + str(budget))
+
         start_time = time.time()
         self.autonet_logger.debug("Starting optimization!")
 
@@ -74,7 +109,7 @@ class AutoNetWorker(Worker):
 
             # start optimization
             limit_train = pynisher.enforce_limits(mem_in_mb=self.pipeline_config['memory_limit_mb'], wall_time_in_s=time_limit)(self.optimize_pipeline)
-            result = limit_train(config, config_id, budget, start_time)
+            result = limit_train(config, config_id, budget, start_time, pipeline)
 
             # check for exceptions
             if (limit_train.exit_status == pynisher.TimeoutException):
@@ -85,10 +120,18 @@ class AutoNetWorker(Worker):
                 self.autonet_logger.info('Exception occurred using config:\n' + str(config))
                 raise Exception("Exception in train pipeline. Took " + str((time.time()-start_time)) + " seconds with budget " + str(budget))
         else:
-            result = self.optimize_pipeline(config, config_id, budget, start_time)
+            result = self.optimize_pipeline(config, config_id, budget, start_time, pipeline)
+
+        if cache_key is not None and not is_partial_result(result):
+            # predictions for the ensemble are only available on the ensemble server of this run
+            self.evaluation_cache.put(cache_key, {k: v for k, v in result.items()
+                if k not in ["predictions_for_ensemble", "test_predictions_for_ensemble", "peak_memory_mb"]})
 
         loss = result['loss']
         info = result['info']
+        if self.cost_model is not None:
+            self.cost_model.observe(config, budget, time.time() - start_time, result.get('peak_memory_mb'))
+
         self.autonet_logger.debug("Result: " + str(loss) + " info: " + str(info))
 
         # that is not really elegant but we can want to achieve some kind of feedback
@@ -97,8 +140,47 @@ class AutoNetWorker(Worker):
         self.autonet_logger.info("Training " + str(network_name) + " with budget " + str(budget) + " resulted in optimize-metric-loss: " + str(loss) + " took " + str((time.time()-start_time)) + " seconds")
 
         return  result
+
+    def compute_packed(self, jobs):
+        """Evaluate several jobs at the same time. Each job runs in its own thread on its own copy of the pipeline.
+        The networks of compatible configurations are trained together, see PackedEvaluation.
+        
+        Arguments:
+            jobs {list} -- The keyword arguments of compute for each job.
+        
+        Returns:
+            list -- Tuple (result, exception) for each job. The exception is the formatted traceback, or None if the job succeeded.
+        """
+        while len(self.packed_pipelines) < len(jobs):
+            self.packed_pipelines.append(self.pipeline.clone())
+
+        packing = PackedEvaluation(len(jobs))
+        results = [None] * len(jobs)
+
+        def evaluate(i, job):
+            pipeline = self.packed_pipelines[i]
+            train_node = pipeline["TrainNode"] if "TrainNode" in pipeline else None
+            if train_node is not None:
+                train_node.packing = packing
+            try:
+                results[i] = (self.compute(pipeline=pipeline, **job), None)
+            except Exception:
+                results[i] = (None, traceback.format_exc())
+            finally:
+                # the train node consumes the packing when it trains, otherwise the other jobs must not wait for this one
+                if train_node is None or train_node.packing is not None:
+                    packing.leave()
+                if train_node is not None:
+                    train_node.packing = None
+
+        threads = [threading.Thread(target=evaluate, args=(i, job), name="packed job " + str(i)) for i, job in enumerate(jobs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
     
-    def optimize_pipeline(self, config, config_id, budget, optimize_start_time):
+    def optimize_pipeline(self, config, config_id, budget, optimize_start_time, pipeline=None):
         """Fit the pipeline using the sampled hyperparameter configuration.
         
         Arguments:
@@ -107,15 +189,24 @@ class AutoNetWorker(Worker):
             budget {float} -- The budget to evaluate the hyperparameter configuration.
             optimize_start_time {float} -- The time when optimization started.
         
+        Keyword Arguments:
+            pipeline {Pipeline} -- The pipeline to fit. Defaults to the pipeline of the worker (default: {None})
+        
         Returns:
             dict -- The result of fitting the pipeline.
         """
         try:
             self.autonet_logger.info("Fit optimization pipeline")
-            return self.pipeline.fit_pipeline(hyperparameter_config=config, pipeline_config=self.pipeline_config,
+            if pipeline is None:
+                pipeline = self.pipeline
+            result = pipeline.fit_pipeline(hyperparameter_config=config, pipeline_config=self.pipeline_config,
                                             X_train=self.X_train, Y_train=self.Y_train, X_valid=self.X_valid, Y_valid=self.Y_valid, 
                                             budget=budget, budget_type=self.budget_type, max_budget=self.max_budget, optimize_start_time=optimize_start_time,
                                             refit=False, rescore=False, hyperparameter_config_id=config_id, dataset_info=self.dataset_info)
+            if self.cost_model is not None:
+                # measured in the process that ran the pipeline, independent of the info of the pipeline (e.g. a list for cross validation)
+                result['peak_memory_mb'] = get_peak_memory_mb()
+            return result
         except Exception as e:
             if 'use_tensorboard_logger' in self.pipeline_config and self.pipeline_config['use_tensorboard_logger']:            
                 import tensorboard_logger as tl
@@ -128,7 +219,8 @@ class AutoNetWorker(Worker):
     def shutdown(self):
         for s in self.shutdownables:
             s.shutdown()
-        super().shutdown()
+        if hasattr(self, "pyro_daemon"):  # not started, if jobs are dispatched in process
+            super().shutdown()
 
 def module_exists(module_name):
     try:
@@ -136,4 +228,16 @@ def module_exists(module_name):
     except ImportError:
         return False
     else:
-        return True
\ No newline at end of file
+        return True
+
+def get_peak_memory_mb():
+    """Get the peak memory of the current process in MB.
+    If pynisher is used, the process runs only a single evaluation. Otherwise, this is the peak over all evaluations of the worker.
+
+    Returns:
+        float -- The peak memory or None, if the module 'resource' is not available.
+    """
+    if not module_exists("resource"):
+        return None
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
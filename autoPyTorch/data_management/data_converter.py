@@ -1,4 +1,7 @@
+import os
 import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 
 __author__ = "Max Dippel, Michael Burkart and Matthias Urban"
 __version__ = "0.0.1"
@@ -9,7 +12,9 @@ class DataConverter(object):
                  numerical_min_unique_values=3,
                  force_numerical=None,
                  force_categorical=None,
-                 is_multilabel=None):
+                 is_multilabel=None,
+                 n_jobs=None,
+                 column_block_size=256):
         """
         Initialize the data_converter.
         
@@ -22,12 +27,16 @@ class DataConverter(object):
             force_numerical: Array of feature indices, which schould be treated as numerical.
             force_categorical: Array of feature indices, which should be trated as categorical.
             is_multilabel: True, if multivariable regression / multilabel classification
+            n_jobs: Number of threads that convert blocks of columns in parallel. None for the number of cpus.
+            column_block_size: Number of columns in a block.
         """
         self.is_classification = is_classification
         self.numerical_min_unique_values= numerical_min_unique_values
         self.force_numerical = force_numerical or []
         self.force_categorical = force_categorical or []
         self.is_multilabel = is_multilabel
+        self.n_jobs = n_jobs
+        self.column_block_size = column_block_size
 
     def convert(self, X, Y):
         """
@@ -74,70 +83,120 @@ class DataConverter(object):
             categorical: boolean vector, that specifies which columns are categorical
         """
         num_rows = len(matrix)
+
+        # columns are typed and encoded in blocks, in parallel
+        blocks = [(start, matrix[:, start:start + self.column_block_size]) for start in range(0, matrix.shape[1], self.column_block_size)]
+        convert_block = lambda block: self.convert_block(block[0], block[1], force_categorical, force_numerical)
+        if len(blocks) > 1 and self.n_jobs != 1:
+            with ThreadPoolExecutor(max_workers=self.n_jobs or os.cpu_count()) as executor:
+                converted_blocks = list(executor.map(convert_block, blocks))
+        else:
+            converted_blocks = list(map(convert_block, blocks))
+
+        # fill the result
+        is_categorical = [is_cat for block_is_categorical, _ in converted_blocks for is_cat in block_is_categorical]
+        result = np.zeros(shape=(num_rows, sum(1 for x in is_categorical if x is not None)), dtype='float32', order='F')
+        j = 0
+        for _, block_result in converted_blocks:
+            result[:, j:j + block_result.shape[1]] = block_result
+            j += block_result.shape[1]
+
+        return result, [x for x in is_categorical if x is not None]
+
+    def convert_block(self, start, block, force_categorical, force_numerical):
+        """
+        Convert a block of columns of a matrix.
+        Numerical blocks are sorted once to count the unique values of all columns.
+        Columns of objects are encoded using pandas.factorize.
+
+        Arguments:
+            start: The index of the first column of the block in the matrix.
+            block: The columns to convert.
+            force_cateogrical: The list of column indizes, which should be categorical.
+            force_numerical: The list of column indizes, which should be numerical.
+
+        Result:
+            is_categorical: for each column True if categorical, False if numerical, None if it is deleted because it is constant.
+            result: the converted columns, that are not deleted
+        """
+        if block.dtype == np.dtype("object"):
+            num_values, indices, has_string = zip(*[self.factorize_objects(block[:, i]) for i in range(block.shape[1])]) \
+                if block.shape[1] > 0 else ([], [], [])
+        else:
+            # sort contiguous columns
+            sorted_columns = np.sort(np.ascontiguousarray(block.T), axis=1)
+            num_values = self.count_unique_numbers(sorted_columns)
+            has_string = [False] * block.shape[1]
+
         is_categorical = []
-        len_values_and_indices = []
-        result_width = 0
-        
-        # iterate over the columns and get some data
-        for i in range(matrix.shape[1]):
-            
-            # check if it is categorical or numerical
-            matrix_column = matrix[0:num_rows, i]
-            if matrix.dtype == np.dtype("object"):
-                values_occurred = dict()
-                values = []
-                indices = []
-                for v in matrix_column:
-                    if v not in values_occurred:
-                        values_occurred[v] = len(values)
-                        values.append(v)
-                    indices.append(values_occurred[v])
-                indices = np.array(indices)
-                values = np.array(values, dtype=object)
-                nan_indices = np.array([i for i, n in enumerate(matrix_column) if n == np.nan])
-                valid_value_indices = np.array([i for i, n in enumerate(values) if n != np.nan])
-            else:
-                values, indices = np.unique(matrix_column, return_inverse=True)
-                nan_indices = np.argwhere(np.isnan(matrix_column)).flatten()
-                valid_value_indices = np.argwhere(~np.isnan(values)).flatten()
-
-            # check for missing values
-            # nan values are additional category in categorical features
-            if len(nan_indices) > 0:
-                values = np.append(values[valid_value_indices], np.nan)
-                indices[nan_indices] = values.shape[0] - 1         
-
-            len_values_and_indices.append((len(values), indices))
-            if len(values) == 1:
+        columns = []
+        for i in range(block.shape[1]):
+            if num_values[i] == 1:
                 is_categorical.append(None)
-            elif i in force_categorical or i not in force_numerical and (
-                    len(values) < self.numerical_min_unique_values or
-                    any(type(value) is str for value in values)):
-                # column is categorical
+            elif start + i in force_categorical or start + i not in force_numerical and (
+                    num_values[i] < self.numerical_min_unique_values or has_string[i]):
+                # column is categorical: convert to int
                 is_categorical.append(True)
-                result_width += 1
+                columns.append(indices[i] if block.dtype == np.dtype("object") else self.encode_numbers(block[:, i], sorted_columns[i]))
             else:
                 # column is numerical
                 is_categorical.append(False)
-                result_width += 1
+                columns.append(block[:, i])
 
-        # fill the result
-        result = np.zeros(shape=(num_rows, result_width), dtype='float32', order='F')
-        j = 0
-        for i, is_cat in enumerate(is_categorical):
-            len_values, indices = len_values_and_indices[i]
-            if len_values == 1:
-                continue
-            if is_cat:
-                # column is categorical: convert to int
-                result[:, j] = indices
-                j += 1
-            else:
-                # column is numerical
-                result[:, j] = matrix[:, i]
-                j += 1
+        result = np.zeros(shape=(block.shape[0], len(columns)), dtype='float32', order='F')
+        for j, column in enumerate(columns):
+            result[:, j] = column
+        return is_categorical, result
+
+    def count_unique_numbers(self, sorted_columns):
+        """
+        Count the unique values of each column. All missing values count as a single value.
+
+        Arguments:
+            sorted_columns: The sorted numerical columns, one column per row. Missing values are sorted to the end.
+
+        Result:
+            num_values: the number of unique values in each column, including nan
+        """
+        if sorted_columns.shape[1] == 0:
+            return np.zeros(sorted_columns.shape[0], dtype=int)
+        is_nan = np.isnan(sorted_columns) if sorted_columns.dtype.kind in "fc" else np.zeros(sorted_columns.shape, dtype=bool)
+        new_value = (sorted_columns[:, 1:] != sorted_columns[:, :-1]) & ~is_nan[:, 1:]
+        return np.sum(new_value, axis=1) + ~is_nan[:, 0] + is_nan[:, -1]
+
+    def encode_numbers(self, column, sorted_column):
+        """
+        Encode a numerical column with the index of its values in the sorted unique values.
+        Missing values are an additional category with the highest index.
 
-        return result.astype('float32', copy=False), [x for x in is_categorical if x is not None]
+        Arguments:
+            column: The numerical column.
+            sorted_column: The sorted column.
+
+        Result:
+            indices: the encoded column
+        """
+        values = sorted_column[np.concatenate([[True], sorted_column[1:] != sorted_column[:-1]])[:len(sorted_column)]]
+        # nan is sorted to the end: its index is the number of other values
+        return np.searchsorted(values, column)
+
+    def factorize_objects(self, column):
+        """
+        Encode a column of objects with the index of the first occurrence of its values.
+        Missing values are an additional category with the highest index.
+
+        Arguments:
+            column: The column of objects.
+
+        Result:
+            num_values: the number of unique values, including nan
+            indices: the encoded column
+            has_string: Whether one of the values is a string
+        """
+        indices, values = pd.factorize(column)
+        is_nan = indices == -1
+        indices[is_nan] = len(values)
+        return len(values) + np.any(is_nan), indices, any(type(value) is str for value in values)
     
     
     def check_multi_dim_output(self, Y):
@@ -25,13 +25,19 @@ class ProblemType(Enum):
 class DataManager(object):
     """ Load data from multiple sources and formants"""
 
-    def __init__(self, verbose=0):
+    def __init__(self, verbose=0, openml_cache_dir=None, openml_offline=False, csv_cache_dir=None):
         """Construct the DataManager
         
         Keyword Arguments:
             verbose {bool} -- Whether to print stuff. (default: {0})
+            csv_cache_dir {str} -- Directory of the binary cache of converted csv files. None to cache next to the csv files. (default: {None})
+            openml_cache_dir {str} -- Directory of a local cache of OpenML datasets. (default: {None})
+            openml_offline {bool} -- Only read OpenML datasets from the cache, never access the network. (default: {False})
         """
         self.verbose = verbose
+        self.openml_cache_dir = openml_cache_dir
+        self.openml_offline = openml_offline
+        self.csv_cache_dir = csv_cache_dir
         self.X_train, self.Y_train = None, None
         self.X_test, self.Y_test = None, None
         self.X_valid, self.Y_valid = None, None
@@ -85,10 +91,11 @@ class DataManager(object):
             DataReader -- A reader that is able to read the data type
         """
         if file_name.endswith(".csv"):
-            reader = CSVReader(file_name, is_classification=is_classification)
+            reader = CSVReader(file_name, is_classification=is_classification, cache_dir=self.csv_cache_dir)
         elif file_name.startswith("openml:"):
             dataset_id = int(file_name.split(":")[1])
-            reader = OpenMlReader(dataset_id, is_classification=is_classification)
+            reader = OpenMlReader(dataset_id, is_classification=is_classification,
+                cache_dir=self.openml_cache_dir, offline=self.openml_offline)
         elif file_name.endswith(".info"):
             reader = AutoMlReader(file_name)
         else:
@@ -3,10 +3,12 @@ import pandas as pd
 import numpy as np
 from abc import abstractmethod
 import os
+import hashlib
 from  scipy.sparse import csr_matrix
 import math
 
 from autoPyTorch.data_management.data_converter import DataConverter
+from autoPyTorch.data_management.openml_cache import OpenMlCache
 
 __author__ = "Max Dippel, Michael Burkart and Matthias Urban"
 __version__ = "0.0.1"
@@ -50,55 +52,176 @@ class DataReader(object):
 
 
 class CSVReader(DataReader):
-    def __init__(self, file_name, is_classification=None):
+    missing_values = ["?"]
+    cache_suffix = ".autonet_cache.npz"
+
+    def __init__(self, file_name, is_classification=None, cache_dir=None):
+        """
+        Reader for csv files. The last column is the target.
+        
+        Arguments:
+            file_name: The csv file.
+            is_classification: specifies, if it is a classification problem. None for autodetect.
+            cache_dir: Directory of the binary cache of the converted data. None to cache next to the csv file.
+        """
         self.num_entries = None
         self.num_features = None
         self.num_classes = None
+        self.cache_dir = cache_dir
         super(CSVReader, self).__init__(file_name, is_classification)
         
     
 
-    def read(self, auto_convert=True, **kwargs):
+    def read(self, auto_convert=True, chunk_size=100000, use_cache=True, **kwargs):
         """
         Read the data from given csv file.
         
         Arguments:
             auto_convert: Automatically convert data after reading.
+            chunk_size: Number of lines that are parsed at once.
+            use_cache: Load the converted data from the binary cache, if it is up to date. Create the cache otherwise.
             *args, **kwargs: arguments for converting.
         """
-        self.data = pd.read_csv(self.file_name)
+        cache_key = self.get_cache_key(**kwargs) if auto_convert and use_cache else None
+        if cache_key is not None and self.load_cache(cache_key):
+            return
+
+        # count the rows and find the non-numeric columns first, such that each chunk is converted into a preallocated array
+        # as soon as it is parsed, with the same dtypes in all chunks
+        self.num_entries, numeric_columns = 0, dict()
+        for chunk in self.read_chunks(chunk_size):
+            self.num_entries += len(chunk)
+            for column, dtype in chunk.dtypes.items():
+                numeric_columns[column] = numeric_columns.get(column, True) and pd.api.types.is_numeric_dtype(dtype)
+        # non-numeric columns are read as strings, even in chunks where all their values look like numbers
+        dtypes = {column: object for column, is_numeric in numeric_columns.items() if not is_numeric}
+
+        self.num_features = len(numeric_columns) - 1
+        self.X = np.empty((self.num_entries, self.num_features), dtype=np.float64 if all(list(numeric_columns.values())[:-1]) else object)
+        targets, row = [], 0
+        for chunk in self.read_chunks(chunk_size, dtype=dtypes):
+            self.X[row:row + len(chunk)] = chunk.iloc[:, :-1].to_numpy(dtype=self.X.dtype)
+            targets.append(chunk.iloc[:, -1].to_numpy())
+            row += len(chunk)
+        self.Y = np.concatenate(targets)
 
+        self.num_classes = len(np.unique(self.Y))
+        if (auto_convert):
+            self.convert(**kwargs)
+            if cache_key is not None:
+                self.save_cache(cache_key)
 
-        self.num_entries = len(self.data)
-        self.num_features = len(self.data.iloc[0]) - 1
+    def read_chunks(self, chunk_size, **kwargs):
+        """
+        Parse the csv file in chunks. Missing values are parsed by pandas, each column of a chunk gets its own dtype, unless passed as dtype.
+        
+        Arguments:
+            chunk_size: Number of lines that are parsed at once.
+            **kwargs: arguments for pandas.read_csv.
+        
+        Returns:
+            Iterator over the chunks as DataFrames.
+        """
+        return pd.read_csv(self.file_name, na_values=self.missing_values, chunksize=chunk_size, low_memory=False, **kwargs)
 
-        self.data = np.array(self.data)
-            
-        self.X = self.data[0:self.num_entries, 0:self.num_features] #np.array(  .iloc
-        self.Y = self.data[0:self.num_entries, -1]
+    def get_cache_file(self):
+        """
+        Get the path of the cache. Caches in a cache directory are named after the csv file and its absolute path.
+        
+        Returns:
+            The path of the cache file.
+        """
+        if self.cache_dir is None:
+            return self.file_name + self.cache_suffix
+        path_hash = hashlib.sha1(os.path.abspath(self.file_name).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, "%s.%s%s" % (os.path.basename(self.file_name), path_hash, self.cache_suffix))
 
-        for i in range(self.X.shape[0]):
-            for j in range(self.X.shape[1]):
-                if self.X[i, j] == "?":
-                    self.X[i, j] = np.nan
+    def get_cache_key(self, **kwargs):
+        """
+        Identify the csv file and the conversion. The cache is invalid, if one of them changes.
+        
+        Arguments:
+            **kwargs: arguments for converting.
+        """
+        stat = os.stat(self.file_name)
+        return repr((stat.st_size, stat.st_mtime_ns, self.is_classification, sorted(kwargs.items())))
 
-        self.num_classes = len(np.unique(self.Y))
-        if (auto_convert):
-            self.convert(**kwargs)
+    def load_cache(self, cache_key):
+        """
+        Load the converted data from the cache.
+        
+        Arguments:
+            cache_key: The key of the data, as returned by get_cache_key().
+        
+        Returns:
+            Whether the data has been loaded.
+        """
+        try:
+            with np.load(self.get_cache_file()) as cache:
+                if str(cache["cache_key"]) != cache_key:
+                    return False
+                self.X, self.Y = cache["X"], cache["Y"]
+                self.categorical_features = cache["categorical_features"].tolist()
+                self.is_classification = bool(cache["is_classification"])
+                self.is_multilabel = bool(cache["is_multilabel"])
+                self.num_classes = int(cache["num_classes"])
+                self.num_entries, self.num_features = self.X.shape[0], int(cache["num_features"])
+        except (OSError, KeyError, ValueError):
+            return False
+        return True
+
+    def save_cache(self, cache_key):
+        """
+        Save the converted data to the cache. The cache is skipped, if it can not be written.
+        
+        Arguments:
+            cache_key: The key of the data, as returned by get_cache_key().
+        """
+        cache_file = self.get_cache_file()
+        try:
+            if self.cache_dir is not None:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            # write to a temporary file first, such that concurrent runs never read a partial cache
+            with open(cache_file + ".tmp", "wb") as f:
+                np.savez(f, cache_key=np.array(cache_key), X=self.X, Y=self.Y,
+                    categorical_features=np.array(self.categorical_features, dtype=bool),
+                    is_classification=np.array(bool(self.is_classification)), is_multilabel=np.array(bool(self.is_multilabel)),
+                    num_classes=np.array(self.num_classes), num_features=np.array(self.num_features))
+            os.replace(cache_file + ".tmp", cache_file)
+        except OSError:
+            pass
             
 class OpenMlReader(DataReader):
-    def __init__(self, dataset_id, is_classification = None, api_key=None):
-        import openml
-        self.openml = openml
+    def __init__(self, dataset_id, is_classification = None, api_key=None, cache_dir=None, offline=False):
+        """
+        Reader for OpenML datasets.
+        
+        Arguments:
+            dataset_id: The id of the OpenML dataset.
+            is_classification: specifies, if it is a classification problem. None for autodetect.
+            api_key: The OpenML api key.
+            cache_dir: Directory of a local cache of the datasets. Datasets that are not cached are downloaded and added to the cache.
+            offline: Only read datasets from the cache, never access the network.
+        """
         self.num_entries = None
         self.num_features = None
         self.num_classes = None
         self.dataset_id = dataset_id
-        if api_key:
-            openml.config.server = "https://www.openml.org/api/v1/xml"
-            openml.config.apikey = api_key
+        self.api_key = api_key
+        self.cache = OpenMlCache(cache_dir) if cache_dir is not None else None
+        self.offline = offline
+        if offline and cache_dir is None:
+            raise ValueError("OpenML datasets can only be read offline from a cache. Please specify a cache directory.")
         super(OpenMlReader, self).__init__("openml:" + str(dataset_id), is_classification)
 
+    @property
+    def openml(self):
+        import openml
+        if self.api_key:
+            openml.config.server = "https://www.openml.org/api/v1/xml"
+            openml.config.apikey = self.api_key
+        return openml
+
     def read(self, **kwargs):
         """
         Read the data from given openml dataset file.
@@ -107,7 +230,26 @@ class OpenMlReader(DataReader):
             auto_convert: Automatically convert data after reading.
             *args, **kwargs: arguments for converting.
         """
-        
+        cached = self.cache.get(self.dataset_id) if self.cache is not None else None
+        if cached is not None:
+            self.X, self.Y, metadata = cached
+            self.categorical_features = metadata["categorical_features"]
+            self.is_classification = metadata["is_classification"]
+            self.num_classes = metadata["num_classes"]
+        elif self.offline:
+            raise RuntimeError("OpenML dataset %s is not in the cache and can not be downloaded in offline mode. "
+                "Please prefetch it with scripts/prefetch_openml_datasets.py." % self.dataset_id)
+        else:
+            self.download()
+
+        self.num_entries = self.X.shape[0]
+        self.num_features = self.X.shape[1]
+        self.is_multilabel = False
+
+    def download(self):
+        """
+        Download the dataset from OpenML. Add it to the cache, if there is one.
+        """
         dataset = self.openml.datasets.get_dataset(self.dataset_id)
         try:
             self.X, self.Y, self.categorical_features = dataset.get_data(
@@ -115,9 +257,6 @@ class OpenMlReader(DataReader):
         except Exception as e:
             raise RuntimeError("An error occurred when loading the dataset and splitting it into X and Y. Please check if the dataset is suitable.")
 
-        self.num_entries = self.X.shape[0]
-        self.num_features = self.X.shape[1]
-        self.is_multilabel = False
         class_labels = dataset.retrieve_class_labels(target_name=dataset.default_target_attribute)
         if class_labels:
             self.is_classification = True
@@ -126,6 +265,11 @@ class OpenMlReader(DataReader):
             self.is_classification = False
             self.num_classes = 1
 
+        if self.cache is not None:
+            self.cache.put(self.dataset_id, self.X, self.Y, name=dataset.name,
+                categorical_features=[bool(c) for c in self.categorical_features],
+                is_classification=self.is_classification, num_classes=self.num_classes)
+
 
 class AutoMlReader(DataReader):
     def __init__(self, path_to_info):
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import pickle
+import numpy as np
+import scipy.sparse
+
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+# Increase, if the format of the stored datasets changes
+CACHE_FORMAT_VERSION = 2
+
+
+class OpenMlCache(object):
+    """ Local cache of OpenML datasets, that can be used without network access.
+
+    The data of each dataset is stored content-addressed in objects/<sha256>.npz. Object arrays, e.g. features with strings and
+    missing values, are stored losslessly using pickle.
+    The file datasets/<dataset_id>.json references the data and stores the metadata of the dataset.
+    Files are replaced atomically, such that concurrent runs can share the cache.
+    """
+
+    def __init__(self, cache_dir):
+        """Open the cache.
+
+        Arguments:
+            cache_dir {str} -- The directory of the cache.
+        """
+        self.cache_dir = cache_dir
+
+    def get(self, dataset_id):
+        """Get a cached dataset.
+
+        Arguments:
+            dataset_id {int} -- The id of the OpenML dataset.
+
+        Returns:
+            tuple -- X, Y and the metadata of the dataset, None if the dataset is not in the cache.
+        """
+        try:
+            with open(self._get_metadata_file(dataset_id), "r") as f:
+                metadata = json.load(f)
+            if metadata.get("format_version") != CACHE_FORMAT_VERSION:
+                return None
+            # object arrays are pickled. The cache is trusted like the code that created it.
+            with np.load(self._get_object_file(metadata["content_hash"]), allow_pickle=True) as data:
+                if "X_indptr" in data:
+                    X = scipy.sparse.csr_matrix((data["X_data"], data["X_indices"], data["X_indptr"]), shape=tuple(data["X_shape"]))
+                else:
+                    X = data["X"]
+                Y = data["Y"]
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError):
+            return None
+        return X, Y, metadata
+
+    def put(self, dataset_id, X, Y, **metadata):
+        """Store a dataset.
+
+        Arguments:
+            dataset_id {int} -- The id of the OpenML dataset.
+            X {array} -- The features. Dense or sparse.
+            Y {array} -- The targets.
+            **metadata -- Metadata of the dataset. Must be serializable to json.
+
+        Returns:
+            str -- The hash of the content of the dataset.
+        """
+        if scipy.sparse.issparse(X):
+            X = X.tocsr()
+            arrays = {"X_data": X.data, "X_indices": X.indices, "X_indptr": X.indptr, "X_shape": np.array(X.shape)}
+        else:
+            arrays = {"X": np.asarray(X)}
+        arrays["Y"] = np.asarray(Y)
+
+        content_hash = hashlib.sha256()
+        for name in sorted(arrays):
+            content_hash.update(name.encode())
+            content_hash.update(str((arrays[name].dtype, arrays[name].shape)).encode())
+            # the memory of object arrays holds pointers, hash the pickled objects instead
+            content_hash.update(pickle.dumps(arrays[name].tolist(), protocol=4) if arrays[name].dtype == object
+                else np.ascontiguousarray(arrays[name]).data)
+        content_hash = content_hash.hexdigest()
+
+        os.makedirs(os.path.join(self.cache_dir, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(self.cache_dir, "datasets"), exist_ok=True)
+        object_file = self._get_object_file(content_hash)
+        if not os.path.exists(object_file):
+            with open(object_file + ".%s.tmp" % os.getpid(), "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(object_file + ".%s.tmp" % os.getpid(), object_file)
+
+        metadata_file = self._get_metadata_file(dataset_id)
+        with open(metadata_file + ".%s.tmp" % os.getpid(), "w") as f:
+            json.dump(dict(metadata, dataset_id=dataset_id, content_hash=content_hash, format_version=CACHE_FORMAT_VERSION), f)
+        os.replace(metadata_file + ".%s.tmp" % os.getpid(), metadata_file)
+        return content_hash
+
+    def _get_metadata_file(self, dataset_id):
+        return os.path.join(self.cache_dir, "datasets", "%d.json" % int(dataset_id))
+
+    def _get_object_file(self, content_hash):
+        return os.path.join(self.cache_dir, "objects", "%s.npz" % content_hash)
@@ -14,6 +14,9 @@ class Node():
         self.fit_output = None
         self.predict_output = None
         self.logger = logging.getLogger('autonet')
+        self._fit_argspec = None
+        self._predict_argspec = None
+        self._fit_plan = None
 
     def fit(self, **kwargs):
         """Fit pipeline node.
@@ -41,9 +44,11 @@ class Node():
         Returns:
             tuple -- The keywords and their defaults
         """
-        possible_keywords, _, _, defaults, _, _, _ = inspect.getfullargspec(self.fit)
-        possible_keywords = [k for k in possible_keywords if k != 'self']
-        return possible_keywords, defaults
+        if getattr(self, "_fit_argspec", None) is None:
+            possible_keywords, _, _, defaults, _, _, _ = inspect.getfullargspec(self.fit)
+            possible_keywords = [k for k in possible_keywords if k != 'self']
+            self._fit_argspec = possible_keywords, defaults
+        return self._fit_argspec
 
     def get_predict_argspec(self):
         """Get the necessary keywords of the predict method for this node
@@ -51,9 +56,34 @@ class Node():
         Returns:
             tuple -- The keywords and their defaults
         """
-        possible_keywords, _, _, defaults, _, _, _ = inspect.getfullargspec(self.predict)
-        possible_keywords = [k for k in possible_keywords if k != 'self']
-        return possible_keywords, defaults
+        if getattr(self, "_predict_argspec", None) is None:
+            possible_keywords, _, _, defaults, _, _, _ = inspect.getfullargspec(self.predict)
+            possible_keywords = [k for k in possible_keywords if k != 'self']
+            self._predict_argspec = possible_keywords, defaults
+        return self._predict_argspec
+
+    def get_fit_plan(self):
+        """Get the execution plan of fit_traverse, starting from this node.
+        It is computed once and reused, as long as the nodes of the pipeline do not change.
+        The sources of the keywords are resolved during the traversal, because the fit outputs of the nodes may vary.
+        
+        Returns:
+            list -- Tuples (node, keywords, defaults) for each node. Defaults maps the optional keywords to their default.
+        """
+        nodes = []
+        node = self
+        while node is not None:
+            nodes.append(node)
+            node = node.child_node
+
+        if getattr(self, "_fit_plan", None) is None or [step[0] for step in self._fit_plan] != nodes:
+            self._fit_plan = []
+            for node in nodes:
+                possible_keywords, defaults = node.get_fit_argspec()
+                last_required_keyword_index = len(possible_keywords) - len(defaults or [])
+                default_values = dict(zip(possible_keywords[last_required_keyword_index:], defaults or []))
+                self._fit_plan.append((node, possible_keywords, default_values))
+        return self._fit_plan
 
     def clean_fit_data(self):
         node = self
@@ -77,7 +107,9 @@ class Node():
         """
 
         self.clean_fit_data()
-        gc.collect()
+        collect_garbage = kwargs.get("pipeline_config", None) is None or kwargs["pipeline_config"].get("force_garbage_collection", True)
+        if collect_garbage:
+            gc.collect()
 
         base = Node()
         base.fit_output = kwargs
@@ -85,24 +117,19 @@ class Node():
         # map all collected kwargs to node whose result the kwarg was
         available_kwargs = {key: base for key in kwargs.keys()}
 
-        node = self
         prev_node = base
 
-        while (node is not None):
+        for node, possible_keywords, defaults in self.get_fit_plan():
             prev_node = node
-            # get necessary kwargs of current node
-            possible_keywords, defaults = node.get_fit_argspec()
-
-            last_required_keyword_index = len(possible_keywords) - len(defaults or [])
             required_kwargs = dict()
 
             # get the values to the necessary keywords if available. Use default if not.
-            for index, keyword in enumerate(possible_keywords):
+            for keyword in possible_keywords:
                 if (keyword in available_kwargs):
                     required_kwargs[keyword] = available_kwargs[keyword].fit_output[keyword]
 
-                elif index >= last_required_keyword_index:
-                    required_kwargs[keyword] = defaults[index - last_required_keyword_index]
+                elif keyword in defaults:
+                    required_kwargs[keyword] = defaults[keyword]
 
                 else:  # Neither default specified nor keyword available
                     print ("Available keywords:", sorted(available_kwargs.keys()))
@@ -123,9 +150,9 @@ class Node():
                     if (keyword not in available_kwargs[keyword].get_predict_argspec()[0]):
                         del available_kwargs[keyword].fit_output[keyword]
                 available_kwargs[keyword] = node
-            node = node.child_node
 
-        gc.collect()
+        if collect_garbage:
+            gc.collect()
 
         return prev_node.fit_output
 
@@ -155,7 +182,9 @@ class Node():
             node.predict_output = None
             node = node.child_node
 
-        gc.collect()
+        collect_garbage = kwargs.get("pipeline_config", None) is None or kwargs["pipeline_config"].get("force_garbage_collection", True)
+        if collect_garbage:
+            gc.collect()
 
         node = self
         prev_node = base
@@ -197,7 +226,8 @@ class Node():
                 available_kwargs[keyword] = node
             node = node.child_node
             
-        gc.collect()
+        if collect_garbage:
+            gc.collect()
 
         return prev_node.predict_output
 
@@ -1,4 +1,7 @@
 import time
+import copy
+import collections
+import numpy as np
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 from autoPyTorch.pipeline.base.node import Node
 import ConfigSpace
@@ -11,6 +14,9 @@ import traceback
 class Pipeline():
     """A machine learning pipeline"""
 
+    # number of config spaces to keep
+    cache_size = 16
+
     def __init__(self, pipeline_nodes=[]):
         """Construct a Pipeline
         
@@ -20,6 +26,7 @@ class Pipeline():
         self.root = Node()
         self._pipeline_nodes = dict()
         self._parent_pipeline = None
+        self._config_space_cache = collections.OrderedDict()
 
         # add all the given nodes to the pipeline
         last_node = self.root
@@ -99,6 +106,13 @@ class Pipeline():
             assert isinstance(pipeline_config["hyperparameter_search_space_updates"], HyperparameterSearchSpaceUpdates)
             pipeline_config["hyperparameter_search_space_updates"].apply(self, pipeline_config)
 
+        # the search space only changes with the config, the dataset and the components of the nodes
+        key = (get_fingerprint(pipeline_config), get_fingerprint(dataset_info), self._get_nodes_fingerprint())
+        if key in self._config_space_cache:
+            self._config_space_cache.move_to_end(key)
+            # copy, such that the sampled configurations do not depend on previous calls
+            return copy.deepcopy(self._config_space_cache[key][0])
+
         # initialize the config space
         if "random_seed" in pipeline_config:
             cs = ConfigSpace.ConfigurationSpace(seed=pipeline_config["random_seed"])
@@ -115,6 +129,8 @@ class Pipeline():
         for name, node in self._pipeline_nodes.items():
             cs = node.insert_inter_node_hyperparameter_dependencies(cs, dataset_info=dataset_info, **pipeline_config)
 
+        # keep the config and dataset info, objects in the key are identified by their id
+        self._add_to_cache(self._config_space_cache, key, (copy.deepcopy(cs), pipeline_config, dataset_info))
         return cs
 
     def get_pipeline_config(self, throw_error_if_invalid=True, **pipeline_config):
@@ -144,6 +160,28 @@ class Pipeline():
  
         return pipeline_config
 
+    def _add_to_cache(self, cache, key, value):
+        cache[key] = value
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def _get_nodes_fingerprint(self):
+        """Fingerprint of the state of the nodes that influences the search space:
+        The search space updates and the registered components.
+        
+        Returns:
+            tuple -- The fingerprint
+        """
+        if self._parent_pipeline is not None:
+            return self._parent_pipeline._get_nodes_fingerprint()
+        fingerprint = []
+        for name, node in sorted(self._pipeline_nodes.items()):
+            components = [(attr, tuple((k, id(v)) for k, v in value.items()))
+                for attr, value in sorted(vars(node).items())
+                if isinstance(value, dict) and attr not in ["fit_output", "predict_output", "_cs_updates"]]
+            fingerprint.append((name, get_fingerprint(node._cs_updates), tuple(components)))
+        return tuple(fingerprint)
+
 
     def get_pipeline_config_options(self):
         """Get all ConfigOptions of all nodes in the pipeline.
@@ -194,3 +232,34 @@ class Pipeline():
             current_node = current_node.child_node
         
         return type(self)(pipeline_nodes)
+
+
+def get_fingerprint(value, _visited=()):
+    """Convert a value to a hashable fingerprint, such that equal configs have equal fingerprints.
+    Objects that are neither containers nor hashable are identified by their id.
+    
+    Arguments:
+        value {object} -- The value, e.g. a pipeline config or a dataset info.
+    
+    Returns:
+        object -- The hashable fingerprint.
+    """
+    if id(value) in _visited:
+        return ("id", id(value))
+    visited = _visited + (id(value), )
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted(((str(k), get_fingerprint(v, visited)) for k, v in value.items()), key=lambda x: x[0])))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(get_fingerprint(v, visited) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return ("set", frozenset(get_fingerprint(v, visited) for v in value))
+    if isinstance(value, np.ndarray):
+        return ("ndarray", value.shape, str(value.dtype), value.tobytes() if value.dtype != object else get_fingerprint(value.tolist(), visited))
+    if hasattr(value, "__dict__") and type(value).__module__.startswith("autoPyTorch") and not callable(value):
+        # e.g. dataset info or search space updates
+        return (type(value).__name__, get_fingerprint(vars(value), visited))
+    try:
+        hash(value)
+        return (type(value), value)  # 1 and True are equal, but not the same option value
+    except TypeError:
+        return ("id", id(value))
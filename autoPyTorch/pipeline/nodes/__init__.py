@@ -1,20 +1,28 @@
-from autoPyTorch.pipeline.nodes.cross_validation import CrossValidation
-from autoPyTorch.pipeline.nodes.log_functions_selector import LogFunctionsSelector
-from autoPyTorch.pipeline.nodes.loss_module_selector import LossModuleSelector
-from autoPyTorch.pipeline.nodes.lr_scheduler_selector import LearningrateSchedulerSelector
-from autoPyTorch.pipeline.nodes.metric_selector import MetricSelector
-from autoPyTorch.pipeline.nodes.network_selector import NetworkSelector
-from autoPyTorch.pipeline.nodes.optimization_algorithm import OptimizationAlgorithm
-from autoPyTorch.pipeline.nodes.optimizer_selector import OptimizerSelector
-from autoPyTorch.pipeline.nodes.embedding_selector import EmbeddingSelector
-from autoPyTorch.pipeline.nodes.train_node import TrainNode
-from autoPyTorch.pipeline.nodes.autonet_settings import AutoNetSettings
-from autoPyTorch.pipeline.nodes.normalization_strategy_selector import NormalizationStrategySelector
-from autoPyTorch.pipeline.nodes.preprocessor_selector import PreprocessorSelector
-from autoPyTorch.pipeline.nodes.imputation import Imputation
-from autoPyTorch.pipeline.nodes.one_hot_encoding import OneHotEncoding
-from autoPyTorch.pipeline.nodes.resampling_strategy_selector import ResamplingStrategySelector
-from autoPyTorch.pipeline.nodes.initialization_selector import InitializationSelector
-from autoPyTorch.pipeline.nodes.ensemble import EnableComputePredictionsForEnsemble, SavePredictionsForEnsemble, BuildEnsemble, EnsembleServer
-from autoPyTorch.pipeline.nodes.create_dataloader import CreateDataLoader
-from autoPyTorch.pipeline.nodes.create_dataset_info import CreateDatasetInfo
\ No newline at end of file
+from autoPyTorch.utils.lazy_import import lazy_import
+
+__all__ = ["CrossValidation", "LogFunctionsSelector", "LossModuleSelector", "LearningrateSchedulerSelector", "MetricSelector", "NetworkSelector", "OptimizationAlgorithm", "OptimizerSelector", "EmbeddingSelector", "TrainNode", "AutoNetSettings", "NormalizationStrategySelector", "PreprocessorSelector", "Imputation", "OneHotEncoding", "ResamplingStrategySelector", "InitializationSelector", "EnableComputePredictionsForEnsemble", "SavePredictionsForEnsemble", "BuildEnsemble", "EnsembleServer", "CreateDataLoader", "CreateDatasetInfo"]
+__getattr__, __dir__ = lazy_import(__name__, {
+    "CrossValidation": "autoPyTorch.pipeline.nodes.cross_validation",
+    "LogFunctionsSelector": "autoPyTorch.pipeline.nodes.log_functions_selector",
+    "LossModuleSelector": "autoPyTorch.pipeline.nodes.loss_module_selector",
+    "LearningrateSchedulerSelector": "autoPyTorch.pipeline.nodes.lr_scheduler_selector",
+    "MetricSelector": "autoPyTorch.pipeline.nodes.metric_selector",
+    "NetworkSelector": "autoPyTorch.pipeline.nodes.network_selector",
+    "OptimizationAlgorithm": "autoPyTorch.pipeline.nodes.optimization_algorithm",
+    "OptimizerSelector": "autoPyTorch.pipeline.nodes.optimizer_selector",
+    "EmbeddingSelector": "autoPyTorch.pipeline.nodes.embedding_selector",
+    "TrainNode": "autoPyTorch.pipeline.nodes.train_node",
+    "AutoNetSettings": "autoPyTorch.pipeline.nodes.autonet_settings",
+    "NormalizationStrategySelector": "autoPyTorch.pipeline.nodes.normalization_strategy_selector",
+    "PreprocessorSelector": "autoPyTorch.pipeline.nodes.preprocessor_selector",
+    "Imputation": "autoPyTorch.pipeline.nodes.imputation",
+    "OneHotEncoding": "autoPyTorch.pipeline.nodes.one_hot_encoding",
+    "ResamplingStrategySelector": "autoPyTorch.pipeline.nodes.resampling_strategy_selector",
+    "InitializationSelector": "autoPyTorch.pipeline.nodes.initialization_selector",
+    "EnableComputePredictionsForEnsemble": "autoPyTorch.pipeline.nodes.ensemble",
+    "SavePredictionsForEnsemble": "autoPyTorch.pipeline.nodes.ensemble",
+    "BuildEnsemble": "autoPyTorch.pipeline.nodes.ensemble",
+    "EnsembleServer": "autoPyTorch.pipeline.nodes.ensemble",
+    "CreateDataLoader": "autoPyTorch.pipeline.nodes.create_dataloader",
+    "CreateDatasetInfo": "autoPyTorch.pipeline.nodes.create_dataset_info"
+})
@@ -5,12 +5,13 @@ __license__ = "BSD"
 import logging
 import numpy as np
 import sys
+import zlib
 
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 from autoPyTorch.utils.hyperparameter_search_space_update import parse_hyperparameter_search_space_updates
 
 from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
-from hpbandster.core.result import json_result_logger
+from autoPyTorch.utils.resume import resumable_json_result_logger
 
 class AutoNetSettings(PipelineNode):
     def __init__(self):
@@ -36,16 +37,19 @@ class AutoNetSettings(PipelineNode):
         autonet_logger.info("Start autonet with config:\n" + str(pipeline_config))
         result_logger = []
         if not refit:
-            result_logger = json_result_logger(directory=pipeline_config["result_logger_dir"], overwrite=True)
+            result_logger = resumable_json_result_logger(directory=pipeline_config["result_logger_dir"], resume=pipeline_config["resume"])
         return { 'X_train': X_train, 'Y_train': Y_train, 'X_valid': X_valid, 'Y_valid': Y_valid,
             'result_loggers':  [result_logger], 'shutdownables': []}
 
     def get_pipeline_config_options(self):
         options = [
             ConfigOption(name='log_level', default='warning', type=str, choices=list(self.logger_settings.keys())),
-            ConfigOption(name='random_seed', default=lambda c: abs(hash(c["run_id"])) % (2 ** 32), type=int, depends=True, info="Make sure to specify the same seed for all workers."),
+            ConfigOption(name='random_seed', default=lambda c: zlib.crc32(str(c["run_id"]).encode()), type=int, depends=True,
+                info="Make sure to specify the same seed for all workers. Defaults to a checksum of run_id, which is equal across processes."),
             ConfigOption(name='hyperparameter_search_space_updates', default=None, type=["directory", parse_hyperparameter_search_space_updates],
                 info="object of type HyperparameterSearchSpaceUpdates"),
-            ConfigOption("result_logger_dir", default=".", type="directory")
+            ConfigOption("result_logger_dir", default=".", type="directory"),
+            ConfigOption("force_garbage_collection", default=True, type=to_bool,
+                info="Run the garbage collector before and after each traversal of the pipeline. Disable to save time on small datasets.")
         ]
         return options
\ No newline at end of file
@@ -9,27 +9,35 @@ import numpy as np
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
 from autoPyTorch.utils.config_space_hyperparameter import get_hyperparameter, add_hyperparameter
+from autoPyTorch.utils.out_of_core import is_memmap
 
 import torch
 import scipy.sparse
-from torch.utils.data import DataLoader, TensorDataset
+from torch.utils.data import DataLoader, Dataset, TensorDataset
 from torch.utils.data.dataset import Subset
 from torch.utils.data.sampler import SubsetRandomSampler
 
 
 class CreateDataLoader(PipelineNode):
 
-    def fit(self, pipeline_config, hyperparameter_config, X, Y, train_indices, valid_indices):
+    def fit(self, pipeline_config, hyperparameter_config, X, Y, train_indices, valid_indices, one_hot_encoder=None):
     
         torch.manual_seed(pipeline_config["random_seed"])
         hyperparameter_config = ConfigWrapper(self.get_name(), hyperparameter_config)
 
         # prepare data
         drop_last = hyperparameter_config['batch_size'] < train_indices.shape[0]
-        X, Y = to_dense(X), to_dense(Y)
-        X, Y = torch.from_numpy(X).float(), torch.from_numpy(Y)
-
-        train_dataset = TensorDataset(X, Y)
+        Y = to_dense(Y)
+        if scipy.sparse.issparse(X):
+            train_dataset = SparseDataset(X, Y)
+        elif is_memmap(X):
+            train_dataset = ArrayDataset(X, Y)
+        elif pipeline_config.get("feature_dtype") == "float16":
+            # store in half precision, the batches are converted to float32
+            train_dataset = HalfPrecisionDataset(X, Y, num_exact_columns=get_num_category_codes(one_hot_encoder))
+        else:
+            X, Y = torch.from_numpy(X).float(), torch.from_numpy(Y)
+            train_dataset = TensorDataset(X, Y)
         train_loader = DataLoader(
             dataset=train_dataset,
             batch_size=hyperparameter_config['batch_size'], 
@@ -48,6 +56,11 @@ class CreateDataLoader(PipelineNode):
         return {'train_loader': train_loader, 'valid_loader': valid_loader, 'batch_size': hyperparameter_config['batch_size']}
 
     def predict(self, pipeline_config, X, batch_size):
+        if is_memmap(X):
+            return {'predict_loader': DataLoader(ArrayDataset(X, np.zeros(X.shape[0], dtype=np.float32)), batch_size)}
+        if scipy.sparse.issparse(X):
+            return {'predict_loader': DataLoader(SparseDataset(X, np.zeros(X.shape[0], dtype=np.float32)), batch_size)}
+
         X = torch.from_numpy(to_dense(X)).float()
         y_placeholder = torch.zeros(X.size()[0])
 
@@ -67,6 +80,68 @@ class CreateDataLoader(PipelineNode):
         self._check_search_space_updates('batch_size')
         return cs
 
+
+class ArrayDataset(Dataset):
+    """Dataset that reads the rows of an array when they are needed, e.g. memory-mapped or half precision data.
+    The batches are converted to float tensors one at a time, the data is never loaded into memory or converted as a whole.
+    Each batch is read at once by __getitems__, which the DataLoader calls since torch 2.0."""
+
+    def __init__(self, X, Y):
+        self.X = X
+        self.Y = Y
+
+    def __len__(self):
+        return self.X.shape[0]
+
+    def __getitem__(self, index):
+        return self.__getitems__([index])[0]
+
+    def __getitems__(self, indices):
+        # read the whole batch with one access to the memory-map
+        X = torch.from_numpy(np.asarray(self.X[indices], dtype=np.float32))
+        Y = torch.from_numpy(np.asarray(self.Y[indices]))
+        return list(zip(X, Y))
+
+
+class HalfPrecisionDataset(ArrayDataset):
+    """Dataset that stores the features in half precision. Half precision represents integers exactly only up to 2048,
+    therefore the first num_exact_columns columns, e.g. category codes, are stored in single precision."""
+
+    def __init__(self, X, Y, num_exact_columns=0):
+        super(HalfPrecisionDataset, self).__init__(X[:, num_exact_columns:].astype(np.float16), Y)
+        self.X_exact = X[:, :num_exact_columns].astype(np.float32)
+
+    def __getitems__(self, indices):
+        X = torch.from_numpy(np.concatenate([self.X_exact[indices], self.X[indices].astype(np.float32)], axis=1))
+        Y = torch.from_numpy(np.asarray(self.Y[indices]))
+        return list(zip(X, Y))
+
+
+class SparseDataset(ArrayDataset):
+    """Dataset of sparse data, e.g. wide one-hot encodings. Only the rows of a batch are densified."""
+
+    def __init__(self, X, Y):
+        super(SparseDataset, self).__init__(scipy.sparse.csr_matrix(X), Y)
+
+    def __getitems__(self, indices):
+        X = torch.from_numpy(self.X[indices].toarray().astype(np.float32, copy=False))
+        Y = torch.from_numpy(np.asarray(self.Y[indices]))
+        return list(zip(X, Y))
+
+
+def get_num_category_codes(one_hot_encoder):
+    """Get the number of columns with category codes. The encoder puts them in front of the other columns.
+
+    Arguments:
+        one_hot_encoder {ColumnTransformer} -- The encoder of the categorical features, None if they are not encoded.
+
+    Returns:
+        int -- The number of columns with category codes.
+    """
+    if one_hot_encoder is None or not getattr(one_hot_encoder, "category_codes", False) or not len(one_hot_encoder.categories_):
+        return 0
+    return sum(1 for c in one_hot_encoder.categorical_features if c)
+
     
 def to_dense(matrix):
     if (matrix is not None and scipy.sparse.issparse(matrix)):
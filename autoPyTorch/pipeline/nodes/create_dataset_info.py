@@ -11,6 +11,8 @@ from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 
 from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
 from autoPyTorch.utils.config.config_file_parser import ConfigFileParser
+from autoPyTorch.utils.data_profile import DataProfileCache
+from autoPyTorch.utils.out_of_core import is_memmap
 
 
 class DataSetInfo():
@@ -22,12 +24,18 @@ class DataSetInfo():
         self.x_max_value = None
         self.is_sparse = False
         self.name = None
+        self.categories = None  # categories of the categorical features, if they are known
+        self.profiles = DataProfileCache()  # statistics of the splits of the data
+        self.cache_dir = None  # directory where statistics of the data are shared with evaluations in other processes
+        self.feature_dtype = None  # data type of the features during preprocessing
 
 class CreateDatasetInfo(PipelineNode):
 
     def fit(self, pipeline_config, X_train, Y_train, X_valid, Y_valid):
         info = DataSetInfo()
         info.is_sparse = scipy.sparse.issparse(X_train)
+        info.feature_dtype = get_preprocessing_dtype(pipeline_config.get('feature_dtype', 'float64'))
+        X_train, X_valid = to_dtype(X_train, info.feature_dtype), to_dtype(X_valid, info.feature_dtype)
 
         info.x_shape = X_train.shape
         info.y_shape = Y_train.shape
@@ -53,8 +61,23 @@ class CreateDatasetInfo(PipelineNode):
         options = [
             ConfigOption(name='categorical_features', default=None, type=to_bool, list=True,
                 info='List of booleans that specifies for each feature whether it is categorical.'),
-            ConfigOption(name='dataset_name', default=None, type=str)
+            ConfigOption(name='dataset_name', default=None, type=str),
+            ConfigOption(name='feature_dtype', default='float32', type=str, choices=['float64', 'float32', 'float16'],
+                info='Data type of the features. float16 is only used to store the preprocessed features, batches are converted to float32.')
         ]
         return options
+
+
+def get_preprocessing_dtype(feature_dtype):
+    """Get the data type the features are preprocessed in. Half precision is not accurate enough for preprocessing."""
+    return np.float32 if np.dtype(feature_dtype) == np.float16 else np.dtype(feature_dtype).type
+
+
+def to_dtype(X, dtype):
+    """Convert the features to the given data type, without copying them if they already have it.
+    Memory-mapped features are not read into memory, they are converted chunk by chunk when they are preprocessed."""
+    if X is None or is_memmap(X) or X.dtype == dtype:
+        return X
+    return X.astype(dtype)
             
 
@@ -19,7 +19,9 @@ from autoPyTorch.pipeline.base.sub_pipeline_node import SubPipelineNode
 from autoPyTorch.pipeline.base.pipeline import Pipeline
 
 from autoPyTorch.utils.config.config_option import ConfigOption, to_bool, to_dict
-from autoPyTorch.components.training.budget_types import BudgetTypeTime
+from autoPyTorch.components.training.budget_types import BudgetTypeTime, BudgetTypeDataFraction
+from autoPyTorch.components.training.job_cancellation import JobCancellation, is_partial_result
+from autoPyTorch.utils.out_of_core import is_memmap, concat_memmaps
 
 import time
 
@@ -50,7 +52,7 @@ class CrossValidation(SubPipelineNode):
 
 
     def fit(self, hyperparameter_config, pipeline_config, X_train, Y_train, X_valid, Y_valid, budget, budget_type, optimize_start_time,
-            refit, rescore, dataset_info):
+            refit, rescore, dataset_info, hyperparameter_config_id=None):
         """Perform cross validation.
         
         Arguments:
@@ -67,6 +69,9 @@ class CrossValidation(SubPipelineNode):
             rescore {bool} -- Whether we refit in order to get the exact score of a hp-config during training.
             dataset_info {DatasetInfo} -- Object containing information about the dataset.
         
+        Keyword Arguments:
+            hyperparameter_config_id {tuple} -- The id of the configuration assigned by the optimization algorithm (default: {None})
+        
         Raises:
             Exception: Not a single CV split could be finished.
         
@@ -76,9 +81,10 @@ class CrossValidation(SubPipelineNode):
         logger = logging.getLogger('autonet')
         loss = 0
         infos = []
+        cancelled = False
         X, Y, num_cv_splits, cv_splits, loss_penalty, budget = self.initialize_cross_validation(
             pipeline_config=pipeline_config, budget=budget, X_train=X_train, Y_train=Y_train, X_valid=X_valid, Y_valid=Y_valid,
-            dataset_info=dataset_info, refit=(refit and not rescore), logger=logger)
+            dataset_info=dataset_info, refit=(refit and not rescore), logger=logger, budget_type=budget_type)
         
         # adjust budget in case of budget type time
         cv_start_time = time.time()
@@ -97,15 +103,21 @@ class CrossValidation(SubPipelineNode):
                 cv_start_time=cv_start_time, num_cv_splits=num_cv_splits, logger=logger)
             sub_pipeline_kwargs = {
                 "hyperparameter_config": hyperparameter_config, "pipeline_config": pipeline_config,
-                "budget": cur_budget, "training_techniques": [budget_type()],
+                "budget": cur_budget, "training_techniques": [budget_type()] + ([JobCancellation(hyperparameter_config_id)] if not refit else []),
                 "fit_start_time": time.time(),
                 "train_indices": split_indices[0],
                 "valid_indices": split_indices[1],
                 "dataset_info": deepcopy(dataset_info),
                 "refit": refit,
-                "loss_penalty": loss_penalty}
+                "loss_penalty": loss_penalty,
+                "hyperparameter_config_id": hyperparameter_config_id,
+                "cv_index": i}
             all_sub_pipeline_kwargs[i] = deepcopy(sub_pipeline_kwargs)
-            result = self.sub_pipeline.fit_pipeline(X=X, Y=Y, **sub_pipeline_kwargs)
+            X_split, Y_split = X, Y
+            if budget_type == BudgetTypeDataFraction and cur_budget < 1:
+                X_split, Y_split = self.subsample_training_data(X=X, Y=Y, sub_pipeline_kwargs=sub_pipeline_kwargs,
+                    fraction=cur_budget, seed=pipeline_config["random_seed"], logger=logger)
+            result = self.sub_pipeline.fit_pipeline(X=X_split, Y=Y_split, **sub_pipeline_kwargs)
             logger.info("[AutoNet] Done with current split!")
 
             if result is not None:
@@ -113,6 +125,12 @@ class CrossValidation(SubPipelineNode):
                 infos.append(result['info'])
                 additional_results[i] = {key: value for key, value in result.items() if key not in ["loss", "info"]}
 
+                # optimization reached its runtime limit. Report the splits finished so far.
+                if is_partial_result(result):
+                    logger.info("[AutoNet] Training has been cancelled. Skip remaining splits.")
+                    cancelled = True
+                    break
+
         if (len(infos) == 0):
             raise Exception("Could not finish a single cv split due to memory or time limitation")
 
@@ -121,7 +139,12 @@ class CrossValidation(SubPipelineNode):
         additional_results = self.process_additional_results(additional_results=additional_results, all_sub_pipeline_kwargs=all_sub_pipeline_kwargs,
             X=X, Y=Y, logger=logger)
         #TODO save results accross folds
-        loss = loss / num_cv_splits + loss_penalty
+        if cancelled:
+            # average over the splits trained so far. The info of the cancelled split marks the result as partial,
+            # such that it is neither cached nor reused when resuming.
+            loss = loss / len(infos) + loss_penalty
+        else:
+            loss = loss / num_cv_splits + loss_penalty
         logger.debug("Send additional results %s to master" % str(additional_results))
         return dict({'loss': loss, 'info': infos}, **additional_results)
 
@@ -153,7 +176,7 @@ class CrossValidation(SubPipelineNode):
         super(CrossValidation, self).clean_fit_data()
         self.sub_pipeline.root.clean_fit_data()
     
-    def initialize_cross_validation(self, pipeline_config, budget, X_train, Y_train, X_valid, Y_valid, dataset_info, refit, logger):
+    def initialize_cross_validation(self, pipeline_config, budget, X_train, Y_train, X_valid, Y_valid, dataset_info, refit, logger, budget_type=None):
         """Initialize CV by computing split indices, 
         
         Arguments:
@@ -167,6 +190,9 @@ class CrossValidation(SubPipelineNode):
             refit {bool} -- Wether we currently perform a refit.
             logger {Logger} -- Logger to log stuff on the console.
         
+        Keyword Arguments:
+            budget_type {BaseTrainingTechnique} -- The type of budget (default: {None})
+        
         Returns:
             tuple -- X, Y, number of splits, split indices, a penalty added to the loss, the budget for each cv split
         """
@@ -225,6 +251,8 @@ class CrossValidation(SubPipelineNode):
         train_indices, valid_indices = indices[:split], indices[split:]
         valid_indices = None if val_split == 0 else valid_indices
         logger.info("[Autonet] No cross validation when refitting! Continue by splitting " + str(val_split) + " of training data.")
+        if budget_type == BudgetTypeDataFraction:
+            return X_train, Y_train, 1, [(train_indices, valid_indices)], 0, budget
         return X_train, Y_train, 1, [(train_indices, valid_indices)], 0, budget / num_cv_splits
 
     def add_cross_validator(self, name, cross_validator, adjust_y=None):
@@ -257,10 +285,39 @@ class CrossValidation(SubPipelineNode):
             cur_budget = remaining_budget / (num_cv_splits - cv_index)
             logger.info("Reduced initial budget " + str(budget / num_cv_splits) + " to cv budget " + 
                                 str(cur_budget) + " compensate for " + str(should_be_remaining_budget - remaining_budget))
+        elif budget_type == BudgetTypeDataFraction:
+            # each split trains on the given fraction of its own training data
+            cur_budget = budget
         else:
             cur_budget = budget / num_cv_splits
         return cur_budget
     
+    def subsample_training_data(self, X, Y, sub_pipeline_kwargs, fraction, seed, logger):
+        """Restrict the data to a nested subsample of the training data and the complete validation data.
+        The train and valid indices in sub_pipeline_kwargs are replaced by indices into the returned data.
+        
+        Arguments:
+            X {array} -- The data.
+            Y {array} -- The targets.
+            sub_pipeline_kwargs {dict} -- The kwargs for the sub pipeline of the current split.
+            fraction {float} -- The fraction of the training data to use.
+            seed {int} -- A random seed.
+            logger {Logger} -- A logger to log stuff on the console.
+        
+        Returns:
+            tuple -- The subsampled data and targets.
+        """
+        train_indices = BudgetTypeDataFraction.get_nested_subsample(sub_pipeline_kwargs["train_indices"], Y, fraction, seed)
+        valid_indices = sub_pipeline_kwargs["valid_indices"]
+        indices = train_indices if valid_indices is None else np.concatenate([train_indices, valid_indices])
+        logger.info("Train on " + str(len(train_indices)) + " of " + str(len(sub_pipeline_kwargs["train_indices"])) + " training samples")
+
+        sub_pipeline_kwargs["train_indices"] = np.arange(len(train_indices))
+        sub_pipeline_kwargs["valid_indices"] = None if valid_indices is None else np.arange(len(train_indices), len(indices))
+        sub_pipeline_kwargs["dataset_info"].x_shape = (len(indices), ) + tuple(X.shape[1:])
+        sub_pipeline_kwargs["dataset_info"].y_shape = (len(indices), ) + tuple(Y.shape[1:])
+        return X[indices], Y[indices]
+
     def process_additional_results(self, additional_results, all_sub_pipeline_kwargs, X, Y, logger):
         """Process additional results, like predictions for ensemble for example.
         The data of additional results will be combined across the splits.
@@ -305,6 +362,8 @@ class CrossValidation(SubPipelineNode):
         """
         if (scipy.sparse.issparse(upper)):
             return scipy.sparse.vstack([upper, lower])
+        elif is_memmap(upper) or is_memmap(lower):
+            return concat_memmaps(upper, lower)
         else:
             return np.concatenate([upper, lower])
 
@@ -122,5 +122,6 @@ class EnsembleServer(PipelineNode):
             pipeline_config["ensemble_server_credentials"] = (host, port)
             shutdownables = shutdownables + [process]
 
-        result_loggers = [ensemble_logger(directory=pipeline_config["result_logger_dir"], overwrite=True)] + result_loggers
+        result_loggers = [ensemble_logger(directory=pipeline_config["result_logger_dir"], overwrite=True,
+            append=pipeline_config["resume"])] + result_loggers
         return {"result_loggers": result_loggers, "shutdownables": shutdownables}
@@ -5,6 +5,7 @@ __license__ = "BSD"
 import logging
 import numpy as np
 import sys, os
+import zlib
 import pprint
 
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
@@ -56,7 +57,8 @@ class AutoNetSettingsNoShuffle(PipelineNode):
     def get_pipeline_config_options(self):
         options = [
             ConfigOption(name='log_level', default='warning', type=str, choices=list(self.logger_settings.keys())),
-            ConfigOption(name='random_seed', default=lambda c: abs(hash(c["run_id"])) % (2 ** 32), type=int, depends=True, info="Make sure to specify the same seed for all workers."),
+            ConfigOption(name='random_seed', default=lambda c: zlib.crc32(str(c["run_id"]).encode()), type=int, depends=True,
+                info="Make sure to specify the same seed for all workers. Defaults to a checksum of run_id, which is equal across processes."),
             ConfigOption(name='hyperparameter_search_space_updates', default=None, type=["directory", parse_hyperparameter_search_space_updates],
                 info="object of type HyperparameterSearchSpaceUpdates"),
         ]
@@ -7,11 +7,13 @@ import ConfigSpace.hyperparameters as CSH
         
 from sklearn.impute import SimpleImputer
 from sklearn.compose import ColumnTransformer
+from sklearn.base import BaseEstimator, TransformerMixin
 
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 
 from autoPyTorch.utils.config.config_option import ConfigOption
 from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
+from autoPyTorch.utils.out_of_core import is_memmap, transform_in_chunks, subsample_rows
 
 class Imputation(PipelineNode):
 
@@ -23,21 +25,35 @@ class Imputation(PipelineNode):
         if dataset_info.is_sparse:
             return {'imputation_preprocessor': None, 'all_nan_columns': None}
 
+        # the statistics of the split are computed once and shared by all configurations
+        profile = dataset_info.profiles.get(X, train_indices, dataset_info.categorical_features, directory=getattr(dataset_info, "cache_dir", None))
+
         # delete all nan columns
-        all_nan = np.all(np.isnan(X[train_indices]), axis=0)
-        X = X[:, ~all_nan]
+        all_nan = profile.all_nan
+        categorical_columns = [i for i, c in enumerate(dataset_info.categorical_features) if c and not all_nan[i]]
         dataset_info.categorical_features = [dataset_info.categorical_features[i] for i, is_nan in enumerate(all_nan) if not is_nan]
 
         strategy = hyperparameter_config['strategy']
-        fill_value = int(np.nanmax(X[train_indices])) + 1 if not dataset_info.is_sparse else 0
-        numerical_imputer = SimpleImputer(strategy=strategy, copy=False)
-        categorical_imputer = SimpleImputer(strategy='constant', copy=False, fill_value=fill_value)
-        transformer = ColumnTransformer(
-            transformers=[('numerical_imputer', numerical_imputer, [i for i, c in enumerate(dataset_info.categorical_features) if not c]),
-                          ('categorical_imputer', categorical_imputer,  [i for i, c in enumerate(dataset_info.categorical_features) if c])])
-        transformer.fit(X[train_indices])
-        X = transformer.transform(X)
-        
+        fill_value = int(np.max(profile.max[~all_nan])) + 1
+        if is_memmap(X):
+            # memory-mapped data is never read into memory as a whole
+            transformer = MemmapImputer(strategy=strategy, fill_value=fill_value, categorical_features=dataset_info.categorical_features)
+            transformer.fit(X, train_indices, profile)
+            X = impute_in_chunks(transformer, X, all_nan, dtype=getattr(dataset_info, "feature_dtype", None))
+        else:
+            numerical_imputer = SimpleImputer(strategy=strategy, copy=False)
+            categorical_imputer = SimpleImputer(strategy='constant', copy=False, fill_value=fill_value)
+            transformer = ColumnTransformer(
+                transformers=[('numerical_imputer', numerical_imputer, [i for i, c in enumerate(dataset_info.categorical_features) if not c]),
+                              ('categorical_imputer', categorical_imputer,  [i for i, c in enumerate(dataset_info.categorical_features) if c])])
+            X = X[:, ~all_nan]
+            transformer.fit(X[train_indices])
+            X = transformer.transform(X)
+
+        # categories of the categorical columns after imputation, in the order of the imputed columns
+        dataset_info.categories = [np.union1d(profile.categories[i], [fill_value]) if profile.has_nan[i] else profile.categories[i]
+            for i in categorical_columns]
+
         dataset_info.categorical_features = sorted(dataset_info.categorical_features)
         return { 'X': X, 'imputation_preprocessor': transformer, 'dataset_info': dataset_info , 'all_nan_columns': all_nan}
 
@@ -45,6 +61,8 @@ class Imputation(PipelineNode):
     def predict(self, X, imputation_preprocessor, all_nan_columns):
         if imputation_preprocessor is None:
             return dict()
+        if is_memmap(X):
+            return { 'X': impute_in_chunks(imputation_preprocessor, X, all_nan_columns) }
         X = X[:, ~all_nan_columns]
         X = imputation_preprocessor.transform(X)
         return { 'X': X }
@@ -63,4 +81,77 @@ class Imputation(PipelineNode):
             ConfigOption(name='imputation_strategies', default=Imputation.strategies, type=str, list=True, choices=Imputation.strategies)
         ]
         return options
-        
\ No newline at end of file
+
+
+class MemmapImputer(BaseEstimator, TransformerMixin):
+    """Imputes memory-mapped data like the ColumnTransformer of SimpleImputers used for in-memory data.
+    Returns the numerical columns followed by the categorical columns. The all nan columns must have been deleted.
+    The mean is taken from the profile of the training rows. Median and most frequent value are computed on a subsample
+    of the training rows (see out_of_core.FIT_SUBSAMPLE_ROWS), such that the training rows are not read into memory at once.
+    """
+
+    def __init__(self, strategy, fill_value, categorical_features):
+        """Initialize the imputer.
+
+        Arguments:
+            strategy {str} -- Imputation strategy of the numerical columns: mean, median or most_frequent.
+            fill_value {float} -- Value of the missing values in categorical columns.
+            categorical_features {list} -- For each column without the all nan columns whether it is categorical.
+        """
+        self.strategy = strategy
+        self.fill_value = fill_value
+        self.categorical_features = categorical_features
+
+    def fit(self, X, train_indices, profile):
+        """Compute the values to fill in.
+
+        Arguments:
+            X {np.memmap} -- The data, including all nan columns.
+            train_indices {array} -- The indices of the training rows.
+            profile {DataProfile} -- The profile of the training rows.
+
+        Returns:
+            MemmapImputer -- self
+        """
+        numerical = [i for i, c in enumerate(self.categorical_features) if not c]
+        categorical = [i for i, c in enumerate(self.categorical_features) if c]
+        mean = profile.mean[~profile.all_nan][numerical]
+
+        statistics = mean
+        if self.strategy != "mean" and len(numerical) > 0:
+            subsample = np.asarray(X[subsample_rows(train_indices)], dtype=np.float64)[:, ~profile.all_nan][:, numerical]
+            statistics = np.array([most_frequent(column[~np.isnan(column)]) if self.strategy == "most_frequent" else
+                np.median(column[~np.isnan(column)]) if np.any(~np.isnan(column)) else np.nan for column in subsample.T])
+            # columns without values in the subsample
+            statistics = np.where(np.isnan(statistics), mean, statistics)
+
+        self.columns_ = np.array(numerical + categorical, dtype=int)
+        self.statistics_ = np.concatenate([statistics, np.full(len(categorical), self.fill_value, dtype=np.float64)])
+        return self
+
+    def transform(self, X):
+        """Select the columns, numerical first, and fill in the missing values.
+
+        Arguments:
+            X {array} -- The data without the all nan columns.
+
+        Returns:
+            array -- The imputed data.
+        """
+        X = np.array(X[:, self.columns_], dtype=np.result_type(X.dtype, np.float64))
+        is_nan = np.isnan(X)
+        X[is_nan] = np.take(self.statistics_, np.nonzero(is_nan)[1])
+        return X
+
+
+def most_frequent(values):
+    """The most frequent of the given values. The smallest one, if there are several, as in SimpleImputer. Nan, if there are no values."""
+    if len(values) == 0:
+        return np.nan
+    unique_values, counts = np.unique(values, return_counts=True)
+    return unique_values[np.argmax(counts)]
+
+
+def impute_in_chunks(imputation_preprocessor, X, all_nan_columns, dtype=None):
+    """Delete the all nan columns and impute memory-mapped data in chunks of rows. The result is converted to dtype, if given."""
+    return transform_in_chunks(lambda chunk: imputation_preprocessor.transform(chunk[:, ~all_nan_columns]), X, dtype=dtype)
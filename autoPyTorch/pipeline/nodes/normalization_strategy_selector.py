@@ -6,6 +6,7 @@ from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 from autoPyTorch.utils.config.config_option import ConfigOption
 from autoPyTorch.components.preprocessing.preprocessor_base import PreprocessorBase
 from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
+from autoPyTorch.utils.out_of_core import is_memmap, transform_in_chunks, fit_in_chunks
 import ConfigSpace
 import ConfigSpace.hyperparameters as CSH
 from sklearn.compose import ColumnTransformer
@@ -26,14 +27,21 @@ class NormalizationStrategySelector(PipelineNode):
             return {'normalizer': None}
 
         normalizer = self.normalization_strategies[normalizer_name]()
+        if 'copy' in normalizer.get_params():
+            # the transformer passes a copy of the numerical columns to the normalizer
+            normalizer.set_params(copy=False)
 
         transformer = ColumnTransformer(
             transformers=[("normalize", normalizer, [i for i, c in enumerate(dataset_info.categorical_features) if not c])],
             remainder='passthrough'
         )
-        transformer.fit(X[train_indices])
+        if is_memmap(X):
+            # memory-mapped data is never read into memory as a whole
+            fit_in_chunks(transformer, X, train_indices)
+        else:
+            transformer.fit(X[train_indices])
 
-        X = transformer.transform(X)
+        X = transform_in_chunks(transformer.transform, X, dtype=getattr(dataset_info, "feature_dtype", None)) if is_memmap(X) else transformer.transform(X)
         
         dataset_info.categorical_features = sorted(dataset_info.categorical_features)
 
@@ -42,7 +50,7 @@ class NormalizationStrategySelector(PipelineNode):
     def predict(self, X, normalizer):
         if normalizer is None:
             return {'X': X}
-        return {'X': normalizer.transform(X)}
+        return {'X': transform_in_chunks(normalizer.transform, X) if is_memmap(X) else normalizer.transform(X)}
 
     def add_normalization_strategy(self, name, normalization_type, is_default_normalization_strategy=False):
         """Add a normalization strategy.
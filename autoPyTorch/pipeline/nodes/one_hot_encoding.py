@@ -4,39 +4,118 @@ __license__ = "BSD"
 
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
+from autoPyTorch.utils.out_of_core import is_memmap, get_chunk_rows, transform_in_chunks
+from autoPyTorch.utils.data_profile import DataProfile
+from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
 import numpy as np
 import scipy.sparse
 
+
+class CategoryCodeEncoder(OneHotEncoder):
+    """Encodes each categorical feature as a single column of category codes instead of expanding it to one column per category.
+    The codes index categories_. Unknown categories get the code len(categories_[i]), the analogon of an all-zero one-hot vector."""
+
+    def transform(self, X):
+        X = np.asarray(X)
+        codes = np.empty(X.shape, dtype=self.dtype)
+        for i, categories in enumerate(self.categories_):
+            column = X[:, i]
+            code = np.minimum(np.searchsorted(categories, column), max(len(categories) - 1, 0))
+            known = (categories[code] == column) | (np.isnan(categories[code]) & np.isnan(column)) if len(categories) else np.zeros(len(column), dtype=bool)
+            codes[:, i] = np.where(known, code, len(categories))
+        return codes
+
+    def fit_transform(self, X, y=None):
+        return self.fit(X).transform(X)
+
+
 class OneHotEncoding(PipelineNode):
     def __init__(self):
         super(OneHotEncoding, self).__init__()
         self.encode_Y = False
 
-    def fit(self, pipeline_config, X, Y, dataset_info):
+    def fit(self, pipeline_config, X, Y, dataset_info, hyperparameter_config=None):
         categorical_features = dataset_info.categorical_features
-        ohe = OneHotEncoder(categories="auto", sparse=False, handle_unknown="ignore")
+        use_category_codes = self.use_category_codes(hyperparameter_config)
+        # keep the data type of the features, e.g. float32
+        dtype = X.dtype if np.issubdtype(X.dtype, np.floating) else np.float64
+        ohe = (CategoryCodeEncoder if use_category_codes else OneHotEncoder)(categories="auto", sparse=False, handle_unknown="ignore", dtype=dtype)
         encoder = ColumnTransformer(transformers=[("ohe", ohe, [i for i, f in enumerate(categorical_features) if f])], remainder="passthrough")
         encoder.categories_ = np.array([])
         encoder.categorical_features = categorical_features
+        encoder.category_codes = use_category_codes
 
         if any(categorical_features) and not dataset_info.is_sparse:
+            categories = getattr(dataset_info, "categories", None)
+            if categories is None:
+                # collect the categories in a single pass over the data (in chunks, if the data is memory-mapped)
+                profile = DataProfile(X, [], categorical_features)
+                categories = [np.append(c, np.nan) if profile.has_nan[i] else c for i, c in enumerate(profile.categories) if c is not None]
+            # the categories are known, the encoder does not need to scan the data
+            ohe.set_params(categories=categories)
+
+            # keep wide one-hot encodings sparse. The data loader densifies them batch by batch.
+            sparse_threshold = pipeline_config.get("sparse_one_hot_threshold")
+            if not use_category_codes and not is_memmap(X) and sparse_threshold is not None and 0 <= sparse_threshold < sum(len(c) for c in categories):
+                ohe.set_params(sparse=True)
+                encoder.set_params(sparse_threshold=1.0)
+
             # encode X
-            X = encoder.fit_transform(X)
+            if is_memmap(X):
+                encoder.fit(X[:get_chunk_rows(X)])
+                X = transform_in_chunks(encoder.transform, X)
+            else:
+                X = encoder.fit_transform(X)
+            if scipy.sparse.issparse(X):
+                X = X.tocsr()
             encoder.categories_ = encoder.transformers_[0][1].categories_
 
         # Y to matrix
         Y, y_encoder = self.complete_y_tranformation(Y)
 
         dataset_info.categorical_features = None
+        dataset_info.categories = None
         return {'X': X, 'one_hot_encoder': encoder, 'Y': Y, 'y_one_hot_encoder': y_encoder, 'dataset_info': dataset_info}
 
     def predict(self, pipeline_config, X, one_hot_encoder):
         categorical_features = pipeline_config["categorical_features"]
         if categorical_features and any(categorical_features) and not scipy.sparse.issparse(X):
-            X = one_hot_encoder.transform(X)
+            X = transform_in_chunks(one_hot_encoder.transform, X) if is_memmap(X) else one_hot_encoder.transform(X)
+            if scipy.sparse.issparse(X):
+                X = X.tocsr()
         return {'X': X, 'one_hot_encoder': one_hot_encoder}
+
+    def get_pipeline_config_options(self):
+        options = [
+            ConfigOption(name="sparse_one_hot_threshold", default=1000, type=int,
+                info="Keep the one-hot encoding of the categorical features sparse, if it has more columns than this. -1 to always encode dense."),
+        ]
+        return options
+
+    def use_category_codes(self, hyperparameter_config):
+        """Whether the categorical features should be encoded as category codes, because the selected embedding looks them up.
+        Feature preprocessors other than 'none' consume the one-hot encoding and drop the encoder, the embedding is skipped then.
+
+        Arguments:
+            hyperparameter_config {dict} -- The sampled hyperparameter config.
+
+        Returns:
+            bool -- True if the embedding consumes category codes, False if it needs the one-hot encoding.
+        """
+        from autoPyTorch.pipeline.nodes.embedding_selector import EmbeddingSelector
+        from autoPyTorch.pipeline.nodes.preprocessor_selector import PreprocessorSelector
+        if hyperparameter_config is None or self.pipeline is None or EmbeddingSelector.get_name() not in self.pipeline:
+            return False
+        if PreprocessorSelector.get_name() in self.pipeline:
+            preprocessor_config = ConfigWrapper(PreprocessorSelector.get_name(), hyperparameter_config)
+            if 'preprocessor' in preprocessor_config and preprocessor_config['preprocessor'] != 'none':
+                return False
+        embedding_selector = self.pipeline[EmbeddingSelector.get_name()]
+        hyperparameter_config = ConfigWrapper(EmbeddingSelector.get_name(), hyperparameter_config)
+        embedding_name = hyperparameter_config['embedding'] if 'embedding' in hyperparameter_config else 'none'
+        return getattr(embedding_selector.embedding_modules.get(embedding_name), "uses_category_codes", False)
     
     def reverse_transform_y(self, Y, y_one_hot_encoder):
         if y_one_hot_encoder is None:
@@ -2,10 +2,13 @@
 import numpy as np
 import os
 import time
+import pickle
+import socket
 import shutil
-import netifaces
+import glob
 import traceback
 import logging
+import math
 
 from hpbandster.core.nameserver import NameServer, nic_name_to_host
 from hpbandster.core.result import logged_results_to_HBS_result
@@ -18,9 +21,15 @@ from autoPyTorch.utils.config.config_condition import ConfigCondition
 
 from autoPyTorch.core.hpbandster_extensions.bohb_ext import BOHBExt
 from autoPyTorch.core.hpbandster_extensions.hyperband_ext import HyperBandExt
+from autoPyTorch.core.hpbandster_extensions.local_dispatcher import local_dispatcher
 from autoPyTorch.core.worker import AutoNetWorker
+from autoPyTorch.utils.resume import restore_logged_results
+from autoPyTorch.utils.evaluation_cache import EvaluationCache
+from autoPyTorch.utils.cost_model import CostModel
+from autoPyTorch.utils.learning_curves import LEARNING_CURVES_FILE, LearningCurveReader
 
-from autoPyTorch.components.training.budget_types import BudgetTypeTime, BudgetTypeEpochs, BudgetTypeTrainingTime
+from autoPyTorch.components.training.job_cancellation import get_job_cancel_file
+from autoPyTorch.components.training.budget_types import BudgetTypeTime, BudgetTypeEpochs, BudgetTypeTrainingTime, BudgetTypeDataFraction, BudgetTypeSteps
 import copy
 
 class OptimizationAlgorithm(SubPipelineNode):
@@ -58,6 +67,8 @@ class OptimizationAlgorithm(SubPipelineNode):
         self.budget_types["time"] = BudgetTypeTime
         self.budget_types["epochs"] = BudgetTypeEpochs
         self.budget_types["training_time"] = BudgetTypeTrainingTime
+        self.budget_types["data_fraction"] = BudgetTypeDataFraction
+        self.budget_types["steps"] = BudgetTypeSteps
 
     def fit(self, pipeline_config, X_train, Y_train, X_valid, Y_valid, result_loggers, dataset_info, shutdownables, refit=None):
         """Run the optimization algorithm.
@@ -106,26 +117,47 @@ class OptimizationAlgorithm(SubPipelineNode):
                     'loss': loss_info_dict['loss'],
                     'info': loss_info_dict['info']}
 
+        if pipeline_config["budget_type"] == "steps":
+            self.set_default_step_budgets(pipeline_config, dataset_info, logger)
+
+        # Restore interrupted run
+        previous_run = {"previous_result": None, "elapsed_time": 0, "num_finished_iterations": 0, "evaluated_results": dict()}
+        if pipeline_config["resume"] and task_id in [1, -1]:
+            previous_run = self.restore_previous_run(pipeline_config, logger)
+
+        # statistics of the data are shared through files, because each evaluation runs in its own process with pynisher
+        tmp_cache_dir = os.path.join(pipeline_config["working_dir"], "tmp_cache_" + str(run_id))
+        if dataset_info is not None:
+            os.makedirs(tmp_cache_dir, exist_ok=True)
+            dataset_info.cache_dir = tmp_cache_dir
+
         # Start Optimization Algorithm
         try:
             ns_credentials_dir, tmp_models_dir, network_interface_name = self.prepare_environment(pipeline_config)
 
+            # local runs do not need any networking
+            in_process = task_id == -1 and pipeline_config["in_process_dispatcher"]
+
             # start nameserver if not on cluster or on master node in cluster
-            if task_id in [1, -1]:
+            ns_host, ns_port, NS = None, None, None
+            if task_id in [1, -1] and not in_process:
                 NS = self.get_nameserver(run_id, task_id, ns_credentials_dir, network_interface_name)
                 ns_host, ns_port = NS.start()
                 
+            worker = None
             if task_id != 1 or pipeline_config["run_worker_on_master_node"]:
-                self.run_worker(pipeline_config=pipeline_config, run_id=run_id, task_id=task_id, ns_credentials_dir=ns_credentials_dir,
+                worker = self.run_worker(pipeline_config=pipeline_config, run_id=run_id, task_id=task_id, ns_credentials_dir=ns_credentials_dir,
                     network_interface_name=network_interface_name, X_train=X_train, Y_train=Y_train, X_valid=X_valid, Y_valid=Y_valid,
-                    dataset_info=dataset_info, shutdownables=shutdownables)
+                    dataset_info=dataset_info, shutdownables=shutdownables, evaluated_results=previous_run["evaluated_results"],
+                    ns_host=ns_host, ns_port=ns_port, in_process=in_process)
 
             # start BOHB if not on cluster or on master node in cluster
             res = None
             if task_id in [1, -1]:
                 self.run_optimization_algorithm(pipeline_config=pipeline_config, run_id=run_id, ns_host=ns_host,
-                    ns_port=ns_port, nameserver=NS, task_id=task_id, result_loggers=result_loggers,
-                    dataset_info=dataset_info, logger=logger)
+                    ns_port=ns_port, nameserver=NS, task_id=task_id, result_loggers=result_loggers, local_worker=worker if in_process else None,
+                    dataset_info=dataset_info, logger=logger, previous_result=previous_run["previous_result"],
+                    elapsed_time=previous_run["elapsed_time"], num_finished_iterations=previous_run["num_finished_iterations"])
    
             
                 res = self.parse_results(pipeline_config)
@@ -135,6 +167,10 @@ class OptimizationAlgorithm(SubPipelineNode):
             traceback.print_exc()
         finally:
             self.clean_up(pipeline_config, ns_credentials_dir, tmp_models_dir)
+            if dataset_info is not None:
+                dataset_info.cache_dir = None
+                if task_id in [1, -1]:
+                    shutil.rmtree(tmp_cache_dir, ignore_errors=True)
 
         if res:
             return res
@@ -168,7 +204,7 @@ class OptimizationAlgorithm(SubPipelineNode):
                 type=float, depends=True, info="Total time for the run."),
             ConfigOption("num_iterations", 
                 default=lambda c:  (-int(np.log(c["min_budget"] / c["max_budget"]) / np.log(c["eta"])) + 1)
-                        if c["budget_type"] == "epochs" else float("inf"),
+                        if c["budget_type"] in ["epochs", "data_fraction"] else float("inf"),
                 type=float, depends=True, info="Number of successive halving iterations."),
             ConfigOption("eta", default=3, type=float, info='eta parameter of Hyperband.'),
             ConfigOption("min_workers", default=1, type=int),
@@ -177,8 +213,29 @@ class OptimizationAlgorithm(SubPipelineNode):
             ConfigOption("memory_limit_mb", default=1000000, type=int),
             ConfigOption("use_tensorboard_logger", default=False, type=to_bool),
             ConfigOption("run_worker_on_master_node", default=True, type=to_bool),
-            ConfigOption("use_pynisher", default=True, type=to_bool)
+            ConfigOption("use_pynisher", default=True, type=to_bool),
+            ConfigOption("resume", default=False, type=to_bool,
+                info="Resume an interrupted run from the results in result_logger_dir. Evaluations will not be repeated and the remaining runtime is used."),
+            ConfigOption("evaluation_cache_dir", default=None, type="directory",
+                info="Directory of a cache that stores evaluated configurations across runs. The cache is disabled if not specified. " +
+                    "Results are only reused for an equal random_seed, which defaults to a value derived from run_id."),
+            ConfigOption("evaluation_cache_max_entries", default=100000, type=int, info="Maximum number of entries in the evaluation cache."),
+            ConfigOption("shutdown_grace_period", default=60, type=float,
+                info="When max_runtime is reached, running jobs are cancelled and report partial results. Maximum time in seconds to wait for them."),
+            ConfigOption("use_cost_model", default=False, type=to_bool,
+                info="Predict runtime and memory of configurations. Long jobs are started first and jobs predicted to exceed memory_limit_mb are rejected."),
+            ConfigOption("nameserver_timeout", default=float("inf"), type=float,
+                info="Maximum time in seconds a worker on a cluster waits for the nameserver of the master to come up."),
+            ConfigOption("in_process_dispatcher", default=True, type=to_bool,
+                info="Run the jobs of a local run (task_id -1) in process, without nameserver and network."),
+            ConfigOption("packed_evaluation_size", default=1, type=int,
+                info="Number of jobs with equal budget a local run evaluates at the same time. MLPs among them with equal number of layers, " +
+                     "activation and batch size that are trained on the same data are trained together as one batched model. " +
+                     "Fix batch size and number of layers with hyperparameter_search_space_updates to pack most jobs. " +
+                     "Requires in_process_dispatcher and use_pynisher disabled.")
         ]
+        for budget_type in self.budget_types.values():
+            options += budget_type.get_pipeline_config_options()
         return options
 
     # OVERRIDE
@@ -186,12 +243,60 @@ class OptimizationAlgorithm(SubPipelineNode):
         def check_runtime(pipeline_config):
             return pipeline_config["budget_type"] != "time" or pipeline_config["max_runtime"] >= pipeline_config["max_budget"]
 
+        def check_data_fraction(pipeline_config):
+            return pipeline_config["budget_type"] != "data_fraction" or 0 < pipeline_config["min_budget"] <= pipeline_config["max_budget"] <= 1
+
+        def check_packed_evaluation(pipeline_config):
+            return pipeline_config["packed_evaluation_size"] <= 1 or (pipeline_config["task_id"] == -1 and
+                pipeline_config["in_process_dispatcher"] and not pipeline_config["use_pynisher"])
+
         return [
             ConfigCondition.get_larger_equals_condition("max budget must be greater than or equal to min budget", "max_budget", "min_budget"),
-            ConfigCondition("When time is used as budget, the max_runtime must be larger than the max_budget", check_runtime)
+            ConfigCondition("When time is used as budget, the max_runtime must be larger than the max_budget", check_runtime),
+            ConfigCondition("When data_fraction is used as budget, the budgets must be in (0, 1]", check_data_fraction),
+            ConfigCondition("Packed evaluation requires a local run (task_id -1) with in_process_dispatcher and without use_pynisher", check_packed_evaluation)
         ]
 
 
+    def set_default_step_budgets(self, pipeline_config, dataset_info, logger):
+        """Derive min and max budget from the size of the dataset, if they have not been specified.
+        
+        Arguments:
+            pipeline_config {dict} -- The configuration of the pipeline. Will be updated.
+            dataset_info {DatasetInfo} -- Object describing the dataset
+            logger {Logger} -- Logger to log stuff on the console.
+        """
+        if pipeline_config["min_budget"] <= 0 or pipeline_config["max_budget"] <= 0:
+            num_train_samples = dataset_info.x_shape[0] * (1 - max(0, min(1, pipeline_config.get("validation_split", 0))))
+            min_budget, max_budget = BudgetTypeSteps.get_default_budgets(pipeline_config, num_train_samples)
+            if pipeline_config["min_budget"] <= 0:
+                pipeline_config["min_budget"] = min_budget
+            if pipeline_config["max_budget"] <= 0:
+                pipeline_config["max_budget"] = max(max_budget, pipeline_config["min_budget"])
+        if pipeline_config["num_iterations"] == float("inf") and pipeline_config["max_runtime"] == float("inf"):
+            pipeline_config["num_iterations"] = -int(np.log(pipeline_config["min_budget"] / pipeline_config["max_budget"]) / np.log(pipeline_config["eta"])) + 1
+        logger.info("Use min budget of " + str(pipeline_config["min_budget"]) + " steps and max budget of " + str(pipeline_config["max_budget"]) + " steps")
+
+    def restore_previous_run(self, pipeline_config, logger):
+        """Restore the state of an interrupted run from the result logger directory.
+        
+        Arguments:
+            pipeline_config {dict} -- The configuration of the pipeline.
+            logger {Logger} -- Logger to log stuff on the console.
+        
+        Returns:
+            dict -- The previous result to warmstart the optimization algorithm, the used runtime,
+                    the number of finished iterations and the already evaluated results.
+        """
+        previous_result, elapsed_time, num_finished_iterations, evaluated_results = restore_logged_results(pipeline_config["result_logger_dir"])
+        if previous_result is None:
+            logger.info("[AutoNet] No results to resume from in " + pipeline_config["result_logger_dir"])
+        else:
+            logger.info("[AutoNet] Resume run with " + str(len(evaluated_results)) + " evaluations. Runtime used so far: " +
+                str(elapsed_time) + " seconds, iterations started so far: " + str(num_finished_iterations))
+        return {"previous_result": previous_result, "elapsed_time": elapsed_time,
+                "num_finished_iterations": num_finished_iterations, "evaluated_results": evaluated_results}
+
     def get_default_network_interface_name(self):
         """Get the default network interface name
         
@@ -199,6 +304,7 @@ class OptimizationAlgorithm(SubPipelineNode):
             str -- The default network interface name
         """
         try:
+            import netifaces
             return netifaces.gateways()['default'][netifaces.AF_INET][1]
         except:
             return 'lo'
@@ -225,6 +331,13 @@ class OptimizationAlgorithm(SubPipelineNode):
             shutil.rmtree(tmp_models_dir)  # not used right now
         if os.path.exists(ns_credentials_dir) and pipeline_config['task_id'] in [1, -1]:
             shutil.rmtree(ns_credentials_dir)
+        if pipeline_config['task_id'] in [1, -1]:
+            for cancel_file in [get_job_cancel_file(pipeline_config)] + glob.glob(get_job_cancel_file(pipeline_config) + "_*"):
+                if os.path.exists(cancel_file):
+                    os.remove(cancel_file)
+            learning_curves_file = os.path.join(pipeline_config["result_logger_dir"], LEARNING_CURVES_FILE)
+            if os.path.exists(learning_curves_file) and not pipeline_config["resume"]:
+                os.remove(learning_curves_file)
         return ns_credentials_dir, tmp_models_dir, network_interface_name
 
     def clean_up(self, pipeline_config, tmp_models_dir, ns_credentials_dir):
@@ -241,6 +354,46 @@ class OptimizationAlgorithm(SubPipelineNode):
                 shutil.rmtree(tmp_models_dir)
             if os.path.exists(ns_credentials_dir):
                 shutil.rmtree(ns_credentials_dir)
+            for cancel_file in [get_job_cancel_file(pipeline_config)] + glob.glob(get_job_cancel_file(pipeline_config) + "_*"):
+                if os.path.exists(cancel_file):
+                    os.remove(cancel_file)
+
+    def cancel_running_jobs(self, pipeline_config, logger):
+        """Signal all workers to stop training at the next batch and report their partial results.
+        
+        Arguments:
+            pipeline_config {dict} -- The configuration of the pipeline
+            logger {Logger} -- Logger to log stuff on the console.
+        """
+        logger.info("[AutoNet] Runtime limit reached. Cancel running jobs.")
+        with open(get_job_cancel_file(pipeline_config), "w"):
+            pass
+
+    def cancel_job(self, pipeline_config, config_id):
+        """Signal the workers to stop training the given configuration and report the partial result.
+        
+        Arguments:
+            pipeline_config {dict} -- The configuration of the pipeline
+            config_id {tuple} -- The id of the configuration.
+        """
+        with open(get_job_cancel_file(pipeline_config, config_id), "w"):
+            pass
+
+    def cancel_diverged_jobs(self, pipeline_config, learning_curve_reader, logger):
+        """Cancel the running jobs whose training loss is no longer finite. They would waste the rest of their budget.
+        
+        Arguments:
+            pipeline_config {dict} -- The configuration of the pipeline
+            learning_curve_reader {LearningCurveReader} -- Reads the learning curves streamed by the workers.
+            logger {Logger} -- Logger to log stuff on the console.
+        """
+        for config_id, budget, cv_index, epoch, _, metrics in learning_curve_reader.update():
+            loss = metrics.get("loss")
+            if loss is None or math.isfinite(loss) or os.path.exists(get_job_cancel_file(pipeline_config, config_id)):
+                continue
+            logger.info("[AutoNet] Training loss of config " + str(config_id) + " with budget " + str(budget) +
+                " diverged in epoch " + str(epoch) + ". Cancel job.")
+            self.cancel_job(pipeline_config, config_id)
 
     def get_nameserver(self, run_id, task_id, ns_credentials_dir, network_interface_name):
         """Get the namesever object
@@ -254,12 +407,44 @@ class OptimizationAlgorithm(SubPipelineNode):
         Returns:
             NameServer -- The NameServer object
         """
-        if not os.path.isdir(ns_credentials_dir):
-            try:
-                os.mkdir(ns_credentials_dir)
-            except:
-                pass
+        if task_id == -1:
+            # the local worker gets host and port directly, no need to write the credentials
+            return NameServer(run_id=run_id, nic_name=network_interface_name, working_directory=None)
         return NameServer(run_id=run_id, nic_name=network_interface_name, working_directory=ns_credentials_dir)
+
+    def wait_for_nameserver(self, run_id, ns_credentials_dir, timeout=float("inf")):
+        """Wait until the nameserver of the master is up. The credentials file is polled with an increasing interval,
+        such that workers connect within milliseconds if the master is already running.
+        
+        Arguments:
+            run_id {str} -- The id of the run
+            ns_credentials_dir {str} -- Path to ns credentials
+        
+        Keyword Arguments:
+            timeout {float} -- Maximum time to wait in seconds (default: {float("inf")})
+        
+        Raises:
+            RuntimeError: The nameserver did not come up in time.
+        
+        Returns:
+            tuple -- Host and port of the nameserver
+        """
+        credentials_file = os.path.join(ns_credentials_dir, 'HPB_run_%s_pyro.pkl' % run_id)
+        start_time = time.time()
+        interval = 0.01
+        while True:
+            try:
+                with open(credentials_file, 'rb') as f:
+                    ns_host, ns_port = pickle.load(f)
+                # credentials of a previous run might not have been removed yet
+                with socket.create_connection((ns_host, ns_port), timeout=1):
+                    return ns_host, ns_port
+            except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+                pass  # not written yet, written partially or nameserver not reachable
+            if time.time() - start_time > timeout:
+                raise RuntimeError("Nameserver did not start within " + str(timeout) + " seconds. Credentials expected in " + credentials_file)
+            time.sleep(interval)
+            interval = min(interval * 2, 1)
     
     def get_optimization_algorithm_instance(self, config_space, run_id, pipeline_config, ns_host, ns_port, loggers, previous_result=None):
         """Get an instance of the optimization algorithm
@@ -325,7 +510,7 @@ class OptimizationAlgorithm(SubPipelineNode):
 
 
     def run_worker(self, pipeline_config, run_id, task_id, ns_credentials_dir, network_interface_name,
-            X_train, Y_train, X_valid, Y_valid, dataset_info, shutdownables):
+            X_train, Y_train, X_valid, Y_valid, dataset_info, shutdownables, evaluated_results=None, ns_host=None, ns_port=None, in_process=False):
         """ Run the AutoNetWorker
         
         Arguments:
@@ -340,27 +525,44 @@ class OptimizationAlgorithm(SubPipelineNode):
             Y_valid {array} -- The data
             dataset_info {DatasetInfo} -- Object describing the dataset
             shutdownables {list} -- A list of objects that need to shutdown when the optimization is finished
+        
+        Keyword Arguments:
+            evaluated_results {dict} -- Results of an interrupted run that should not be evaluated again (default: {None})
+            ns_host {str} -- Nameserver host, if the nameserver runs in this process. Otherwise, wait for the credentials (default: {None})
+            ns_port {int} -- Nameserver port, if the nameserver runs in this process (default: {None})
+            in_process {bool} -- Do not start the worker. Its jobs are dispatched in process by the optimization algorithm (default: {False})
+        
+        Returns:
+            AutoNetWorker -- The worker
         """
-        if not task_id == -1:
-            time.sleep(5)
-        while not os.path.isdir(ns_credentials_dir):
-            time.sleep(5)
-        host = nic_name_to_host(network_interface_name)
+        host = None
+        if not in_process:
+            if ns_host is None or ns_port is None:
+                ns_host, ns_port = self.wait_for_nameserver(run_id, ns_credentials_dir, timeout=pipeline_config["nameserver_timeout"])
+            host = nic_name_to_host(network_interface_name)
+        evaluation_cache = None
+        if pipeline_config["evaluation_cache_dir"] is not None:
+            evaluation_cache = EvaluationCache(pipeline_config["evaluation_cache_dir"], max_entries=pipeline_config["evaluation_cache_max_entries"])
         
         worker = AutoNetWorker(pipeline=self.sub_pipeline, pipeline_config=pipeline_config,
                               X_train=X_train, Y_train=Y_train, X_valid=X_valid, Y_valid=Y_valid, dataset_info=dataset_info,
                               budget_type=self.budget_types[pipeline_config['budget_type']],
                               max_budget=pipeline_config["max_budget"],
-                              host=host, run_id=run_id,
+                              host=host, run_id=run_id, nameserver=ns_host, nameserver_port=ns_port,
                               id=task_id, shutdownables=shutdownables,
-                              use_pynisher=pipeline_config["use_pynisher"])
-        worker.load_nameserver_credentials(ns_credentials_dir)
+                              use_pynisher=pipeline_config["use_pynisher"],
+                              evaluated_results=evaluated_results,
+                              evaluation_cache=evaluation_cache)
+        if in_process:
+            return worker
+
         # run in background if not on cluster
         worker.run(background=(task_id <= 1))
+        return worker
 
 
     def run_optimization_algorithm(self, pipeline_config, run_id, ns_host, ns_port, nameserver, task_id, result_loggers,
-            dataset_info, logger):
+            dataset_info, logger, previous_result=None, elapsed_time=0, num_finished_iterations=0, local_worker=None):
         """ 
         
         Arguments:
@@ -368,11 +570,17 @@ class OptimizationAlgorithm(SubPipelineNode):
             run_id {str} -- An id for the run
             ns_host {str} -- Nameserver host.
             ns_port {int} -- Nameserver port.
-            nameserver {[type]} -- The nameserver.
+            nameserver {NameServer} -- The nameserver. None, if jobs are dispatched in process.
             task_id {int} -- An id for the worker
             result_loggers {[type]} -- [description]
             dataset_info {DatasetInfo} -- Object describing the dataset
             logger {list} -- Loggers to log the results.
+        
+        Keyword Arguments:
+            previous_result {Result} -- The result of an interrupted run to warmstart the search (default: {None})
+            elapsed_time {float} -- Runtime used by the interrupted run (default: {0})
+            num_finished_iterations {int} -- Number of iterations started by the interrupted run (default: {0})
+            local_worker {AutoNetWorker} -- Dispatch the jobs in process to this worker instead of using the nameserver (default: {None})
         """
         config_space = self.pipeline.get_hyperparameter_search_space(dataset_info=dataset_info, **pipeline_config)
 
@@ -383,24 +591,50 @@ class OptimizationAlgorithm(SubPipelineNode):
         if pipeline_config['use_tensorboard_logger']:
             result_loggers.append(tensorboard_logger())
 
-        HB = self.get_optimization_algorithm_instance(config_space=config_space, run_id=run_id,
-            pipeline_config=pipeline_config, ns_host=ns_host, ns_port=ns_port, loggers=result_loggers)
+        cost_model = None
+        if pipeline_config['use_cost_model']:
+            cost_model = CostModel(pipeline_config, dataset_info)
+            result_loggers = result_loggers + [cost_model]
+
+        if local_worker is not None:
+            with local_dispatcher():
+                HB = self.get_optimization_algorithm_instance(config_space=config_space, run_id=run_id,
+                    pipeline_config=pipeline_config, ns_host=ns_host, ns_port=ns_port, loggers=result_loggers, previous_result=previous_result)
+            HB.dispatcher.add_worker(local_worker, pack_size=max(1, pipeline_config["packed_evaluation_size"]))
+        else:
+            HB = self.get_optimization_algorithm_instance(config_space=config_space, run_id=run_id,
+                pipeline_config=pipeline_config, ns_host=ns_host, ns_port=ns_port, loggers=result_loggers, previous_result=previous_result)
+        HB.cost_model = cost_model
+        HB.shutdown_grace_period = pipeline_config["shutdown_grace_period"]
+        HB.on_timelimit = lambda: self.cancel_running_jobs(pipeline_config, logger)
+        if pipeline_config.get("stream_learning_curves", False):
+            learning_curve_reader = LearningCurveReader(pipeline_config["result_logger_dir"])
+            HB.on_wait = lambda: self.cancel_diverged_jobs(pipeline_config, learning_curve_reader, logger)
 
         # start algorithm
         min_num_workers = pipeline_config["min_workers"] if task_id != -1 else 1
 
         reduce_runtime = pipeline_config["max_budget"] if pipeline_config["budget_type"] == "time" else 0
-        HB.run_until(runtime=(pipeline_config["max_runtime"] - reduce_runtime),
-                     n_iterations=pipeline_config["num_iterations"],
-                     min_n_workers=min_num_workers)
+        runtime = pipeline_config["max_runtime"] - reduce_runtime - elapsed_time
+        n_iterations = pipeline_config["num_iterations"] - num_finished_iterations
+        if runtime > 0 and n_iterations > 0:
+            HB.run_until(runtime=runtime,
+                         n_iterations=n_iterations,
+                         min_n_workers=min_num_workers)
+        else:
+            logger.info("[AutoNet] Nothing left to do for the resumed run")
 
         HB.shutdown(shutdown_workers=True)
-        nameserver.shutdown()
+        if nameserver is not None:
+            nameserver.shutdown()
     
     @staticmethod
     def get_nic_name(pipeline_config):
         """Get the nic name from the pipeline config"""
-        return pipeline_config["network_interface_name"] or (netifaces.interfaces()[1] if len(netifaces.interfaces()) > 1 else "lo")
+        if pipeline_config["network_interface_name"]:
+            return pipeline_config["network_interface_name"]
+        import netifaces
+        return netifaces.interfaces()[1] if len(netifaces.interfaces()) > 1 else "lo"
 
     
     def clean_fit_data(self):
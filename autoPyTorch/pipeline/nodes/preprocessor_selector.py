@@ -6,10 +6,16 @@ __license__ = "BSD"
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 from autoPyTorch.components.preprocessing.preprocessor_base import PreprocessorBase
 
+import os
+import numpy as np
+import scipy.sparse
+from concurrent.futures import ThreadPoolExecutor
 import ConfigSpace
 import ConfigSpace.hyperparameters as CSH
 from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
 from autoPyTorch.utils.config.config_option import ConfigOption
+from autoPyTorch.utils.out_of_core import is_memmap, transform_in_chunks
+from autoPyTorch.utils.thread_budget import get_num_threads
 from autoPyTorch.components.preprocessing.preprocessor_base import PreprocessorBase
 
 class PreprocessorSelector(PipelineNode):
@@ -25,17 +31,64 @@ class PreprocessorSelector(PipelineNode):
         preprocessor_type = self.preprocessors[preprocessor_name]
         preprocessor_config = ConfigWrapper(preprocessor_name, hyperparameter_config)
         preprocessor = preprocessor_type(preprocessor_config)
-        preprocessor.fit(X[train_indices], Y[train_indices])
+        X = self.to_supported_format(preprocessor, X)
+        fit_indices = self.get_fit_indices(preprocessor, pipeline_config, Y, train_indices)
+        preprocessor.fit(X[fit_indices], Y[fit_indices])
 
         if preprocessor_name != 'none':
             one_hot_encoder = None
 
-        X = preprocessor.transform(X)
+        X = self.transform(preprocessor, X, pipeline_config)
 
         return {'X': X, 'preprocessor': preprocessor, 'one_hot_encoder': one_hot_encoder}
 
-    def predict(self, preprocessor, X):
-        return { 'X': preprocessor.transform(X) }
+    def predict(self, pipeline_config, preprocessor, X):
+        return { 'X': self.transform(preprocessor, self.to_supported_format(preprocessor, X), pipeline_config) }
+
+    def transform(self, preprocessor, X, pipeline_config):
+        if preprocessor.fit_cost_exponent is None:
+            return preprocessor.transform(X)
+        # expensive preprocessors transform chunks of rows, the chunks in parallel
+        if is_memmap(X):
+            return transform_in_chunks(preprocessor.transform, X)
+        return transform_in_parallel(preprocessor.transform, X, n_jobs=get_num_threads(pipeline_config))
+
+    def get_fit_indices(self, preprocessor, pipeline_config, Y, train_indices):
+        """Get the samples to fit the preprocessor on.
+        Preprocessors that are expensive to fit are fit on a stratified subsample of the training data.
+        The size of the subsample decreases with the cost: max_fit_samples ** (2 / (fit_cost_exponent + 1)).
+        
+        Arguments:
+            preprocessor {PreprocessorBase} -- The preprocessor to fit.
+            pipeline_config {dict} -- The pipeline config.
+            Y {array} -- The targets.
+            train_indices {array} -- The indices of the training samples.
+        
+        Returns:
+            array -- The indices of the samples to fit on.
+        """
+        max_fit_samples = pipeline_config.get("max_fit_samples", -1)
+        if preprocessor.fit_cost_exponent is None or max_fit_samples < 0:
+            return train_indices
+        num_samples = max(1, int(max_fit_samples ** (2.0 / (preprocessor.fit_cost_exponent + 1))))
+        if num_samples >= len(train_indices):
+            return train_indices
+
+        random = np.random.RandomState(pipeline_config.get("random_seed", 0))
+        if len(Y.shape) < 2 or Y.shape[1] < 2:
+            return np.sort(random.choice(train_indices, num_samples, replace=False))
+
+        # keep the class distribution, at least one sample per class
+        _, labels = np.unique(np.argmax(Y[train_indices], axis=1), return_inverse=True)
+        counts = np.bincount(labels)
+        num_class_samples = np.minimum(counts, np.maximum(1, counts * num_samples // len(labels)))
+        fit_indices = [random.choice(np.flatnonzero(labels == c), n, replace=False) for c, n in enumerate(num_class_samples)]
+        return np.sort(train_indices[np.concatenate(fit_indices)])
+
+    def to_supported_format(self, preprocessor, X):
+        if scipy.sparse.issparse(X) and not preprocessor.supports_sparse:
+            return X.toarray()
+        return X
 
     def add_preprocessor(self, name, preprocessor_type):
         if (not issubclass(preprocessor_type, PreprocessorBase)):
@@ -69,5 +122,28 @@ class PreprocessorSelector(PipelineNode):
     def get_pipeline_config_options(self):
         options = [
             ConfigOption(name="preprocessors", default=list(self.preprocessors.keys()), type=str, list=True, choices=list(self.preprocessors.keys())),
+            ConfigOption(name="max_fit_samples", default=100000, type=int,
+                info="Fit expensive preprocessors on a subsample of at most this many samples. Less for preprocessors with superlinear cost. -1 to fit on all samples."),
         ]
-        return options
\ No newline at end of file
+        return options
+
+
+def transform_in_parallel(transform, X, chunk_rows=4096, n_jobs=None):
+    """Transform chunks of rows in parallel threads. The work is done by numpy and scikit-learn, which release the GIL.
+
+    Arguments:
+        transform {function} -- Transforms a chunk of rows.
+        X {array} -- The data to transform. Dense or sparse.
+
+    Keyword Arguments:
+        chunk_rows {int} -- The number of rows per chunk. (default: {4096})
+        n_jobs {int} -- The number of threads. Defaults to the number of processors. (default: {None})
+
+    Returns:
+        array -- The transformed data.
+    """
+    if X.shape[0] <= chunk_rows or n_jobs == 1:
+        return transform(X)
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as executor:
+        chunks = list(executor.map(lambda start: transform(X[start:start + chunk_rows]), range(0, X.shape[0], chunk_rows)))
+    return scipy.sparse.vstack(chunks).tocsr() if scipy.sparse.issparse(chunks[0]) else np.concatenate(chunks)
@@ -6,13 +6,14 @@ __version__ = "0.0.1"
 __license__ = "BSD"
 
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
-from autoPyTorch.utils.config.config_option import ConfigOption
+from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
 from autoPyTorch.components.preprocessing.resampling_base import ResamplingMethodNone, ResamplingMethodBase, TargetSizeStrategyBase
 from autoPyTorch.pipeline.nodes.cross_validation import CrossValidation
 from sklearn.preprocessing import OneHotEncoder
 import ConfigSpace
 import ConfigSpace.hyperparameters as CSH
 from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
+from autoPyTorch.utils.thread_budget import get_num_threads
 import logging
 
 class ResamplingStrategySelector(PipelineNode):
@@ -27,7 +28,7 @@ class ResamplingStrategySelector(PipelineNode):
 
         self.target_size_strategies = {'none': None}
 
-    def fit(self, pipeline_config, hyperparameter_config, X, Y, train_indices, valid_indices):
+    def fit(self, pipeline_config, hyperparameter_config, X, Y, train_indices, valid_indices, dataset_info=None):
         hyperparameter_config = ConfigWrapper(self.get_name(), hyperparameter_config)
         logger = logging.getLogger('autonet')
         
@@ -41,6 +42,10 @@ class ResamplingStrategySelector(PipelineNode):
             ConfigWrapper(hyperparameter_config['under_sampling_method'], hyperparameter_config)
         )
         target_size_strategy = self.target_size_strategies[hyperparameter_config['target_size_strategy']]()
+        over_sampling_method.approximate_neighbors = pipeline_config.get("approximate_neighbors", False)
+        under_sampling_method.approximate_neighbors = pipeline_config.get("approximate_neighbors", False)
+        over_sampling_method.n_jobs = under_sampling_method.n_jobs = get_num_threads(pipeline_config)
+        over_sampling_method.cache_dir = under_sampling_method.cache_dir = getattr(dataset_info, "cache_dir", None)
 
         y = np.argmax(Y[train_indices], axis=1).astype(int)
         ohe = OneHotEncoder(categories="auto", sparse=False)
@@ -118,6 +123,8 @@ class ResamplingStrategySelector(PipelineNode):
             ConfigOption(name="over_sampling_methods", default=list(self.over_sampling_methods.keys()), type=str, list=True, choices=list(self.over_sampling_methods.keys())),
             ConfigOption(name="under_sampling_methods", default=list(self.under_sampling_methods.keys()), type=str, list=True, choices=list(self.under_sampling_methods.keys())),
             ConfigOption(name="target_size_strategies", default=list(self.target_size_strategies.keys()), type=str, list=True, choices=list(self.target_size_strategies.keys())),
+            ConfigOption(name="approximate_neighbors", default=False, type=to_bool, choices=[True, False],
+                info="Resampling methods based on nearest neighbours (e.g. SMOTE) search approximate neighbours. Faster on large classes."),
         ]
         return options
     
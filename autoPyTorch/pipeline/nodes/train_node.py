@@ -22,9 +22,14 @@ from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
 from autoPyTorch.utils.config.config_option import ConfigOption, to_bool
 from autoPyTorch.components.training.base_training import BaseTrainingTechnique, BaseBatchLossComputationTechnique
 from autoPyTorch.components.training.trainer import Trainer
+from autoPyTorch.components.training.budget_types import BudgetTypeDataFraction
+from autoPyTorch.components.training.packed_training import PackedJob
+from autoPyTorch.utils.thread_budget import ThreadBudgetManager
+from autoPyTorch.utils.learning_curves import report_epoch
 
 
 from copy import deepcopy
+from functools import partial
 
 import signal
 
@@ -39,6 +44,7 @@ class TrainNode(PipelineNode):
         self.batch_loss_computation_techniques = dict()
         self.add_batch_loss_computation_technique("standard", BaseBatchLossComputationTechnique)
         self.ensemble_models = []
+        self.packing = None
         #self.adversarial_training_technique = dict()
         #self.adversarial_training_technique[""]
 
@@ -53,10 +59,42 @@ class TrainNode(PipelineNode):
             loss_function,
             training_techniques,
             fit_start_time,
-            refit):
+            refit,
+            hyperparameter_config_id=None,
+            cv_index=0):
+        """Train the network. See train for the arguments.
+        The job is registered at the thread budget while it trains and unregistered afterwards, also if training fails.
+        
+        Returns:
+            dict -- loss and info reported to bohb
+        """
+        thread_budget = self.set_num_threads(pipeline_config, logging.getLogger('autonet'), budget=budget, network=network)
+        try:
+            return self.train(thread_budget=thread_budget, hyperparameter_config=hyperparameter_config, pipeline_config=pipeline_config,
+                train_loader=train_loader, valid_loader=valid_loader, network=network, optimizer=optimizer,
+                optimize_metric=optimize_metric, additional_metrics=additional_metrics, log_functions=log_functions, budget=budget,
+                loss_function=loss_function, training_techniques=training_techniques, fit_start_time=fit_start_time, refit=refit,
+                hyperparameter_config_id=hyperparameter_config_id, cv_index=cv_index)
+        finally:
+            if thread_budget is not None:
+                thread_budget.unregister()
+
+    def train(self, thread_budget, hyperparameter_config, pipeline_config,
+            train_loader, valid_loader,
+            network, optimizer,
+            optimize_metric, additional_metrics,
+            log_functions,
+            budget,
+            loss_function,
+            training_techniques,
+            fit_start_time,
+            refit,
+            hyperparameter_config_id=None,
+            cv_index=0):
         """Train the network.
         
         Arguments:
+            thread_budget {ThreadBudgetManager} -- The manager the job is registered at, or None if the number of threads is fixed.
             hyperparameter_config {dict} -- The sampled hyperparameter config.
             pipeline_config {dict} -- The user specified configuration of the pipeline
             train_loader {DataLoader} -- Data for training.
@@ -72,6 +110,10 @@ class TrainNode(PipelineNode):
             fit_start_time {float} -- Start time of fit
             refit {bool} -- Whether training for refit or not.
         
+        Keyword Arguments:
+            hyperparameter_config_id {tuple} -- The id of the configuration assigned by the optimization algorithm (default: {None})
+            cv_index {int} -- The index of the current cross validation split (default: {0})
+        
         Returns:
             dict -- loss and info reported to bohb
         """
@@ -88,10 +130,7 @@ class TrainNode(PipelineNode):
         logger = logging.getLogger('autonet')
         logger.debug("Start train. Budget: " + str(budget))
 
-        if pipeline_config["torch_num_threads"] > 0:
-            torch.set_num_threads(pipeline_config["torch_num_threads"])
 
-        
         # check if use_se is active or not
         use_se = network_selector_config["use_se"]
 
@@ -145,13 +184,29 @@ class TrainNode(PipelineNode):
             use_adversarial_training=use_adversarial_training
         )
 
+        # the snapshots are scheduled in epochs. With budget type data_fraction, the budget is the fraction of the data
+        # and the number of epochs is data_fraction_max_epochs
+        num_epochs = budget
+        if any(isinstance(t, BudgetTypeDataFraction) for t in training_techniques):
+            num_epochs = pipeline_config["data_fraction_max_epochs"]
+
         if use_swa or use_se:
             #  Number that represents the threshold when to start using
             #  Stochastic Weight Averaging, typically for non cyclical schedulers.
-            consumed_budget = int(0.75 * budget)
+            consumed_budget = int(0.75 * num_epochs)
             lr_scheduler = trainer.lr_scheduler
             scheduler_cyclical = schedulers_cyclical_status[type(lr_scheduler)]
 
+        # reduce the batch size upfront, if the network will not fit into memory
+        num_backoffs = pipeline_config["oom_batch_size_backoffs"]
+        train_loader, num_backoffs = self.preflight_batch_size(pipeline_config, network, train_loader, trainer.device, num_backoffs, logger)
+
+        # state to restore if training runs out of memory in the first epoch
+        initial_state = None
+        if num_backoffs > 0:
+            initial_state = ({k: v.detach().cpu().clone() for k, v in trainer.model.state_dict().items()},
+                             deepcopy(trainer.optimizer.state_dict()), trainer.model.budget_trained)
+
         trainer.prepare(pipeline_config, hyperparameter_config, fit_start_time)
 
 
@@ -160,8 +215,24 @@ class TrainNode(PipelineNode):
         training_start_time = time.time()
         log = dict()
 
-        while True:
+        # train together with compatible configurations evaluated at the same time, see PackedEvaluation
+        packed = False
+        packing, self.packing = self.packing, None
+        if packing is not None and (use_swa or use_se or use_lookahead or use_adversarial_training or
+                hyperparameter_config["batch_loss_computation_technique"] != "standard"):
+            packing.leave()
+        elif packing is not None:
+            job = PackedJob(trainer=trainer, train_loader=train_loader, valid_loader=valid_loader, epoch=epoch,
+                log_epoch=partial(self.log_epoch, pipeline_config=pipeline_config, budget=budget, refit=refit,
+                    hyperparameter_config_id=hyperparameter_config_id, cv_index=cv_index, logger=logger))
+            packed = packing.train(job)
+            epoch = job.epoch
+
+        while not packed:
             # prepare epoch
+            if thread_budget is not None:
+                num_threads = self.apply_thread_allocation(thread_budget.get_allocation(), logger)
+                log['num_threads'] = log.get('num_threads', []) + [num_threads]
             trainer.on_epoch_start(log=log, epoch=epoch)
             # TODO add swa for iterations also
             if use_swa or use_se:
@@ -213,9 +284,21 @@ class TrainNode(PipelineNode):
                         counter += 1
 
             # training
-            optimize_metric_results, train_loss, stop_training = trainer.train(epoch + 1, train_loader)
+            try:
+                optimize_metric_results, train_loss, stop_training = trainer.train(epoch + 1, train_loader)
+            except (RuntimeError, MemoryError) as e:
+                if initial_state is None or num_backoffs <= 0 or train_loader.batch_size <= 1 or not is_out_of_memory_error(e):
+                    raise
+                num_backoffs -= 1
+                train_loader = self.set_batch_size(train_loader, train_loader.batch_size // 2)
+                logger.info("Out of memory in the first epoch. Retry with batch size " + str(train_loader.batch_size))
+                self.restore_initial_state(trainer, initial_state)
+                trainer.prepare(pipeline_config, hyperparameter_config, fit_start_time)
+                log = dict()
+                continue
+            initial_state = None
 
-            if epoch == budget:
+            if epoch == num_epochs:
                 if use_swa or use_se:
                     # Only adding the snapshot_method declaration here
                     # since the other snapshots might not be triggered
@@ -250,43 +333,13 @@ class TrainNode(PipelineNode):
                     counter += 1
 
 
+            valid_metric_results = None
             if valid_loader is not None and trainer.eval_valid_each_epoch:
                 valid_metric_results = trainer.evaluate(valid_loader, None if len(model_snapshots) == 0 else model_snapshots)
 
-            # evaluate
-            if 'loss' in log:
-                log['loss'].append(train_loss)
-            else:
-                log['loss'] = [train_loss]
-
-            for i, metric in enumerate(trainer.metrics):
-                if 'train_' + metric.name in log:
-                    log['train_' + metric.name].append(optimize_metric_results[i])
-                else:
-                    log['train_' + metric.name] = [optimize_metric_results[i]]
-
-                if valid_loader is not None and trainer.eval_valid_each_epoch:
-                    if 'val_' + metric.name in log:
-                        log['val_' + metric.name].append(valid_metric_results[i])
-                    else:
-                        log['val_' + metric.name] = [valid_metric_results[i]]
-
-            if trainer.eval_additional_logs_each_epoch:
-                for additional_log in trainer.log_functions:
-                    if additional_log.name in log:
-                        log[additional_log.name].append(additional_log(trainer.model, epoch))
-                    else:
-                        log[additional_log.name] = [additional_log(trainer.model, epoch)]
-
-            # wrap up epoch
-            stop_training = trainer.on_epoch_end(log=log, epoch=epoch) or stop_training
-
-            # handle logs
-            logs.append(log)
-            log = {key: value for key, value in log.items() if not isinstance(value, np.ndarray)}
-            logger.debug("Epoch: " + str(epoch) + " : " + str(log))
-            if 'use_tensorboard_logger' in pipeline_config and pipeline_config['use_tensorboard_logger']:
-                self.tensorboard_log(budget=budget, epoch=epoch, log=log, logdir=pipeline_config["result_logger_dir"])
+            log, stop_training = self.log_epoch(trainer=trainer, log=log, epoch=epoch, optimize_metric_results=optimize_metric_results,
+                train_loss=train_loss, valid_metric_results=valid_metric_results, stop_training=stop_training, pipeline_config=pipeline_config,
+                budget=budget, refit=refit, hyperparameter_config_id=hyperparameter_config_id, cv_index=cv_index, logger=logger)
 
             if stop_training:
                 break
@@ -298,11 +351,75 @@ class TrainNode(PipelineNode):
         loss, final_log = self.wrap_up_training(trainer=trainer, logs=logs, epoch=epoch,
             train_loader=train_loader, valid_loader=valid_loader, budget=budget, training_start_time=training_start_time, fit_start_time=fit_start_time,
             best_over_epochs=pipeline_config['best_over_epochs'], refit=refit, logger=logger)
-    
+        final_log['effective_batch_size'] = train_loader.batch_size
+        if packed:
+            final_log['pack_size'] = len(job.group)
+        if getattr(trainer.model, 'training_cancelled', False):
+            final_log['partial'] = True
+
         print('Wrapping up training!, Final models count: ', len(model_snapshots))
         return {'loss': loss, 'info': final_log}
 
 
+    def log_epoch(self, trainer, log, epoch, optimize_metric_results, train_loss, valid_metric_results, stop_training,
+            pipeline_config, budget, refit, hyperparameter_config_id, cv_index, logger):
+        """Log the results of a trained epoch and wrap it up.
+        
+        Arguments:
+            trainer {Trainer} -- The trainer used for training.
+            log {dict} -- The log of the epoch.
+            epoch {int} -- The epoch.
+            optimize_metric_results {list} -- The results of the metrics on the training data.
+            train_loss {float} -- The training loss.
+            valid_metric_results {list} -- The results of the metrics on the validation data. None if not evaluated.
+            stop_training {bool} -- Whether training has been stopped during the epoch.
+            pipeline_config {dict} -- The user specified configuration of the pipeline
+            budget {float} -- The budget for training
+            refit {bool} -- Whether training for refit or not.
+            hyperparameter_config_id {tuple} -- The id of the configuration assigned by the optimization algorithm
+            cv_index {int} -- The index of the current cross validation split
+            logger {Logger} -- Logger.
+        
+        Returns:
+            tuple -- The log of the next epoch and whether to stop training
+        """
+        if 'loss' in log:
+            log['loss'].append(train_loss)
+        else:
+            log['loss'] = [train_loss]
+
+        for i, metric in enumerate(trainer.metrics):
+            if 'train_' + metric.name in log:
+                log['train_' + metric.name].append(optimize_metric_results[i])
+            else:
+                log['train_' + metric.name] = [optimize_metric_results[i]]
+
+            if valid_metric_results is not None:
+                if 'val_' + metric.name in log:
+                    log['val_' + metric.name].append(valid_metric_results[i])
+                else:
+                    log['val_' + metric.name] = [valid_metric_results[i]]
+
+        if trainer.eval_additional_logs_each_epoch:
+            for additional_log in trainer.log_functions:
+                if additional_log.name in log:
+                    log[additional_log.name].append(additional_log(trainer.model, epoch))
+                else:
+                    log[additional_log.name] = [additional_log(trainer.model, epoch)]
+
+        # wrap up epoch
+        stop_training = trainer.on_epoch_end(log=log, epoch=epoch) or stop_training
+
+        # handle logs
+        trainer.model.logs.append(log)
+        log = {key: value for key, value in log.items() if not isinstance(value, np.ndarray)}
+        if pipeline_config["stream_learning_curves"] and not refit and hyperparameter_config_id is not None:
+            report_epoch(pipeline_config["result_logger_dir"], hyperparameter_config_id, budget, cv_index, epoch + 1, log)
+        logger.debug("Epoch: " + str(epoch) + " : " + str(log))
+        if 'use_tensorboard_logger' in pipeline_config and pipeline_config['use_tensorboard_logger']:
+            self.tensorboard_log(budget=budget, epoch=epoch, log=log, logdir=pipeline_config["result_logger_dir"])
+        return log, stop_training
+
     def predict(self, pipeline_config, network, predict_loader):
         """Predict using trained neural network
         
@@ -314,20 +431,108 @@ class TrainNode(PipelineNode):
         Returns:
             dict -- The predicted labels in a dict.
         """
-        if pipeline_config["torch_num_threads"] > 0:
-            torch.set_num_threads(pipeline_config["torch_num_threads"])
+        thread_budget = self.set_num_threads(pipeline_config, logging.getLogger('autonet'), network=network)
 
         device = Trainer.get_device(pipeline_config)
-        # snapshot ensembling is activated
-        if len(self.ensemble_models) > 0:
-            if len(self.ensemble_models) == 1:
-                print('Snapshot ensembling is used, but there is only one model in ensemble')
-            Y = predict(self.ensemble_models, predict_loader, device, se=True)
-        else:
-            Y = predict(network, predict_loader, device)
-
+        try:
+            # snapshot ensembling is activated
+            if len(self.ensemble_models) > 0:
+                if len(self.ensemble_models) == 1:
+                    print('Snapshot ensembling is used, but there is only one model in ensemble')
+                Y = predict(self.ensemble_models, predict_loader, device, se=True)
+            else:
+                Y = predict(network, predict_loader, device)
+        finally:
+            if thread_budget is not None:
+                thread_budget.unregister()
         return {'Y': Y.detach().cpu().numpy()}
+
+    def set_num_threads(self, pipeline_config, logger, budget=1, network=None):
+        """Set the number of threads used by torch.
+        
+        Arguments:
+            pipeline_config {dict} -- The user specified configuration of the pipeline
+            logger {Logger} -- Logger.
+        
+        Keyword Arguments:
+            budget {float} -- The budget of the current job (default: {1})
+            network {BaseNet} -- The network of the current job (default: {None})
+        
+        Returns:
+            ThreadBudgetManager -- The manager the job is registered at, or None if the number of threads is fixed.
+        """
+        if pipeline_config["thread_allocation"] == "fixed":
+            if pipeline_config["torch_num_threads"] > 0:
+                torch.set_num_threads(pipeline_config["torch_num_threads"])
+            return None
+
+        weight = 1
+        if pipeline_config["thread_allocation"] == "budget":
+            weight = budget
+        elif pipeline_config["thread_allocation"] == "network_size" and network is not None:
+            weight = sum(p.numel() for p in network.parameters())
+
+        thread_budget = ThreadBudgetManager(num_cores=pipeline_config["thread_allocation_cores"])
+        self.apply_thread_allocation(thread_budget.register(weight), logger)
+        return thread_budget
+
+    def apply_thread_allocation(self, allocation, logger):
+        num_threads, num_interop_threads = allocation
+        if torch.get_num_threads() != num_threads:
+            logger.debug("Thread allocation changed: " + str(num_threads) + " intra-op threads")
+            torch.set_num_threads(num_threads)
+        if torch.get_num_interop_threads() != num_interop_threads:
+            try:
+                torch.set_num_interop_threads(num_interop_threads)
+                logger.debug("Thread allocation: " + str(num_interop_threads) + " inter-op threads")
+            except RuntimeError:
+                # inter-op threads can only be set once per process, before any parallel work started
+                pass
+        return num_threads
     
+    def preflight_batch_size(self, pipeline_config, network, train_loader, device, num_backoffs, logger):
+        """Halve the batch size until the estimated memory of training fits into the available memory.
+        
+        Arguments:
+            pipeline_config {dict} -- The user specified configuration of the pipeline
+            network {BaseNet} -- The network to train.
+            train_loader {DataLoader} -- Data for training.
+            device {torch.device} -- The device used for training.
+            num_backoffs {int} -- Maximum number of times the batch size may be halved.
+            logger {Logger} -- Logger.
+        
+        Returns:
+            tuple -- The data loader with the possibly reduced batch size and the number of remaining backoffs.
+        """
+        available_memory = get_available_memory(pipeline_config, device)
+        if available_memory is None or available_memory <= 0:
+            return train_loader, num_backoffs
+
+        batch_size = train_loader.batch_size
+        while num_backoffs > 0 and batch_size > 1 and estimate_training_memory(network, batch_size) > available_memory:
+            batch_size = batch_size // 2
+            num_backoffs -= 1
+
+        if batch_size != train_loader.batch_size:
+            logger.info("Estimated memory exceeds available memory. Reduce batch size from " + str(train_loader.batch_size) + " to " + str(batch_size))
+            train_loader = self.set_batch_size(train_loader, batch_size)
+        return train_loader, num_backoffs
+
+    def set_batch_size(self, loader, batch_size):
+        """Create a data loader with the same data and sampling, but a different batch size."""
+        return DataLoader(dataset=loader.dataset, batch_size=max(1, batch_size), sampler=loader.sampler, drop_last=loader.drop_last,
+            num_workers=loader.num_workers, collate_fn=loader.collate_fn, pin_memory=loader.pin_memory)
+
+    def restore_initial_state(self, trainer, initial_state):
+        """Undo the updates of a failed first epoch."""
+        model_state, optimizer_state, budget_trained = initial_state
+        trainer.optimizer.zero_grad()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        trainer.model.load_state_dict(model_state)
+        trainer.optimizer.load_state_dict(optimizer_state)
+        trainer.model.budget_trained = budget_trained
+
     def add_training_technique(self, name, training_technique):
         if (not issubclass(training_technique, BaseTrainingTechnique)):
             raise ValueError("training_technique type has to inherit from BaseTrainingTechnique")
@@ -378,6 +583,14 @@ class TrainNode(PipelineNode):
             ConfigOption("cuda", default=True, type=to_bool, choices=[True, False]),
             ConfigOption(name="use_adversarial_training", default=[True, False], type=to_bool, choices=[True, False], list=True, info='use_adversarial_training'),
             ConfigOption("torch_num_threads", default=1, type=int),
+            ConfigOption("thread_allocation", default="fixed", type=str, choices=["fixed", "uniform", "budget", "network_size"],
+                info="fixed uses torch_num_threads. Otherwise the cores are distributed among all processes training concurrently on this host, weighted uniformly, by budget or by network size."),
+            ConfigOption("thread_allocation_cores", default=0, type=int,
+                info="Number of cores to distribute when threads are allocated automatically. 0 means all cores of the host."),
+            ConfigOption("oom_batch_size_backoffs", default=3, type=int,
+                info="How often the batch size may be halved, if training is estimated or observed to run out of memory in the first epoch. 0 to disable."),
+            ConfigOption("stream_learning_curves", default=False, type=to_bool,
+                info="Report the log of each epoch to learning_curves.json in result_logger_dir while the job is running. Jobs whose training loss diverges are cancelled."),
             ConfigOption("full_eval_each_epoch", default=False, type=to_bool, choices=[True, False],
                 info="Whether to evaluate everything every epoch. Results in more useful output"),
             ConfigOption("best_over_epochs", default=False, type=to_bool, choices=[True, False],
@@ -439,6 +652,34 @@ class TrainNode(PipelineNode):
         return loss, final_log
 
 
+def estimate_training_memory(network, batch_size):
+    """Estimate the memory needed to train the network in bytes.
+    Counts parameters, gradients, two optimizer states and the activations of all layers with known output size.
+    """
+    num_parameters = sum(p.numel() for p in network.parameters())
+    num_activations = sum(getattr(m, "out_features", 0) for m in network.modules())
+    # stored outputs, outputs of the activation function and their gradients
+    return 4 * (4 * num_parameters + 3 * batch_size * num_activations)
+
+
+def get_available_memory(pipeline_config, device):
+    """Get the memory available for training in bytes. None, if unknown."""
+    if device.type == "cuda":
+        return torch.cuda.get_device_properties(device).total_memory - torch.cuda.memory_allocated(device)
+    try:
+        import resource
+    except ImportError:
+        return None
+    if "memory_limit_mb" not in pipeline_config:
+        return None
+    # peak memory so far is an upper bound of the memory in use
+    return pipeline_config["memory_limit_mb"] * 2 ** 20 - resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def is_out_of_memory_error(e):
+    return isinstance(e, MemoryError) or "out of memory" in str(e) or "can't allocate memory" in str(e)
+
+
 def predict(network, test_loader, device, move_network=True, se=False):
     """ predict batchwise """
 
@@ -8,9 +8,13 @@ class ReadInstanceData(PipelineNode):
     def fit(self, pipeline_config, instance):
         # Get data manager for train, val, test data
         if pipeline_config['problem_type'] in ['feature_classification', 'feature_multilabel', 'feature_regression']:
-            dm = DataManager(verbose=pipeline_config["data_manager_verbose"])
+            dm = DataManager(verbose=pipeline_config["data_manager_verbose"],
+                openml_cache_dir=pipeline_config["openml_cache_dir"], openml_offline=pipeline_config["openml_offline"],
+                csv_cache_dir=pipeline_config["csv_cache_dir"])
             if pipeline_config['test_instances'] is not None:
-                dm_test = DataManager(verbose=pipeline_config["data_manager_verbose"])
+                dm_test = DataManager(verbose=pipeline_config["data_manager_verbose"],
+                    openml_cache_dir=pipeline_config["openml_cache_dir"], openml_offline=pipeline_config["openml_offline"],
+                    csv_cache_dir=pipeline_config["csv_cache_dir"])
         else:
             dm = ImageManager(verbose=pipeline_config["data_manager_verbose"])
             if pipeline_config['test_instances'] is not None:
@@ -40,6 +44,12 @@ class ReadInstanceData(PipelineNode):
             ConfigOption("test_split", default=0.0, type=float),
             ConfigOption("problem_type", default='feature_classification', type=str, choices=['feature_classification', 'feature_multilabel', 'feature_regression', 'image_classification']),
             ConfigOption("data_manager_verbose", default=False, type=to_bool),
-            ConfigOption("test_instances", default=None, type=str)
+            ConfigOption("test_instances", default=None, type=str),
+            ConfigOption("openml_cache_dir", default=None, type="directory",
+                info="Directory of a local cache of OpenML datasets. Fill it with scripts/prefetch_openml_datasets.py."),
+            ConfigOption("openml_offline", default=False, type=to_bool,
+                info="Only read OpenML datasets from openml_cache_dir, never access the network."),
+            ConfigOption("csv_cache_dir", default=None, type="directory",
+                info="Directory of the binary cache of converted csv files. By default, the cache is written next to the csv files.")
         ]
         return options
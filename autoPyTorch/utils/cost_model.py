@@ -0,0 +1,189 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import math
+
+import numpy as np
+
+
+class CostModel(object):
+    """ Predicts runtime and peak memory of evaluating a hyperparameter configuration.
+
+    The predictions are based on the number of parameters and activations of the network, which can be derived
+    from the configuration. Once enough jobs finished, the predictions are calibrated by a linear regression
+    on the observed runtimes (in log space) and the observed peak memory.
+
+    Can be used as result logger of the optimization algorithm to observe all finished jobs.
+    """
+
+    # assumed throughput, before the first jobs have been observed
+    prior_flops_per_second = 1e9
+    prior_memory_overhead_mb = 500
+    min_observations = 3
+
+    def __init__(self, pipeline_config, dataset_info):
+        """Initialize the cost model.
+
+        Arguments:
+            pipeline_config {dict} -- The configuration of the pipeline.
+            dataset_info {DatasetInfo} -- Object describing the dataset.
+        """
+        self.pipeline_config = pipeline_config
+        self.num_samples = dataset_info.x_shape[0] * (1 - max(0, min(1, pipeline_config.get("validation_split", 0))))
+        self.num_features = dataset_info.x_shape[1]
+        self.num_outputs = dataset_info.y_shape[1] if len(dataset_info.y_shape) > 1 else 1
+        self.runtime_observations = list()
+        self.memory_observations = list()
+
+    def get_layer_widths(self, config):
+        """Estimate the widths of the hidden layers of the network of the given configuration.
+
+        Arguments:
+            config {dict} -- The hyperparameter configuration.
+
+        Returns:
+            list -- The number of units of each hidden layer.
+        """
+        prefix = "NetworkSelector:" + str(config.get("NetworkSelector:network", "")) + ":"
+        network_config = {k[len(prefix):]: v for k, v in config.items() if k.startswith(prefix)}
+
+        if "num_layers" in network_config:
+            num_layers = int(network_config["num_layers"])
+        elif "num_groups" in network_config:
+            # each residual block has two linear layers
+            num_layers = 2 * int(network_config["num_groups"]) * int(network_config.get("blocks_per_group", 1)) + 1
+        else:
+            num_layers = 1
+
+        units = [v for k, v in sorted(network_config.items()) if k.startswith("num_units_")]
+        if "max_units" in network_config:
+            # shaped networks never have more units than max_units
+            units = [network_config["max_units"]]
+        units = units or [self.num_features]
+        return [int(units[min(i * len(units) // num_layers, len(units) - 1)]) for i in range(num_layers)]
+
+    def get_num_parameters(self, config):
+        """Estimate the number of parameters of the network of the given configuration."""
+        sizes = [self.num_features] + self.get_layer_widths(config) + [self.num_outputs]
+        return sum((a + 1) * b for a, b in zip(sizes[:-1], sizes[1:]))
+
+    def get_num_trained_samples(self, config, budget):
+        """Estimate how many samples the network processes during training with the given budget.
+
+        Returns:
+            float -- The number of samples or None, if the budget limits the runtime directly.
+        """
+        budget_type = self.pipeline_config["budget_type"]
+        if budget_type == "epochs":
+            return budget * self.num_samples
+        if budget_type == "steps":
+            return budget * config.get("CreateDataLoader:batch_size", 128)
+        if budget_type == "data_fraction":
+            return budget * self.num_samples * self.pipeline_config.get("data_fraction_max_epochs", 1)
+        return None
+
+    def get_flops(self, config, budget):
+        """Estimate the floating point operations of training with the given budget (forward and backward pass)."""
+        num_trained_samples = self.get_num_trained_samples(config, budget)
+        if num_trained_samples is None:
+            return None
+        return 6 * self.get_num_parameters(config) * num_trained_samples * max(1, self.pipeline_config.get("cv_splits", 1))
+
+    def get_static_memory(self, config):
+        """Estimate the memory of parameters, optimizer state, activations and data in MB, without any overhead."""
+        batch_size = config.get("CreateDataLoader:batch_size", 128)
+        parameters = 4 * self.get_num_parameters(config)  # weights, gradients and up to two optimizer states
+        activations = 3 * batch_size * sum(self.get_layer_widths(config))  # outputs, activation outputs and gradients
+        data = 2 * self.num_samples * self.num_features  # the data is copied during preprocessing
+        return 4 * (parameters + activations + data) / 2 ** 20
+
+    def predict_runtime(self, config, budget):
+        """Predict the runtime of evaluating a configuration in seconds.
+
+        Arguments:
+            config {dict} -- The hyperparameter configuration.
+            budget {float} -- The budget of the evaluation.
+
+        Returns:
+            float -- The predicted runtime.
+        """
+        flops = self.get_flops(config, budget)
+        if flops is None:
+            return budget  # time budget
+        if len(self.runtime_observations) < self.min_observations:
+            return flops / self.prior_flops_per_second
+        x, y = np.log(np.array(self.runtime_observations)).T
+        slope, intercept = _fit_line(x, y, prior_slope=1)
+        return float(np.exp(intercept + slope * math.log(flops)))
+
+    def predict_memory(self, config):
+        """Predict the peak memory of evaluating a configuration in MB.
+
+        Arguments:
+            config {dict} -- The hyperparameter configuration.
+
+        Returns:
+            float -- The predicted peak memory.
+        """
+        static_memory = self.get_static_memory(config)
+        if not self.is_memory_calibrated():
+            return static_memory + self.prior_memory_overhead_mb
+        x, y = np.array(self.memory_observations).T
+        slope, intercept = _fit_line(x, y, prior_slope=1)
+        return float(max(static_memory, intercept + slope * static_memory))
+
+    def is_memory_calibrated(self):
+        """Whether enough peak memory observations are available to calibrate the memory predictions.
+        The prior does not depend on the data seen so far and should not be used to reject configurations.
+
+        Returns:
+            bool -- Whether the memory predictions are calibrated.
+        """
+        return len(self.memory_observations) >= self.min_observations
+
+    def observe(self, config, budget, runtime, peak_memory_mb=None):
+        """Update the model with a finished evaluation.
+
+        Arguments:
+            config {dict} -- The hyperparameter configuration.
+            budget {float} -- The budget of the evaluation.
+            runtime {float} -- The observed runtime in seconds.
+
+        Keyword Arguments:
+            peak_memory_mb {float} -- The observed peak memory (default: {None})
+        """
+        flops = self.get_flops(config, budget)
+        if flops is not None and flops > 0 and runtime > 0:
+            self.runtime_observations.append((flops, runtime))
+        if peak_memory_mb is not None:
+            self.memory_observations.append((self.get_static_memory(config), peak_memory_mb))
+
+    def order_queued_runs(self, iteration):
+        """Reorder the queued runs of a successive halving iteration, such that the longest runs are started first.
+
+        Arguments:
+            iteration {BaseIteration} -- The iteration to reorder.
+        """
+        queued = [k for k, v in iteration.data.items() if v.status == 'QUEUED']
+        if len(queued) < 2:
+            return
+        queued.sort(key=lambda k: -self.predict_runtime(iteration.data[k].config, iteration.data[k].budget))
+        others = [k for k in iteration.data if k not in queued]
+        iteration.data = dict((k, iteration.data[k]) for k in queued + others)
+
+    def new_config(self, config_id, config, config_info):
+        pass
+
+    def __call__(self, job):
+        if job.result is None or "started" not in job.timestamps or "finished" not in job.timestamps:
+            return
+        self.observe(job.kwargs["config"], job.kwargs["budget"], job.timestamps["finished"] - job.timestamps["started"], job.result.get("peak_memory_mb"))
+
+
+def _fit_line(x, y, prior_slope):
+    """Least squares fit of y = intercept + slope * x. Falls back to the prior slope, if x does not vary."""
+    if np.ptp(x) < 1e-6:
+        return prior_slope, float(np.mean(y - prior_slope * x))
+    slope, intercept = np.polyfit(x, y, 1)
+    return float(slope), float(intercept)
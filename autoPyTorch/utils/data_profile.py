@@ -0,0 +1,173 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import hashlib
+import os
+import pickle
+import tempfile
+import weakref
+from collections import OrderedDict
+import numpy as np
+
+from autoPyTorch.utils.out_of_core import iterate_chunks
+
+
+class DataProfile():
+    """Statistics of the columns of a dataset, computed in a single pass over the data.
+
+    The statistics of the training rows: num_rows, nan_count, min, max, mean and var (nan if a column has no values).
+    The statistics of all rows: has_nan and categories, the sorted unique values of each categorical column (None for numerical columns).
+    """
+
+    def __init__(self, X, train_indices, categorical_features):
+        """Compute the profile.
+
+        Arguments:
+            X {array} -- The dense data. Memory-mapped data is read in chunks.
+            train_indices {array} -- The indices of the training rows.
+            categorical_features {list} -- For each column whether it is categorical.
+        """
+        num_columns = X.shape[1]
+        is_train = np.zeros(X.shape[0], dtype=bool)
+        is_train[train_indices] = True
+
+        self.num_rows = int(np.sum(is_train))
+        self.nan_count = np.zeros(num_columns, dtype=int)
+        self.has_nan = np.zeros(num_columns, dtype=bool)
+        count = np.zeros(num_columns, dtype=int)
+        minimum = np.full(num_columns, np.inf)
+        maximum = np.full(num_columns, -np.inf)
+        mean = np.zeros(num_columns)
+        m2 = np.zeros(num_columns)
+        categorical_columns = [i for i, c in enumerate(categorical_features) if c]
+        chunk_categories = {i: [] for i in categorical_columns}
+
+        for chunk in iterate_chunks(X):
+            block = np.asarray(X[chunk], dtype=np.float64)
+            is_nan = np.isnan(block)
+            self.has_nan |= np.any(is_nan, axis=0)
+            for i in categorical_columns:
+                chunk_categories[i].append(np.unique(block[~is_nan[:, i], i]))
+
+            train_block, train_is_nan = block[is_train[chunk]], is_nan[is_train[chunk]]
+            chunk_count = np.sum(~train_is_nan, axis=0)
+            self.nan_count += np.sum(train_is_nan, axis=0)
+            minimum = np.minimum(minimum, np.min(np.where(train_is_nan, np.inf, train_block), axis=0, initial=np.inf))
+            maximum = np.maximum(maximum, np.max(np.where(train_is_nan, -np.inf, train_block), axis=0, initial=-np.inf))
+
+            # merge mean and variance of the chunk (Welford / Chan et al.)
+            chunk_mean = np.sum(np.where(train_is_nan, 0, train_block), axis=0) / np.maximum(chunk_count, 1)
+            chunk_m2 = np.sum(np.where(train_is_nan, 0, train_block - chunk_mean) ** 2, axis=0)
+            total_count = count + chunk_count
+            delta = chunk_mean - mean
+            mean = mean + delta * chunk_count / np.maximum(total_count, 1)
+            m2 = m2 + chunk_m2 + delta ** 2 * count * chunk_count / np.maximum(total_count, 1)
+            count = total_count
+
+        no_values = count == 0
+        self.min = np.where(no_values, np.nan, minimum)
+        self.max = np.where(no_values, np.nan, maximum)
+        self.mean = np.where(no_values, np.nan, mean)
+        self.var = np.where(no_values, np.nan, m2 / np.maximum(count, 1))
+        self.categories = [np.unique(np.concatenate(chunk_categories[i])) if i in chunk_categories else None
+            for i in range(num_columns)]
+
+    @property
+    def all_nan(self):
+        """Columns without values in the training rows."""
+        return self.nan_count == self.num_rows
+
+
+class DataProfileCache():
+    """Cache of the profiles of the splits of a dataset.
+
+    The cache is shared by all copies of the DatasetInfo, such that each split is only profiled once, not once per configuration.
+    It is not pickled. Evaluations in other processes, e.g. with pynisher, share the profiles through files in a directory.
+    """
+    __slots__ = ["profiles", "max_entries"]
+
+    def __init__(self, max_entries=16):
+        self.profiles = OrderedDict()
+        self.max_entries = max_entries
+
+    def get(self, X, train_indices, categorical_features, directory=None):
+        """Get the profile of a split. The profile is computed, if the split has not been profiled before.
+
+        Arguments:
+            X {array} -- The dense data.
+            train_indices {array} -- The indices of the training rows.
+            categorical_features {list} -- For each column whether it is categorical.
+
+        Keyword Arguments:
+            directory {str} -- Directory where the profiles are shared with other processes. Keyed by the content of the data. (default: {None})
+
+        Returns:
+            DataProfile -- The profile.
+        """
+        key = (id(X), X.shape, hashlib.sha256(np.ascontiguousarray(train_indices)).hexdigest(), tuple(categorical_features))
+        if key in self.profiles and self.profiles[key][0]() is X:
+            self.profiles.move_to_end(key)
+            return self.profiles[key][1]
+
+        filename = None
+        if directory is not None:
+            filename = os.path.join(directory, "profile_%s.pkl" % get_content_hash(X, train_indices, categorical_features))
+        profile = load_profile(filename)
+        if profile is None:
+            profile = DataProfile(X, train_indices, categorical_features)
+            save_profile(profile, filename)
+        self.profiles[key] = (weakref.ref(X), profile)
+        while len(self.profiles) > self.max_entries:
+            self.profiles.popitem(last=False)
+        return profile
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __copy__(self):
+        return self
+
+    def __reduce__(self):
+        return (DataProfileCache, (self.max_entries, ))
+
+
+def get_content_hash(X, train_indices, categorical_features):
+    """Hash the content of a split. Memory-mapped data is read in chunks.
+
+    Arguments:
+        X {array} -- The dense data.
+        train_indices {array} -- The indices of the training rows.
+        categorical_features {list} -- For each column whether it is categorical.
+
+    Returns:
+        str -- The hash.
+    """
+    content_hash = hashlib.sha256(str((X.dtype, X.shape, list(categorical_features))).encode())
+    for chunk in iterate_chunks(X):
+        content_hash.update(np.ascontiguousarray(X[chunk]))
+    content_hash.update(np.ascontiguousarray(train_indices, dtype=np.int64))
+    return content_hash.hexdigest()
+
+
+def load_profile(filename):
+    """Load a profile stored by another process. Returns None, if there is none."""
+    if filename is None:
+        return None
+    try:
+        with open(filename, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+def save_profile(profile, filename):
+    """Store a profile for other processes. The file is replaced atomically, such that readers never see a partial profile."""
+    if filename is None:
+        return
+    try:
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(filename), suffix=".tmp", delete=False) as f:
+            pickle.dump(profile, f)
+        os.replace(f.name, filename)
+    except OSError:
+        pass  # the profile is not shared, e.g. because the directory has been removed
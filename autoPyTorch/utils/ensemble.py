@@ -155,7 +155,7 @@ def start_server(host):
     return host, port, p
 
 class ensemble_logger(object):
-    def __init__(self, directory, overwrite):
+    def __init__(self, directory, overwrite, append=False):
         self.start_time = time.time()
         self.directory = directory
         self.overwrite = overwrite
@@ -165,6 +165,14 @@ class ensemble_logger(object):
         self.file_name = os.path.join(directory, 'predictions_for_ensemble.npy')
         self.test_file_name = os.path.join(directory, 'test_predictions_for_ensemble.npy')
 
+        # continue the prediction files of a resumed run
+        if append:
+            for file_name in [self.file_name, self.test_file_name]:
+                with open(file_name, 'a') as fh: pass
+            self.labels_written = os.path.getsize(self.file_name) > 0
+            self.test_labels_written = os.path.getsize(self.test_file_name) > 0
+            return
+
         try:
             with open(self.file_name, 'x') as fh: pass
         except FileExistsError:
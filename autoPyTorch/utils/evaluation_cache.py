@@ -0,0 +1,165 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import fasteners, hashlib, json, os, sqlite3, time
+
+import numpy as np
+import scipy.sparse
+
+# Increase, if the format of the stored results changes
+CACHE_FORMAT_VERSION = 1
+
+# Pipeline config options that do not influence the result of a single evaluation
+IGNORED_PIPELINE_CONFIG_OPTIONS = ["run_id", "task_id", "working_dir", "result_logger_dir", "log_level", "network_interface_name",
+    "min_workers", "max_runtime", "num_iterations", "min_budget", "eta", "algorithm", "resume", "use_tensorboard_logger",
+    "run_worker_on_master_node", "use_pynisher", "memory_limit_mb", "ensemble_server_credentials", "thread_allocation",
+    "thread_allocation_cores", "hyperparameter_search_space_updates", "evaluation_cache_dir", "evaluation_cache_max_entries",
+    "force_garbage_collection", "packed_evaluation_size"]
+
+
+class EvaluationCache():
+    """ Stores the results of evaluated configurations across runs in a local SQLite database.
+
+    Access to the database is protected by a file lock, such that all workers on a host can share the cache.
+    Entries written by a different version of autoPyTorch are removed when the cache is opened.
+    """
+
+    def __init__(self, cache_dir, max_entries=100000, version=None):
+        """Open the cache.
+
+        Arguments:
+            cache_dir {str} -- The directory of the cache.
+
+        Keyword Arguments:
+            max_entries {int} -- The least recently used entries are removed if there are more entries (default: {100000})
+            version {str} -- Entries with a different version are invalid. Defaults to the installed version of autoPyTorch (default: {None})
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.filename = os.path.join(cache_dir, "evaluation_cache.sqlite")
+        self.lock = fasteners.InterProcessLock(self.filename + ".lock")
+        self.max_entries = max_entries
+        self.version = "%s-%s" % (version or get_package_version(), CACHE_FORMAT_VERSION)
+
+        with self.lock, self._connect() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, version TEXT, result TEXT, last_access REAL)")
+            connection.execute("DELETE FROM results WHERE version != ?", (self.version, ))
+
+    def get(self, key):
+        """Get a stored result.
+
+        Arguments:
+            key {str} -- The key of the evaluation, see get_cache_key.
+
+        Returns:
+            dict -- The stored result or None, if the evaluation is not in the cache.
+        """
+        with self.lock, self._connect() as connection:
+            row = connection.execute("SELECT result FROM results WHERE key = ? AND version = ?", (key, self.version)).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        """Store a result.
+
+        Arguments:
+            key {str} -- The key of the evaluation, see get_cache_key.
+            result {dict} -- The result to store. Must be serializable to json.
+        """
+        with self.lock, self._connect() as connection:
+            connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", (key, self.version, json.dumps(result, default=_to_builtin), time.time()))
+            connection.execute("DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries, ))
+
+    def clear(self):
+        """Remove all entries."""
+        with self.lock, self._connect() as connection:
+            connection.execute("DELETE FROM results")
+
+    def __len__(self):
+        with self.lock, self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _connect(self):
+        return _closing_connection(sqlite3.connect(self.filename, timeout=60))
+
+
+class _closing_connection(object):
+    """Commits on exit like a sqlite3 connection used as context manager, but also closes the connection."""
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self.connection.__enter__()
+
+    def __exit__(self, *args):
+        try:
+            return self.connection.__exit__(*args)
+        finally:
+            self.connection.close()
+
+
+def get_cache_key(config, budget, budget_type, pipeline_config, data_fingerprint):
+    """Compute the key of an evaluation.
+
+    Arguments:
+        config {dict} -- The hyperparameter configuration.
+        budget {float} -- The budget of the evaluation.
+        budget_type {str} -- The type of the budget.
+        pipeline_config {dict} -- The configuration of the pipeline. Options that do not affect the result are ignored.
+        data_fingerprint {str} -- Fingerprint of the data, see get_data_fingerprint.
+
+    Returns:
+        str -- The key.
+    """
+    relevant_pipeline_config = {k: v for k, v in pipeline_config.items() if k not in IGNORED_PIPELINE_CONFIG_OPTIONS}
+    content = json.dumps([config, float(budget), budget_type, relevant_pipeline_config, data_fingerprint], sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def get_data_fingerprint(*arrays):
+    """Compute a fingerprint of the given data.
+
+    Arguments:
+        *arrays {array} -- Dense or sparse arrays. None is allowed.
+
+    Returns:
+        str -- The fingerprint.
+    """
+    fingerprint = hashlib.sha256()
+    for array in arrays:
+        if array is None:
+            fingerprint.update(b"None")
+            continue
+        if scipy.sparse.issparse(array):
+            array = array.tocsr()
+            parts = [array.data, array.indices, array.indptr]
+        else:
+            array = np.asarray(array)
+            parts = [array]
+        fingerprint.update(str(array.shape).encode())
+        for part in parts:
+            fingerprint.update(str(part.dtype).encode())
+            if part.dtype == object:
+                fingerprint.update(str(part.tolist()).encode())
+            else:
+                fingerprint.update(np.ascontiguousarray(part).data)
+    return fingerprint.hexdigest()
+
+
+def _to_builtin(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError("Object of type %s is not JSON serializable" % type(obj).__name__)
+
+
+def get_package_version():
+    try:
+        import pkg_resources
+        return pkg_resources.get_distribution("autoPyTorch").version
+    except Exception:
+        return "unknown"
@@ -0,0 +1,33 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import importlib
+import sys
+
+
+def lazy_import(package_name, attributes):
+    """Create the module level __getattr__ and __dir__ (PEP 562) of a package, that import its attributes on first use.
+    Heavy dependencies like torch or hpbandster are only loaded, when something that needs them is accessed.
+
+    Usage in the __init__.py of a package:
+        __getattr__, __dir__ = lazy_import(__name__, {"ClassName": "package.module", ...})
+
+    Arguments:
+        package_name {str} -- The name of the package.
+        attributes {dict} -- Maps the name of each attribute to the module that defines it.
+
+    Returns:
+        tuple -- __getattr__ and __dir__ of the package.
+    """
+    def __getattr__(name):
+        if name not in attributes:
+            raise AttributeError("module %r has no attribute %r" % (package_name, name))
+        value = getattr(importlib.import_module(attributes[name]), name)
+        setattr(sys.modules[package_name], name, value)  # __getattr__ is not called again
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package_name])) | set(attributes))
+
+    return __getattr__, __dir__
@@ -0,0 +1,80 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import json, numbers, os, time
+
+import autoPyTorch.utils.thread_read_write as thread_read_write
+
+LEARNING_CURVES_FILE = "learning_curves.json"
+
+
+def report_epoch(directory, config_id, budget, cv_index, epoch, log):
+    """Append the log of a finished epoch to the learning curves of the run.
+    Can be called from every process that has access to the result logger directory.
+
+    Arguments:
+        directory {str} -- The result logger directory.
+        config_id {tuple} -- The id of the trained configuration.
+        budget {float} -- The budget the network is trained with.
+        cv_index {int} -- The index of the cross validation split.
+        epoch {int} -- The epoch that finished.
+        log {dict} -- The log of the training so far. Lists contain a value per epoch, only their last value is reported. Only numbers are reported.
+    """
+    log = {k: (v[-1] if isinstance(v, list) and len(v) > 0 else v) for k, v in log.items()}
+    metrics = {k: float(v) for k, v in log.items() if isinstance(v, numbers.Number) and not isinstance(v, bool)}
+    line = json.dumps([list(config_id), budget, cv_index, epoch, time.time(), metrics])
+    thread_read_write.append(os.path.join(directory, LEARNING_CURVES_FILE), line + "\n")
+
+
+class LearningCurveReader(object):
+    """ Reads the learning curves reported by the workers while their jobs are still running.
+    Only the lines added since the last call are read, so it can be polled cheaply.
+    """
+
+    def __init__(self, directory):
+        """Initialize the reader.
+
+        Arguments:
+            directory {str} -- The result logger directory.
+        """
+        self.filename = os.path.join(directory, LEARNING_CURVES_FILE)
+        self.offset = 0
+        self.learning_curves = dict()
+
+    def update(self):
+        """Read the epochs reported since the last update.
+
+        Returns:
+            list -- Tuples (config_id, budget, cv_index, epoch, timestamp, metrics) of the new epochs.
+        """
+        if not os.path.exists(self.filename):
+            return []
+        new_epochs = list()
+        # binary mode, since the offset is counted in bytes
+        with open(self.filename, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # line is still being written
+                self.offset += len(line)
+                config_id, budget, cv_index, epoch, timestamp, metrics = json.loads(line.decode())
+                entry = (tuple(config_id), budget, cv_index, epoch, timestamp, metrics)
+                self.learning_curves.setdefault((entry[0], budget), dict()).setdefault(cv_index, list()).append(entry[3:])
+                new_epochs.append(entry)
+        return new_epochs
+
+    def get_learning_curve(self, config_id, budget, cv_index=0):
+        """Get the learning curve of a job, as far as it has been read.
+
+        Arguments:
+            config_id {tuple} -- The id of the configuration.
+            budget {float} -- The budget the network is trained with.
+
+        Keyword Arguments:
+            cv_index {int} -- The index of the cross validation split (default: {0})
+
+        Returns:
+            list -- Tuples (epoch, timestamp, metrics) of the reported epochs.
+        """
+        return self.learning_curves.get((tuple(config_id), budget), dict()).get(cv_index, [])
@@ -0,0 +1,230 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import os
+import tempfile
+import weakref
+import numpy as np
+
+# transforms of memory-mapped data process chunks of about this many bytes at once
+CHUNK_BYTES = 64 * 1024 * 1024
+
+# statistics of memory-mapped data that can not be computed chunk by chunk are estimated on a subsample of at most this many rows
+FIT_SUBSAMPLE_ROWS = 100000
+
+
+def is_memmap(array):
+    """Check whether the array is backed by a file on disk.
+    Views of memory-mapped arrays are backed by the file as well, copies (e.g. fancy indexing) are not.
+
+    Arguments:
+        array {array} -- The array to check.
+
+    Returns:
+        bool -- Whether the array is memory-mapped.
+    """
+    return isinstance(array, np.memmap) and array.filename is not None
+
+
+def load_array(path):
+    """Load an array from disk without reading it into memory.
+    .npy files are memory-mapped directly. Parquet files are converted chunk by chunk to a temporary memory-mapped array (requires pyarrow).
+
+    Arguments:
+        path {str} -- Path to a .npy or .parquet file.
+
+    Returns:
+        np.memmap -- The memory-mapped array.
+    """
+    path = os.fspath(path)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npy":
+        return np.load(path, mmap_mode="r")
+    if extension in [".parquet", ".pq"]:
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        num_columns = len(parquet_file.schema_arrow.names)
+        result = create_memmap((parquet_file.metadata.num_rows, num_columns), np.float64)
+        row = 0
+        for batch in parquet_file.iter_batches():
+            chunk = np.column_stack([column.to_numpy(zero_copy_only=False) for column in batch.columns]) \
+                if batch.num_columns > 0 else np.empty((batch.num_rows, 0))
+            result[row:row + batch.num_rows] = chunk
+            row += batch.num_rows
+        result.flush()
+        return result[:, 0] if num_columns == 1 else result
+    raise ValueError("Unable to load data from %s. Supported file types are .npy and .parquet" % path)
+
+
+def create_memmap(shape, dtype):
+    """Create an uninitialized memory-mapped array in a temporary file.
+    The file is created in the default temporary directory (see TMPDIR) and deleted when the array is garbage collected.
+
+    Arguments:
+        shape {tuple} -- The shape of the array.
+        dtype {dtype} -- The data type of the array.
+
+    Returns:
+        np.memmap -- The memory-mapped array.
+    """
+    if np.prod(shape) == 0:
+        # empty files can not be memory-mapped
+        return np.empty(shape, dtype=dtype)
+    fd, path = tempfile.mkstemp(prefix="autonet_", suffix=".dat")
+    os.close(fd)
+    result = np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+    weakref.finalize(result, _remove_file, path)
+    return result
+
+
+def iterate_chunks(array, chunk_bytes=None):
+    """Iterate over slices of rows, such that each chunk of the array has a bounded size.
+
+    Arguments:
+        array {array} -- The array to iterate over.
+
+    Keyword Arguments:
+        chunk_bytes {int} -- The maximum size of a chunk in bytes. (default: {CHUNK_BYTES})
+
+    Returns:
+        generator -- The slices.
+    """
+    chunk_rows = get_chunk_rows(array, chunk_bytes)
+    for start in range(0, array.shape[0], chunk_rows):
+        yield slice(start, min(start + chunk_rows, array.shape[0]))
+
+
+def get_chunk_rows(array, chunk_bytes=None):
+    """Get the number of rows of the array that fit into a chunk.
+
+    Arguments:
+        array {array} -- The array.
+
+    Keyword Arguments:
+        chunk_bytes {int} -- The maximum size of a chunk in bytes. (default: {CHUNK_BYTES})
+
+    Returns:
+        int -- The number of rows, at least one.
+    """
+    row_bytes = max(1, array.itemsize * int(np.prod(array.shape[1:])))
+    return max(1, (chunk_bytes or CHUNK_BYTES) // row_bytes)
+
+
+def iterate_rows(X, indices, chunk_bytes=None):
+    """Iterate over the given rows of an array in chunks, such that only a chunk of rows is in memory at once.
+
+    Arguments:
+        X {array} -- The array, e.g. memory-mapped.
+        indices {array} -- The indices of the rows.
+
+    Keyword Arguments:
+        chunk_bytes {int} -- The maximum size of a chunk in bytes. (default: {CHUNK_BYTES})
+
+    Returns:
+        generator -- The chunks of rows, in the order of the rows in the array.
+    """
+    indices = np.sort(indices)
+    chunk_rows = get_chunk_rows(X, chunk_bytes)
+    for start in range(0, len(indices), chunk_rows):
+        yield np.asarray(X[indices[start:start + chunk_rows]])
+
+
+def subsample_rows(indices, max_rows=None, seed=0):
+    """Get a random subsample of the given row indices.
+
+    Arguments:
+        indices {array} -- The indices of the rows.
+
+    Keyword Arguments:
+        max_rows {int} -- The maximum size of the subsample. (default: {FIT_SUBSAMPLE_ROWS})
+        seed {int} -- Random seed. (default: {0})
+
+    Returns:
+        array -- The sorted subsample. All indices if there are at most max_rows.
+    """
+    indices = np.asarray(indices)
+    max_rows = max_rows or FIT_SUBSAMPLE_ROWS
+    if len(indices) <= max_rows:
+        return np.sort(indices)
+    return np.sort(np.random.RandomState(seed).choice(indices, max_rows, replace=False))
+
+
+def fit_in_chunks(column_transformer, X, indices):
+    """Fit a ColumnTransformer on the given rows of memory-mapped data, without reading all of them into memory.
+    If all transformers support partial_fit, they are fit incrementally on chunks of rows.
+    Otherwise, the ColumnTransformer is fit on a random subsample of the rows (see FIT_SUBSAMPLE_ROWS).
+
+    Arguments:
+        column_transformer {ColumnTransformer} -- The transformer to fit.
+        X {np.memmap} -- The memory-mapped array.
+        indices {array} -- The indices of the rows to fit on.
+
+    Returns:
+        ColumnTransformer -- The fitted transformer.
+    """
+    chunks = iterate_rows(X, indices)
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        return column_transformer.fit(X[indices])
+    column_transformer.fit(first_chunk)
+
+    transformers = [(transformer, columns) for _, transformer, columns in column_transformer.transformers_
+        if not isinstance(transformer, str) and len(columns) > 0]  # skip "drop", "passthrough" and empty selections
+    if not all(hasattr(transformer, "partial_fit") for transformer, _ in transformers):
+        return column_transformer.fit(X[subsample_rows(indices)])
+    for chunk in chunks:
+        for transformer, columns in transformers:
+            transformer.partial_fit(chunk[:, columns])
+    return column_transformer
+
+
+def transform_in_chunks(transform, X, dtype=None):
+    """Apply a row-wise transformation to a memory-mapped array.
+    The transformation is applied to chunks of rows and the result is written to a new memory-mapped array.
+
+    Arguments:
+        transform {function} -- Transforms a chunk of rows. Must return the same number of columns for every chunk.
+        X {np.memmap} -- The memory-mapped array.
+
+    Keyword Arguments:
+        dtype {dtype} -- The data type of the result. Defaults to the data type returned by the transformation. (default: {None})
+
+    Returns:
+        np.memmap -- The transformed array.
+    """
+    result = None
+    for chunk in iterate_chunks(X):
+        transformed = np.asarray(transform(X[chunk]))
+        if result is None:
+            result = create_memmap((X.shape[0], ) + transformed.shape[1:], dtype or transformed.dtype)
+        result[chunk] = transformed
+    if result is None:
+        return np.asarray(transform(X))
+    result.flush()
+    return result
+
+
+def concat_memmaps(upper, lower):
+    """Concatenate two arrays along the first axis into a new memory-mapped array.
+
+    Arguments:
+        upper {array} -- upper part of concatenated array
+        lower {array} -- lower part of concatenated array
+
+    Returns:
+        np.memmap -- concatenated array
+    """
+    result = create_memmap((upper.shape[0] + lower.shape[0], ) + upper.shape[1:], np.result_type(upper, lower))
+    for offset, array in [(0, upper), (upper.shape[0], lower)]:
+        for chunk in iterate_chunks(array):
+            result[offset + chunk.start:offset + chunk.stop] = array[chunk]
+    result.flush()
+    return result
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
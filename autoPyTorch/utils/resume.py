@@ -0,0 +1,136 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import json, os
+
+import numpy as np
+from hpbandster.core.result import json_result_logger, logged_results_to_HBS_result
+
+from autoPyTorch.components.training.job_cancellation import is_partial_result
+
+
+RESUME_STATE_FILE = "resume_state.json"
+
+
+class resumable_json_result_logger(json_result_logger):
+    """json_result_logger that keeps the logged results of an interrupted run, if the run should be resumed."""
+
+    def __init__(self, directory, resume=False):
+        """Initialize the logger.
+
+        Arguments:
+            directory {str} -- The directory where configs.json and results.json are stored.
+
+        Keyword Arguments:
+            resume {bool} -- Append to existing files instead of overwriting them (default: {False})
+        """
+        if not resume:
+            super(resumable_json_result_logger, self).__init__(directory, overwrite=True)
+            return
+
+        os.makedirs(directory, exist_ok=True)
+        self.config_fn = os.path.join(directory, 'configs.json')
+        self.results_fn = os.path.join(directory, 'results.json')
+        for filename in [self.config_fn, self.results_fn]:
+            with open(filename, 'a'):
+                pass
+        self.config_ids = set(tuple(line[0]) for line in _read_json_lines(self.config_fn))
+
+
+def restore_logged_results(directory):
+    """Restore the results of an interrupted run from the result logger directory.
+
+    The config ids of the logged results are rewritten to the ids the warmstart iteration of hpbandster
+    assigns, such that the results of the resumed run do not collide with the restored ones.
+    The progress of all previous runs is stored in resume_state.json.
+
+    Arguments:
+        directory {str} -- The result logger directory of the interrupted run.
+
+    Returns:
+        tuple -- The restored Result (None if nothing has been logged), the runtime already used,
+                 the number of already started iterations and a dict that maps (config, budget) to the logged result.
+    """
+    state_file = os.path.join(directory, RESUME_STATE_FILE)
+    state = {"elapsed_time": 0, "num_iterations": 0}
+    if os.path.exists(state_file):
+        with open(state_file, "r") as f:
+            state.update(json.load(f))
+
+    configs = _read_json_lines(os.path.join(directory, 'configs.json'))
+    results = _read_json_lines(os.path.join(directory, 'results.json'))
+    if not results:
+        return None, state["elapsed_time"], state["num_iterations"], dict()
+
+    # progress of the interrupted run. Restored results of earlier runs already have iteration -1.
+    new_results = [r for r in results if r[0][0] >= 0]
+    if new_results:
+        state["elapsed_time"] += max(r[2]["finished"] for r in new_results) - min(r[2]["submitted"] for r in new_results)
+        state["num_iterations"] += len(set(r[0][0] for r in new_results))
+
+    # same order as in the warmstart iteration of hpbandster
+    id_mapping = dict()
+    for config_id, config, *_ in configs:
+        if tuple(config_id) not in id_mapping:
+            id_mapping[tuple(config_id)] = (-1, 0, len(id_mapping))
+    configs = [[list(id_mapping[tuple(c[0])])] + c[1:] for c in configs]
+    results = [[list(id_mapping[tuple(r[0])])] + r[1:] for r in results if tuple(r[0]) in id_mapping]
+
+    _write_json_lines(os.path.join(directory, 'configs.json'), configs)
+    _write_json_lines(os.path.join(directory, 'results.json'), results)
+    for filename in ['predictions_for_ensemble.npy', 'test_predictions_for_ensemble.npy']:
+        _remap_ensemble_prediction_file(os.path.join(directory, filename), id_mapping)
+    with open(state_file, "w") as f:
+        json.dump(state, f)
+
+    config_by_id = {tuple(c[0]): c[1] for c in configs}
+    evaluated = dict()
+    for config_id, budget, _, result, _ in results:
+        if result is not None and result["loss"] is not None and not is_partial_result(result):
+            evaluated[get_evaluation_key(config_by_id[tuple(config_id)], budget)] = result
+    return logged_results_to_HBS_result(directory), state["elapsed_time"], state["num_iterations"], evaluated
+
+
+def get_evaluation_key(config, budget):
+    """Key to look up the result of a configuration evaluated on a budget."""
+    return json.dumps(config, sort_keys=True), float(budget)
+
+
+def _read_json_lines(filename):
+    if not os.path.exists(filename):
+        return []
+    lines = list()
+    with open(filename, "r") as f:
+        for line in f:
+            try:
+                lines.append(json.loads(line))
+            except ValueError:
+                pass  # the last line might be incomplete, if the run has been killed while writing it
+    return lines
+
+
+def _write_json_lines(filename, lines):
+    with open(filename + ".tmp", "w") as f:
+        for line in lines:
+            f.write(json.dumps(line))
+            f.write("\n")
+    os.replace(filename + ".tmp", filename)
+
+
+def _remap_ensemble_prediction_file(filename, id_mapping):
+    if not os.path.exists(filename) or os.path.getsize(filename) == 0:
+        return
+    with open(filename, "rb") as f, open(filename + ".tmp", "wb") as out:
+        np.save(out, np.load(f, allow_pickle=True))  # labels
+        while True:
+            try:
+                job_id, budget, timestamps = np.load(f, allow_pickle=True)
+                predictions = np.load(f, allow_pickle=True)
+            except (EOFError, OSError, ValueError):
+                break  # the last entry might be incomplete, if the run has been killed while writing it
+            if tuple(job_id) not in id_mapping:
+                continue
+            np.save(out, np.array([id_mapping[tuple(job_id)], budget, timestamps], dtype=object))
+            np.save(out, predictions)
+    os.replace(filename + ".tmp", filename)
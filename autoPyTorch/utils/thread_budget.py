@@ -0,0 +1,126 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import fasteners, json, math, os, tempfile
+
+from autoPyTorch.utils.thread_read_write import read, write
+
+
+class ThreadBudgetManager():
+    """ Distributes the cores of the host among all processes that train networks concurrently.
+
+    The processes register themselves in a registry file shared by all processes on the host.
+    Each process gets a share of the cores proportional to its weight. Since the number of threads is
+    a per process setting in PyTorch, there is at most one registry entry per process.
+    """
+
+    def __init__(self, num_cores=None, registry_file=None):
+        """Initialize the manager.
+
+        Keyword Arguments:
+            num_cores {int} -- The number of cores to distribute. Defaults to all cores of the host (default: {None})
+            registry_file {str} -- The file where the running jobs are registered (default: {None})
+        """
+        self.num_cores = num_cores or os.cpu_count() or 1
+        self.registry_file = registry_file or os.path.join(tempfile.gettempdir(), "autonet_thread_budget.json")
+        self.pid = str(os.getpid())
+
+    def register(self, weight=1):
+        """Register a job of the current process.
+
+        Keyword Arguments:
+            weight {float} -- The weight of the job (default: {1})
+
+        Returns:
+            tuple -- number of intra-op and inter-op threads the job should use
+        """
+        with fasteners.InterProcessLock('{0}.lock'.format(self.registry_file)):
+            registry = self._read_registry()
+            registry[self.pid] = max(float(weight), 1e-6)
+            write(self.registry_file, json.dumps(registry))
+        return self.compute_allocation(registry)[self.pid]
+
+    def unregister(self):
+        """Remove the job of the current process from the registry."""
+        with fasteners.InterProcessLock('{0}.lock'.format(self.registry_file)):
+            registry = self._read_registry()
+            registry.pop(self.pid, None)
+            write(self.registry_file, json.dumps(registry))
+
+    def get_allocation(self):
+        """Get the current allocation of the job of the current process, e.g. after other jobs finished.
+
+        Returns:
+            tuple -- number of intra-op and inter-op threads the job should use
+        """
+        with fasteners.InterProcessLock('{0}.lock'.format(self.registry_file)):
+            registry = self._read_registry()
+        if self.pid not in registry:
+            return self.register()
+        return self.compute_allocation(registry)[self.pid]
+
+    def estimate_allocation(self, weight=1):
+        """Get the allocation a job of the current process would get, without registering it.
+        Used for work that precedes the job, e.g. preprocessing.
+
+        Keyword Arguments:
+            weight {float} -- The weight of the job (default: {1})
+
+        Returns:
+            tuple -- number of intra-op and inter-op threads the job should use
+        """
+        with fasteners.InterProcessLock('{0}.lock'.format(self.registry_file)):
+            registry = self._read_registry()
+        registry[self.pid] = max(float(weight), 1e-6)
+        return self.compute_allocation(registry)[self.pid]
+
+    def compute_allocation(self, registry):
+        """Split the cores among the registered jobs, proportional to their weight.
+
+        Arguments:
+            registry {dict} -- Maps process ids to weights.
+
+        Returns:
+            dict -- Maps process ids to a tuple (intra-op threads, inter-op threads)
+        """
+        total_weight = sum(registry.values())
+        shares = {pid: self.num_cores * weight / total_weight for pid, weight in registry.items()}
+
+        # largest remainder rounding, such that all cores are used
+        cores = {pid: int(math.floor(share)) for pid, share in shares.items()}
+        remaining = self.num_cores - sum(cores.values())
+        for pid in sorted(shares, key=lambda pid: (cores[pid] - shares[pid], pid))[:max(0, remaining)]:
+            cores[pid] += 1
+        return {pid: (max(1, c), max(1, c // 4)) for pid, c in cores.items()}
+
+    def _read_registry(self):
+        registry = json.loads(read(self.registry_file) or '{}')
+        return {pid: weight for pid, weight in registry.items() if _process_alive(int(pid))}
+
+
+def get_num_threads(pipeline_config):
+    """Get the number of threads of the job, for work that precedes training, e.g. preprocessing.
+    The job gets torch_num_threads or, if the threads are allocated by the thread budget, the threads it would get for training.
+
+    Arguments:
+        pipeline_config {dict} -- The pipeline config, with the thread options of the TrainNode.
+
+    Returns:
+        int -- The number of threads. None for the number of processors.
+    """
+    thread_allocation = pipeline_config.get("thread_allocation", "fixed")
+    if thread_allocation == "fixed":
+        num_threads = pipeline_config.get("torch_num_threads", 1)
+        return num_threads if num_threads > 0 else None
+    return ThreadBudgetManager(num_cores=pipeline_config.get("thread_allocation_cores")).estimate_allocation()[0]
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
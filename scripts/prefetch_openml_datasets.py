@@ -0,0 +1,31 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(__file__, "..", "..")))
+
+from autoPyTorch.data_management.data_reader import OpenMlReader
+
+import argparse
+
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Download OpenML datasets to a local cache, such that benchmarks can run offline.')
+    parser.add_argument("--cache_dir", required=True, help="The directory of the cache. Use it as openml_cache_dir in the benchmark config.")
+    parser.add_argument("--api_key", default=None, help="The OpenML api key.")
+    parser.add_argument('datasets', nargs="+", help='Datasets to download: openml:<id>, <id> or instance files containing one dataset per line.')
+    args = parser.parse_args()
+
+    dataset_ids = []
+    for dataset in args.datasets:
+        if os.path.isfile(dataset):
+            with open(dataset, "r") as instances_file:
+                dataset_ids.extend(int(line.strip().split(":")[1]) for line in instances_file if line.strip().startswith("openml:"))
+        else:
+            dataset_ids.append(int(dataset.split(":")[-1]))
+
+    for i, dataset_id in enumerate(dataset_ids):
+        print("Prefetch dataset %d (%d/%d)" % (dataset_id, i + 1, len(dataset_ids)))
+        reader = OpenMlReader(dataset_id, api_key=args.api_key, cache_dir=args.cache_dir)
+        reader.read()
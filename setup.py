@@ -40,7 +40,7 @@ setuptools.setup(
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: BSD License",
     ],
-	python_requires='>=3',
+	python_requires='>=3.7',
     platforms=['Linux'],
     install_requires=requirements,
     data_files=[('', add_presets)],
@@ -0,0 +1,87 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import numpy as np
+import pandas as pd
+
+from autoPyTorch.data_management.data_converter import DataConverter
+from numpy.testing import assert_array_equal
+
+
+def convert_column(column, numerical_min_unique_values=3):
+    """Type and encode a single column, one value at a time. Returns None for constant columns."""
+    values = []
+    for value in column:
+        if not pd.isnull(value) and value not in values:
+            values.append(value)
+    has_nan = any(pd.isnull(value) for value in column)
+    if column.dtype != np.dtype("object"):
+        values = sorted(values)
+    if len(values) + has_nan == 1:
+        return None
+    if len(values) + has_nan < numerical_min_unique_values or any(type(value) is str for value in values):
+        return True, np.array([len(values) if pd.isnull(value) else values.index(value) for value in column], dtype=np.float32)
+    return False, column.astype(np.float32)
+
+
+class TestDataConverter(unittest.TestCase):
+
+    def setUp(self):
+        random = np.random.RandomState(1)
+        num_rows = 50
+        numerical = random.rand(num_rows)
+        numerical[::7] = np.nan
+        self.columns = [
+            random.randint(0, 4, num_rows).astype(float),  # few values: categorical
+            numerical,  # numerical with missing values
+            np.ones(num_rows),  # constant: deleted
+            np.where(random.rand(num_rows) < 0.3, np.nan, 5.0),  # a value and missing values
+            np.full(num_rows, np.nan),  # only missing values: deleted
+            random.randint(0, 100, num_rows).astype(float),
+        ]
+        strings = random.choice(["b", "a", "c"], num_rows).astype(object)
+        strings[::5] = np.nan
+        mixed = random.randint(0, 50, num_rows).astype(object)
+        mixed[3], mixed[10] = "x", None
+        self.object_columns = self.columns + [strings, mixed]
+
+    def assert_converted(self, matrix, result, categorical):
+        expected = [convert_column(matrix[:, i]) for i in range(matrix.shape[1])]
+        expected = [column for column in expected if column is not None]
+        self.assertEqual(categorical, [is_categorical for is_categorical, _ in expected])
+        self.assertEqual(result.dtype, np.float32)
+        self.assertEqual(result.shape, (matrix.shape[0], len(expected)))
+        for j, (_, column) in enumerate(expected):
+            assert_array_equal(result[:, j], column)
+
+    def test_numerical_matrix(self):
+        matrix = np.column_stack(self.columns)
+        for column_block_size, n_jobs in [(256, 1), (2, 1), (2, 3)]:
+            converter = DataConverter(column_block_size=column_block_size, n_jobs=n_jobs)
+            result, categorical = converter.convert_matrix(matrix, [], [])
+            self.assert_converted(matrix, result, categorical)
+
+    def test_object_matrix(self):
+        matrix = np.column_stack(self.object_columns).astype(object)
+        for column_block_size, n_jobs in [(256, 1), (3, 1), (3, 3)]:
+            converter = DataConverter(column_block_size=column_block_size, n_jobs=n_jobs)
+            result, categorical = converter.convert_matrix(matrix, [], [])
+            self.assert_converted(matrix, result, categorical)
+
+    def test_object_and_numerical_matrix(self):
+        # the same numbers give the same result, whether they are objects or not
+        matrix = np.column_stack(self.columns)
+        numerical_result = DataConverter(column_block_size=2).convert_matrix(matrix, [], [])
+        object_result = DataConverter(column_block_size=2).convert_matrix(matrix.astype(object), [], [])
+        self.assertEqual(numerical_result[1], object_result[1])
+        numerical_columns = [j for j, is_categorical in enumerate(numerical_result[1]) if not is_categorical]
+        assert_array_equal(numerical_result[0][:, numerical_columns], object_result[0][:, numerical_columns])
+
+    def test_force_categorical_and_numerical(self):
+        matrix = np.column_stack(self.columns)
+        result, categorical = DataConverter(column_block_size=2).convert_matrix(matrix, [5], [0])
+        self.assertEqual(categorical, [False, False, True, True])
+        assert_array_equal(result[:, 0], matrix[:, 0])
+        assert_array_equal(result[:, 3], np.unique(matrix[:, 5], return_inverse=True)[1])
@@ -0,0 +1,90 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from unittest import mock
+
+from autoPyTorch.data_management.data_reader import CSVReader
+from numpy.testing import assert_array_equal
+
+
+class TestCSVReader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write_csv(self, rows):
+        file_name = os.path.join(self.directory, "data.csv")
+        with open(file_name, "w") as f:
+            f.write("a,b,c,target\n")
+            f.write("\n".join(rows) + "\n")
+        return file_name
+
+    def test_read_in_chunks(self):
+        # the strings only occur in the last chunk
+        file_name = self.write_csv(["1,2.5,?,0", "2,?,3,1", "3,1.5,4,0", "4,0.5,?,1", "?,2,x,1"])
+        expected = pd.read_csv(file_name, na_values=["?"])
+
+        reader = CSVReader(file_name)
+        reader.read(auto_convert=False, chunk_size=2)
+        self.assertEqual(reader.X.dtype, object)
+        self.assertEqual((reader.num_entries, reader.num_features), (5, 3))
+        assert_array_equal(pd.isnull(reader.X), pd.isnull(expected.iloc[:, :3].to_numpy(dtype=object)))
+        self.assertEqual(reader.X[4, 2], "x")
+        self.assertEqual(reader.X[1, 0], 2)
+        assert_array_equal(reader.Y, expected.iloc[:, -1].to_numpy())
+
+    def test_read_non_numeric_after_first_chunk(self):
+        # all values of a column are parsed the same way, as if the file is read at once
+        file_name = self.write_csv(["1,2,3,0", "2,3,3,1", "3,4,x,1", "4,5,3,no"])
+        expected = pd.read_csv(file_name, na_values=["?"], low_memory=False)
+
+        reader = CSVReader(file_name)
+        reader.read(auto_convert=False, chunk_size=2)
+        assert_array_equal(reader.X, expected.iloc[:, :3].to_numpy(dtype=object))
+        assert_array_equal(reader.Y, expected.iloc[:, -1].to_numpy())
+        self.assertEqual(reader.X[0, 2], "3")
+        self.assertEqual(list(reader.Y), ["0", "1", "1", "no"])
+        self.assertEqual(reader.num_classes, 3)
+
+    def test_read_numerical(self):
+        file_name = self.write_csv(["1,2.5,?,0", "2,?,3,1", "3,1.5,4,0"])
+        reader = CSVReader(file_name)
+        reader.read(auto_convert=False, chunk_size=2)
+        self.assertEqual(reader.X.dtype, np.float64)
+        assert_array_equal(reader.X, [[1, 2.5, np.nan], [2, np.nan, 3], [3, 1.5, 4]])
+        assert_array_equal(reader.Y, [0, 1, 0])
+
+    def test_cache_dir(self):
+        file_name = self.write_csv(["1,2.5,?,a", "2,?,3,b", "3,1.5,4,a", "4,0.5,?,b"])
+        cache_dir = os.path.join(self.directory, "cache")
+
+        reader = CSVReader(file_name, cache_dir=cache_dir)
+        reader.read(chunk_size=3)
+        self.assertEqual(os.listdir(cache_dir), [os.path.basename(reader.get_cache_file())])
+        self.assertFalse(os.path.exists(file_name + CSVReader.cache_suffix))
+
+        cached_reader = CSVReader(file_name, cache_dir=cache_dir)
+        with mock.patch.object(CSVReader, "read_chunks", side_effect=AssertionError("The csv file has been parsed")):
+            cached_reader.read(chunk_size=3)
+        assert_array_equal(cached_reader.X, reader.X)
+        assert_array_equal(cached_reader.Y, reader.Y)
+        self.assertEqual(cached_reader.categorical_features, reader.categorical_features)
+        self.assertEqual(cached_reader.is_classification, reader.is_classification)
+        self.assertEqual((cached_reader.num_entries, cached_reader.num_features), (4, 3))
+
+    def test_cache_not_writable(self):
+        file_name = self.write_csv(["1,2.5,?,0", "2,?,3,1", "3,1.5,4,0"])
+        # the cache directory can not be created below a file
+        reader = CSVReader(file_name, cache_dir=os.path.join(file_name, "cache"))
+        reader.read()
+        self.assertEqual(reader.X.shape, (3, 3))
+        self.assertFalse(reader.load_cache(reader.get_cache_key()))
+
@@ -0,0 +1,97 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import scipy.sparse
+from unittest import mock
+
+from autoPyTorch.data_management.data_reader import OpenMlReader
+from autoPyTorch.data_management.openml_cache import OpenMlCache
+from numpy.testing import assert_array_equal
+
+
+def create_openml(X, Y):
+    """A fake openml module, that serves a single dataset."""
+    dataset = mock.Mock()
+    dataset.name = "test"
+    dataset.default_target_attribute = "target"
+    dataset.get_data.return_value = (X, Y, [False, True, True])
+    dataset.retrieve_class_labels.return_value = ["a", "b"]
+    openml = mock.Mock()
+    openml.datasets.get_dataset.return_value = dataset
+    return openml
+
+
+class TestOpenMlCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        self.X = np.array([[1.5, "x", np.nan], [np.nan, "y", 3], [2.5, np.nan, 4], [0.5, "x", None]], dtype=object)
+        self.Y = np.array(["a", "b", "a", "b"], dtype=object)
+
+    def read(self, cache_dir=None, offline=False):
+        reader = OpenMlReader(1, cache_dir=cache_dir, offline=offline)
+        with mock.patch.object(OpenMlReader, "openml", create_openml(self.X, self.Y)):
+            reader.read()
+        return reader
+
+    def assert_same_objects(self, array, expected):
+        self.assertEqual(array.dtype, expected.dtype)
+        self.assertEqual(array.shape, expected.shape)
+        assert_array_equal(pd.isnull(array), pd.isnull(expected))
+        for value, expected_value in zip(array.flat, expected.flat):
+            if not pd.isnull(expected_value):
+                self.assertEqual(type(value), type(expected_value))
+                self.assertEqual(value, expected_value)
+
+    def test_round_trip(self):
+        uncached = self.read()
+        downloaded = self.read(cache_dir=self.cache_dir)
+        with mock.patch.object(OpenMlReader, "download", side_effect=AssertionError("The dataset has been downloaded")):
+            cached = OpenMlReader(1, cache_dir=self.cache_dir, offline=True)
+            cached.read()
+
+        for reader in [downloaded, cached]:
+            self.assert_same_objects(reader.X, uncached.X)
+            self.assert_same_objects(reader.Y, uncached.Y)
+            self.assertEqual(reader.categorical_features, [False, True, True])
+            self.assertEqual((reader.is_classification, reader.num_classes), (True, 2))
+            self.assertEqual((reader.num_entries, reader.num_features), (4, 3))
+
+    def test_sparse_and_numerical(self):
+        cache = OpenMlCache(self.cache_dir)
+        X = scipy.sparse.random(10, 5, density=0.3, format="csr", random_state=1)
+        Y = np.arange(10, dtype=np.float64)
+        content_hash = cache.put(2, X, Y, categorical_features=[False] * 5)
+        self.assertEqual(cache.put(3, X, Y), content_hash)
+
+        cached_X, cached_Y, metadata = cache.get(2)
+        self.assertTrue(scipy.sparse.issparse(cached_X))
+        assert_array_equal(cached_X.toarray(), X.toarray())
+        assert_array_equal(cached_Y, Y)
+        self.assertEqual(metadata["categorical_features"], [False] * 5)
+
+        cache.put(4, X.toarray(), Y)
+        assert_array_equal(cache.get(4)[0], X.toarray())
+
+    def test_offline(self):
+        with self.assertRaises(ValueError):
+            OpenMlReader(1, offline=True)
+        reader = OpenMlReader(1, cache_dir=self.cache_dir, offline=True)
+        openml = create_openml(self.X, self.Y)
+        with mock.patch.object(OpenMlReader, "openml", openml):
+            with self.assertRaises(RuntimeError):
+                reader.read()
+        openml.datasets.get_dataset.assert_not_called()
+
+        self.read(cache_dir=self.cache_dir)
+        with mock.patch.object(OpenMlReader, "openml", openml):
+            reader.read()
+        openml.datasets.get_dataset.assert_not_called()
+        self.assert_same_objects(reader.X, self.X)
@@ -0,0 +1,106 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import unittest.mock
+import logging
+import time
+import numpy as np
+
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader, TensorDataset
+
+from autoPyTorch.pipeline.nodes.optimization_algorithm import OptimizationAlgorithm
+from autoPyTorch.pipeline.nodes.create_dataset_info import DataSetInfo
+from autoPyTorch.components.training.trainer import Trainer
+from autoPyTorch.components.training.base_training import BaseBatchLossComputationTechnique
+from autoPyTorch.components.training.budget_types import BudgetTypeSteps
+from autoPyTorch.components.training.lr_scheduling import LrScheduling
+
+
+class LinearNet(nn.Linear):
+    def __init__(self):
+        super(LinearNet, self).__init__(3, 1)
+        self.final_activation = None
+        self.budget_trained = 0
+
+
+class TestBudgetTypeSteps(unittest.TestCase):
+
+    def get_trainer(self, budget, model):
+        optimizer = torch.optim.SGD(model.parameters(), lr=0.01)
+        optimizer.step = unittest.mock.Mock(wraps=optimizer.step)
+        trainer = Trainer(metrics=[lambda outputs, targets: 0], log_functions=[], loss_computation=BaseBatchLossComputationTechnique(),
+            model=model, criterion=nn.MSELoss(), budget=budget, optimizer=optimizer, training_techniques=[BudgetTypeSteps()],
+            logger=logging.getLogger('autonet'), device=torch.device('cpu'), full_eval_each_epoch=False, swa=False, lookahead=False,
+            lookahead_config=None, se=False, se_lastk=0, use_adversarial_training=False)
+        trainer.prepare(pipeline_config={"budget_type": "steps"}, hyperparameter_config={"batch_loss_computation_technique": "standard"},
+            fit_start_time=time.time())
+        return trainer, optimizer
+
+    def test_stops_at_step(self):
+        loader = DataLoader(TensorDataset(torch.rand(40, 3), torch.rand(40, 1)), batch_size=4)  # 10 steps per epoch
+        model = LinearNet()
+        trainer, optimizer = self.get_trainer(13, model)
+
+        _, _, stop_training = trainer.train(1, loader)
+        self.assertFalse(stop_training)
+        self.assertFalse(trainer.on_epoch_end(log=dict(), epoch=1))
+        _, _, stop_training = trainer.train(2, loader)
+        self.assertTrue(stop_training)
+        self.assertTrue(trainer.on_epoch_end(log=dict(), epoch=2))
+        self.assertEqual(optimizer.step.call_count, 13)
+        self.assertEqual(model.budget_trained, 13)
+
+        # a model trained before continues counting
+        trainer, optimizer = self.get_trainer(15, model)
+        _, _, stop_training = trainer.train(1, loader)
+        self.assertTrue(stop_training)
+        self.assertEqual(optimizer.step.call_count, 2)
+        self.assertEqual(model.budget_trained, 15)
+
+    def test_default_budgets(self):
+        pipeline_config = {"min_budget": 0, "max_budget": 0, "validation_split": 0.2, "eta": 3,
+            "num_iterations": float("inf"), "max_runtime": float("inf"),
+            "steps_min_budget_epochs": 0.1, "steps_max_budget_epochs": 5, "steps_reference_batch_size": 128}
+        dataset_info = DataSetInfo()
+        dataset_info.x_shape = (12800, 10)
+
+        # 10240 training samples, 80 steps per epoch
+        OptimizationAlgorithm([]).set_default_step_budgets(pipeline_config, dataset_info, logging.getLogger('autonet'))
+        self.assertEqual(pipeline_config["min_budget"], 8)
+        self.assertEqual(pipeline_config["max_budget"], 400)
+        self.assertEqual(pipeline_config["num_iterations"], -int(np.log(8 / 400) / np.log(3)) + 1)
+
+        # given budgets are kept
+        pipeline_config.update({"min_budget": 20, "max_budget": 0, "num_iterations": 3})
+        OptimizationAlgorithm([]).set_default_step_budgets(pipeline_config, dataset_info, logging.getLogger('autonet'))
+        self.assertEqual((pipeline_config["min_budget"], pipeline_config["max_budget"], pipeline_config["num_iterations"]), (20, 400, 3))
+
+        self.assertEqual(BudgetTypeSteps.get_default_budgets(pipeline_config, 10), (1, 5))
+
+    def test_fractional_epoch_scheduling(self):
+        lr_scheduler = unittest.mock.Mock(snapshot_before_restart=False, get_lr=lambda: [0.1])
+        trainer = unittest.mock.Mock(lr_scheduler=lr_scheduler)
+
+        for budget_type, expected_epoch in [("steps", 1.4), ("epochs", 2)]:
+            lr_scheduler.reset_mock()
+            technique = LrScheduling(training_components={"lr_scheduler": lr_scheduler},
+                lr_step_after_batch=False, lr_step_with_time=False, allow_snapshot=False)
+            technique.set_up(trainer, {"budget_type": budget_type})
+
+            # the budget is exhausted after 4 of 10 steps of the second epoch
+            for step in range(4):
+                technique.on_batch_end(batch_loss=1, trainer=trainer, epoch=2, step=step, num_steps=10)
+            technique.on_epoch_end(trainer=trainer, epoch=2, log={"loss": 1})
+            self.assertAlmostEqual(lr_scheduler.step.call_args[1]["epoch"], expected_epoch)
+
+        # stepping after each batch uses the fraction of the epoch
+        lr_scheduler.reset_mock()
+        technique = LrScheduling(training_components={"lr_scheduler": lr_scheduler},
+            lr_step_after_batch=True, lr_step_with_time=False, allow_snapshot=False)
+        technique.set_up(trainer, {"budget_type": "steps"})
+        technique.on_batch_end(batch_loss=1, trainer=trainer, epoch=2, step=3, num_steps=10)
+        self.assertAlmostEqual(lr_scheduler.step.call_args[1]["epoch"], 1.4)
@@ -0,0 +1,69 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import numpy as np
+import torch
+
+from autoPyTorch.pipeline.base.pipeline import Pipeline
+from autoPyTorch.pipeline.nodes.one_hot_encoding import OneHotEncoding
+from autoPyTorch.pipeline.nodes.embedding_selector import EmbeddingSelector
+from autoPyTorch.pipeline.nodes.create_dataloader import CreateDataLoader, HalfPrecisionDataset, get_num_category_codes
+from autoPyTorch.pipeline.nodes.create_dataset_info import DataSetInfo
+from autoPyTorch.components.networks.feature.embedding import LearnedEntityEmbedding
+from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
+from numpy.testing import assert_array_equal
+
+
+class TestCreateDataLoader(unittest.TestCase):
+
+    def setUp(self):
+        random = np.random.RandomState(1)
+        # more categories than half precision can count
+        self.X = np.c_[np.arange(3000) % 2500, random.rand(3000), random.randint(0, 3, 3000)].astype(np.float32)
+        self.Y = np.zeros((3000, 1), dtype=np.float32)
+        self.hyperparameter_config = {CreateDataLoader.get_name() + ConfigWrapper.delimiter + "batch_size": 1000}
+
+    def encode(self, embedding):
+        pipeline = Pipeline([OneHotEncoding(), EmbeddingSelector()])
+        pipeline[EmbeddingSelector.get_name()].add_embedding_module('learned', LearnedEntityEmbedding)
+        dataset_info = DataSetInfo()
+        dataset_info.categorical_features = [True, False, True]
+        return pipeline[OneHotEncoding.get_name()].fit(pipeline_config=dict(), X=self.X, Y=self.Y, dataset_info=dataset_info,
+            hyperparameter_config={EmbeddingSelector.get_name() + ConfigWrapper.delimiter + "embedding": embedding})
+
+    def load(self, X, feature_dtype, one_hot_encoder=None):
+        result = CreateDataLoader().fit(pipeline_config={"random_seed": 1, "feature_dtype": feature_dtype},
+            hyperparameter_config=self.hyperparameter_config, X=X, Y=self.Y, train_indices=np.arange(3000), valid_indices=np.arange(3000),
+            one_hot_encoder=one_hot_encoder)
+        # the validation loader keeps the order of the rows
+        X_batches = [X_batch for X_batch, _ in result['valid_loader']]
+        self.assertTrue(all(X_batch.dtype == torch.float32 for X_batch in X_batches))
+        return result['train_loader'].dataset, torch.cat(X_batches).numpy()
+
+    def test_category_codes_in_half_precision(self):
+        encoded = self.encode("learned")
+        self.assertEqual(get_num_category_codes(encoded['one_hot_encoder']), 2)
+        dataset, X_batch = self.load(encoded['X'], "float16", encoded['one_hot_encoder'])
+        self.assertIsInstance(dataset, HalfPrecisionDataset)
+        self.assertEqual((dataset.X_exact.dtype, dataset.X.dtype), (np.float32, np.float16))
+
+        # the codes are exact, the numerical column is rounded
+        assert_array_equal(X_batch[:, :2], encoded['X'][:, :2])
+        self.assertEqual(np.max(X_batch[:, 0]), 2499)
+        assert_array_equal(X_batch[:, 2], encoded['X'][:, 2].astype(np.float16))
+
+    def test_one_hot_encoding_in_half_precision(self):
+        encoded = self.encode("none")
+        self.assertEqual(get_num_category_codes(encoded['one_hot_encoder']), 0)
+        self.assertEqual(get_num_category_codes(None), 0)
+        dataset, X_batch = self.load(encoded['X'], "float16", encoded['one_hot_encoder'])
+        self.assertEqual((dataset.X_exact.shape[1], dataset.X.dtype), (0, np.float16))
+        assert_array_equal(X_batch, encoded['X'].astype(np.float16))
+
+    def test_single_precision(self):
+        encoded = self.encode("learned")
+        dataset, X_batch = self.load(encoded['X'], "float32", encoded['one_hot_encoder'])
+        self.assertNotIsInstance(dataset, HalfPrecisionDataset)
+        assert_array_equal(X_batch, encoded['X'])
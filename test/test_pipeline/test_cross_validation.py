@@ -15,7 +15,7 @@ from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
 from autoPyTorch.pipeline.base.pipeline import Pipeline
 from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
 from autoPyTorch.pipeline.nodes.cross_validation import CrossValidation
-from autoPyTorch.components.training.budget_types import BudgetTypeEpochs
+from autoPyTorch.components.training.budget_types import BudgetTypeEpochs, BudgetTypeDataFraction
 from autoPyTorch.pipeline.nodes.create_dataset_info import DataSetInfo
 
 class TestCrossValidationMethods(unittest.TestCase):
@@ -111,4 +111,75 @@ class TestCrossValidationMethods(unittest.TestCase):
                                           optimize_start_time=time.time(), refit=False, dataset_info=dataset_info, rescore=False)
 
         self.assertEqual(cv_result['loss'], 45)
-        self.assertDictEqual(cv_result['info'], {'a': 171, 'b': 45})
\ No newline at end of file
+        self.assertDictEqual(cv_result['info'], {'a': 171, 'b': 45})
+
+
+    def test_cross_validation_data_fraction(self):
+
+        class ResultNode(PipelineNode):
+            def fit(self, X, Y, train_indices, valid_indices):
+                return { 'loss': float(len(valid_indices)), 'info': {'train': sorted(X[train_indices, 0].tolist()), 'num_rows': X.shape[0]} }
+
+        pipeline = Pipeline([
+            CrossValidation([
+                ResultNode()
+            ])
+        ])
+
+        x_train = np.arange(200).reshape((-1, 1))
+        y_train = np.array([[0]] * 150 + [[1]] * 50)
+
+        pipeline_config = pipeline.get_pipeline_config(validation_split=0.5)
+        pipeline_config_space = pipeline.get_hyperparameter_search_space(**pipeline_config)
+        pipeline_config['random_seed'] = 42
+
+        results = dict()
+        for budget in [0.1, 0.5, 1]:
+            dataset_info = DataSetInfo()
+            dataset_info.categorical_features = [None]
+            dataset_info.x_shape = x_train.shape
+            dataset_info.y_shape = y_train.shape
+            cv_result = pipeline.fit_pipeline(hyperparameter_config=pipeline_config_space, pipeline_config=pipeline_config, 
+                                              X_train=x_train, Y_train=y_train, X_valid=None, Y_valid=None, 
+                                              budget=budget, budget_type=BudgetTypeDataFraction, one_hot_encoder=None,
+                                              optimize_start_time=time.time(), refit=False, dataset_info=dataset_info, rescore=False)
+            self.assertEqual(cv_result['loss'], 100)
+            results[budget] = cv_result['info'][0]
+
+        self.assertAlmostEqual(len(results[0.1]['train']), 10, delta=1)
+        self.assertEqual(results[0.1]['num_rows'], len(results[0.1]['train']) + 100)
+        self.assertAlmostEqual(len(results[0.5]['train']), 50, delta=1)
+        self.assertEqual(len(results[1]['train']), 100)
+        self.assertTrue(set(results[0.1]['train']) <= set(results[0.5]['train']) <= set(results[1]['train']))
+
+    def test_cancelled_split(self):
+
+        class ResultNode(PipelineNode):
+            def fit(self, X, Y, train_indices, valid_indices, cv_index):
+                return {'loss': float(cv_index + 1), 'info': {'partial': cv_index == 1}}
+
+        pipeline = Pipeline([
+            CrossValidation([
+                ResultNode()
+            ])
+        ])
+        pipeline["CrossValidation"].add_cross_validator("k_fold", KFold, lambda x: x.reshape((-1 ,)))
+
+        x_train = np.arange(12).reshape((-1, 2))
+        y_train = np.arange(6).reshape((-1, 1))
+        dataset_info = DataSetInfo()
+        dataset_info.categorical_features = [None] * 2
+        dataset_info.x_shape = x_train.shape
+        dataset_info.y_shape = y_train.shape
+
+        pipeline_config = pipeline.get_pipeline_config(cross_validator="k_fold", cross_validator_args={"n_splits": 3})
+        pipeline_config_space = pipeline.get_hyperparameter_search_space(**pipeline_config)
+        pipeline_config["random_seed"] = 42
+
+        # the second split has been cancelled: the third split is skipped and the loss is averaged over the trained splits
+        cv_result = pipeline.fit_pipeline(hyperparameter_config=pipeline_config_space, pipeline_config=pipeline_config,
+                                          X_train=x_train, Y_train=y_train, X_valid=None, Y_valid=None,
+                                          budget=5, budget_type=BudgetTypeEpochs, one_hot_encoder=None,
+                                          optimize_start_time=time.time(), refit=False, dataset_info=dataset_info, rescore=False)
+        self.assertEqual(cv_result['loss'], 1.5)
+        self.assertEqual(cv_result['info'], [{'partial': False}, {'partial': True}])
@@ -0,0 +1,71 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import copy
+import multiprocessing
+import pickle
+import shutil
+import tempfile
+import numpy as np
+from unittest import mock
+
+import autoPyTorch.utils.out_of_core as out_of_core
+from autoPyTorch.utils.data_profile import DataProfile, DataProfileCache
+from autoPyTorch.pipeline.nodes.create_dataset_info import DataSetInfo
+from numpy.testing import assert_array_equal, assert_allclose
+
+
+class TestDataProfile(unittest.TestCase):
+
+    def test_data_profile(self):
+        X = np.random.rand(100, 4)
+        X[:, 1] = np.random.randint(0, 3, 100)
+        X[np.random.rand(100, 4) < 0.2] = np.nan
+        X[:50, 3] = np.nan
+        train_indices = np.arange(50)
+
+        # a few rows per chunk
+        with mock.patch.object(out_of_core, "CHUNK_BYTES", 100):
+            profile = DataProfile(X, train_indices, [False, True, False, False])
+
+        train = X[train_indices]
+        assert_array_equal(profile.nan_count, np.sum(np.isnan(train), axis=0))
+        assert_array_equal(profile.all_nan, [False, False, False, True])
+        assert_array_equal(profile.min[:3], np.nanmin(train[:, :3], axis=0))
+        assert_array_equal(profile.max[:3], np.nanmax(train[:, :3], axis=0))
+        assert_allclose(profile.mean[:3], np.nanmean(train[:, :3], axis=0))
+        assert_allclose(profile.var[:3], np.nanvar(train[:, :3], axis=0))
+        self.assertTrue(np.isnan(profile.mean[3]))
+        assert_array_equal(profile.has_nan, np.any(np.isnan(X), axis=0))
+        assert_array_equal(profile.categories[1], np.unique(X[~np.isnan(X[:, 1]), 1]))
+        self.assertIsNone(profile.categories[0])
+
+    def test_data_profile_cache(self):
+        X = np.random.rand(20, 2)
+        info = DataSetInfo()
+        profile = info.profiles.get(X, np.arange(10), [False, False])
+
+        # shared by copies of the dataset info, computed once per split
+        self.assertIs(copy.deepcopy(info).profiles.get(X, np.arange(10), [False, False]), profile)
+        self.assertIsNot(info.profiles.get(X, np.arange(5), [False, False]), profile)
+        self.assertIsNot(info.profiles.get(X.copy(), np.arange(10), [False, False]), profile)
+        self.assertEqual(len(pickle.loads(pickle.dumps(info)).profiles.profiles), 0)
+
+    def test_data_profile_cache_across_processes(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        X = np.random.rand(20, 2)
+
+        # the profile computed in a forked process, like an evaluation with pynisher, is reused by the parent
+        process = multiprocessing.get_context("fork").Process(target=DataSetInfo().profiles.get,
+            args=(X, np.arange(10), [False, False]), kwargs={"directory": directory})
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+
+        with mock.patch.object(DataProfile, "__init__", side_effect=AssertionError("The data has been profiled again")):
+            profile = DataSetInfo().profiles.get(X.copy(), np.arange(10), [False, False], directory=directory)
+        assert_allclose(profile.mean, np.mean(X[:10], axis=0))
+        self.assertIsNot(DataSetInfo().profiles.get(X, np.arange(5), [False, False], directory=directory), profile)
@@ -0,0 +1,73 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import numpy as np
+import torch
+
+from autoPyTorch.pipeline.base.pipeline import Pipeline
+from autoPyTorch.pipeline.nodes.one_hot_encoding import OneHotEncoding
+from autoPyTorch.pipeline.nodes.embedding_selector import EmbeddingSelector
+from autoPyTorch.pipeline.nodes.preprocessor_selector import PreprocessorSelector
+from autoPyTorch.pipeline.nodes.create_dataset_info import DataSetInfo
+from autoPyTorch.components.networks.feature.embedding import LearnedEntityEmbedding
+from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
+from numpy.testing import assert_allclose
+
+
+class TestEmbeddingMethods(unittest.TestCase):
+
+    def test_category_codes(self):
+        pipeline = Pipeline([
+            OneHotEncoding(),
+            EmbeddingSelector()
+        ])
+        pipeline[EmbeddingSelector.get_name()].add_embedding_module('learned', LearnedEntityEmbedding)
+        encoding = pipeline[OneHotEncoding.get_name()]
+
+        X = np.c_[np.arange(100) % 50, np.random.rand(100), np.arange(100) % 3].astype(float)
+        X_test = np.r_[X[:5], [[99, 0.5, 7]]]  # unknown categories
+        embedding_config = {"min_unique_values_for_embedding": 5, "dimension_reduction_0": 0.3, "dimension_reduction_1": 0.5}
+
+        outputs = []
+        for embedding in ["none", "learned"]:
+            hyperparameter_config = {EmbeddingSelector.get_name() + ConfigWrapper.delimiter + "embedding": embedding}
+            self.assertEqual(encoding.use_category_codes(hyperparameter_config), embedding == "learned")
+
+            dataset_info = DataSetInfo()
+            dataset_info.categorical_features = [True, False, True]
+            result = encoding.fit(pipeline_config=dict(), X=X, Y=np.zeros(100), dataset_info=dataset_info,
+                hyperparameter_config=hyperparameter_config)
+            self.assertEqual(result['X'].shape[1], 3 if embedding == "learned" else 54)
+
+            torch.manual_seed(1)
+            module = LearnedEntityEmbedding(embedding_config, result['X'].shape[1], result['one_hot_encoder'])
+            X_encoded = encoding.predict(pipeline_config={"categorical_features": [True, False, True]}, X=X_test,
+                one_hot_encoder=result['one_hot_encoder'])['X']
+            outputs.append(module(torch.tensor(X_encoded, dtype=torch.float32)).detach().numpy())
+
+        self.assertEqual(outputs[0].shape, (6, 19))
+        assert_allclose(outputs[0], outputs[1], rtol=1e-6)
+
+    def test_category_codes_with_preprocessor(self):
+        pipeline = Pipeline([
+            OneHotEncoding(),
+            PreprocessorSelector(),
+            EmbeddingSelector()
+        ])
+        pipeline[EmbeddingSelector.get_name()].add_embedding_module('learned', LearnedEntityEmbedding)
+        encoding = pipeline[OneHotEncoding.get_name()]
+        X = np.c_[np.arange(100) % 50, np.random.rand(100)].astype(float)
+
+        for preprocessor in ["none", "truncated_svd"]:
+            hyperparameter_config = {EmbeddingSelector.get_name() + ConfigWrapper.delimiter + "embedding": "learned",
+                PreprocessorSelector.get_name() + ConfigWrapper.delimiter + "preprocessor": preprocessor}
+            # preprocessors consume the one-hot encoding, the embedding is skipped
+            self.assertEqual(encoding.use_category_codes(hyperparameter_config), preprocessor == "none")
+
+            dataset_info = DataSetInfo()
+            dataset_info.categorical_features = [True, False]
+            result = encoding.fit(pipeline_config=dict(), X=X, Y=np.zeros(100), dataset_info=dataset_info,
+                hyperparameter_config=hyperparameter_config)
+            self.assertEqual(result['X'].shape[1], 2 if preprocessor == "none" else 51)
@@ -0,0 +1,67 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import unittest.mock
+
+from autoPyTorch.pipeline.base.node import Node
+
+
+class AddNode(Node):
+    def fit(self, pipeline_config, X, offset=1):
+        return {'X': X + offset}
+
+    def predict(self, X):
+        return {'X': X}
+
+
+class MultiplyNode(Node):
+    def fit(self, X, factor=2):
+        return {'X': X * factor, 'factor': factor}
+
+    def predict(self, X, factor):
+        return {'X': X * factor}
+
+
+def chain(*nodes):
+    for parent, child in zip(nodes[:-1], nodes[1:]):
+        parent.child_node = child
+    return nodes[0]
+
+
+class TestNode(unittest.TestCase):
+
+    def test_fit_plan(self):
+        add, multiply = AddNode(), MultiplyNode()
+        root = chain(add, multiply)
+
+        plan = root.get_fit_plan()
+        self.assertEqual([(node, keywords, defaults) for node, keywords, defaults in plan],
+            [(add, ['pipeline_config', 'X', 'offset'], {'offset': 1}), (multiply, ['X', 'factor'], {'factor': 2})])
+        self.assertIs(root.get_fit_plan(), plan)
+        self.assertEqual(root.fit_traverse(pipeline_config=dict(), X=1), {'X': 4, 'factor': 2})
+        self.assertEqual(root.fit_traverse(pipeline_config=dict(), X=1, offset=3, factor=5), {'X': 20, 'factor': 5})
+
+        # the plan is recomputed when nodes are added or removed
+        last = AddNode()
+        multiply.child_node = last
+        self.assertEqual([step[0] for step in root.get_fit_plan()], [add, multiply, last])
+        self.assertEqual(root.fit_traverse(pipeline_config=dict(), X=1), {'X': 5})
+        multiply.child_node = None
+        self.assertEqual([step[0] for step in root.get_fit_plan()], [add, multiply])
+
+        with self.assertRaises(ValueError):
+            root.fit_traverse(X=1)
+
+    def test_force_garbage_collection(self):
+        root = chain(AddNode(), MultiplyNode())
+        with unittest.mock.patch("autoPyTorch.pipeline.base.node.gc.collect") as collect:
+            root.fit_traverse(pipeline_config={"force_garbage_collection": False}, X=1)
+            root.predict_traverse(pipeline_config={"force_garbage_collection": False}, X=1)
+            self.assertEqual(collect.call_count, 0)
+
+            root.fit_traverse(pipeline_config={"force_garbage_collection": True}, X=1)
+            self.assertEqual(collect.call_count, 2)
+            self.assertEqual(root.predict_traverse(pipeline_config=dict(), X=1), {'X': 2})
+            self.assertEqual(collect.call_count, 4)
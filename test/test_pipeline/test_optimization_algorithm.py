@@ -5,6 +5,9 @@ __license__ = "BSD"
 import unittest
 import netifaces
 import logging
+import shutil
+import tempfile
+import time
 import numpy as np
 
 import torch
@@ -49,11 +52,219 @@ class TestOptimizationAlgorithmMethods(unittest.TestCase):
             ])
         ])
 
-        pipeline_config = pipeline.get_pipeline_config(num_iterations=1, budget_type='epochs', result_logger_dir=".")
+        # do not leave the logged results in the working directory
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        pipeline_config = pipeline.get_pipeline_config(num_iterations=1, budget_type='epochs', result_logger_dir=directory, working_dir=directory)
         pipeline.fit_pipeline(pipeline_config=pipeline_config, X_train=np.random.rand(15,10), Y_train=np.random.rand(15, 5), X_valid=None, Y_valid=None,
-            result_loggers=[json_result_logger(directory=".", overwrite=True)], dataset_info=None, shutdownables=[])
+            result_loggers=[json_result_logger(directory=directory, overwrite=True)], dataset_info=None, shutdownables=[])
 
         result_of_opt_pipeline = pipeline[OptimizationAlgorithm.get_name()].fit_output['optimized_hyperparameter_config']
         print(pipeline[OptimizationAlgorithm.get_name()].fit_output)
 
         self.assertIn(result_of_opt_pipeline[ResultNode.get_name() + ConfigWrapper.delimiter + 'hyper'], list(range(0, 31)))
+
+    def test_restore_logged_results(self):
+        import json, os, tempfile
+        from autoPyTorch.utils.resume import restore_logged_results, resumable_json_result_logger, get_evaluation_key
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        configs = [[[0, 0, 0], {"hyper": 1}, {}], [[0, 0, 1], {"hyper": 2}, {}], [[1, 0, 0], {"hyper": 3}, {}]]
+        results = [[[0, 0, 0], 1.0, {"submitted": 10, "started": 11, "finished": 20}, {"loss": 0.5, "info": {}}, None],
+                   [[0, 0, 1], 1.0, {"submitted": 10, "started": 20, "finished": 30}, None, "error"],
+                   [[1, 0, 0], 3.0, {"submitted": 30, "started": 31, "finished": 50}, {"loss": 0.2, "info": {}}, None]]
+        with open(os.path.join(directory, "configs.json"), "w") as f:
+            f.write("\n".join(json.dumps(c) for c in configs) + "\n")
+        with open(os.path.join(directory, "results.json"), "w") as f:
+            f.write("\n".join(json.dumps(r) for r in results) + "\n" + '[[1, 0, 1], 3.0, {"subm')
+
+        resumable_json_result_logger(directory, resume=True)
+        result, elapsed_time, num_iterations, evaluated = restore_logged_results(directory)
+
+        self.assertEqual(elapsed_time, 40)
+        self.assertEqual(num_iterations, 2)
+        self.assertEqual(set(result.get_id2config_mapping().keys()), {(-1, 0, 0), (-1, 0, 1), (-1, 0, 2)})
+        self.assertEqual(result.get_id2config_mapping()[(-1, 0, 2)]["config"], {"hyper": 3})
+        self.assertEqual(len(evaluated), 2)
+        self.assertEqual(evaluated[get_evaluation_key({"hyper": 3}, 3)]["loss"], 0.2)
+
+        # resuming again must not count the restored progress twice
+        _, elapsed_time, num_iterations, _ = restore_logged_results(directory)
+        self.assertEqual(elapsed_time, 40)
+        self.assertEqual(num_iterations, 2)
+
+    def test_evaluation_cache(self):
+        import tempfile
+        from autoPyTorch.utils.evaluation_cache import EvaluationCache, get_cache_key, get_data_fingerprint
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        X = np.random.rand(15, 10)
+        fingerprint = get_data_fingerprint(X, None)
+        self.assertEqual(fingerprint, get_data_fingerprint(X.copy(), None))
+        self.assertNotEqual(fingerprint, get_data_fingerprint(X + 1, None))
+
+        key = get_cache_key({"hyper": 1}, 3, "BudgetTypeEpochs", {"run_id": "0", "cv_splits": 1}, fingerprint)
+        self.assertEqual(key, get_cache_key({"hyper": 1}, 3.0, "BudgetTypeEpochs", {"run_id": "1", "cv_splits": 1}, fingerprint))
+        self.assertNotEqual(key, get_cache_key({"hyper": 1}, 3, "BudgetTypeEpochs", {"run_id": "0", "cv_splits": 3}, fingerprint))
+
+        cache = EvaluationCache(directory, max_entries=2, version="a")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {"loss": np.float32(0.5), "info": {}})
+        self.assertEqual(cache.get(key), {"loss": 0.5, "info": {}})
+        cache.put("b", {"loss": 1, "info": {}})
+        cache.put("c", {"loss": 1, "info": {}})
+        self.assertEqual(len(cache), 2)
+
+        self.assertEqual(len(EvaluationCache(directory, version="b")), 0)
+
+    def test_evaluation_cache_key_across_processes(self):
+        import os, subprocess, sys
+        import autoPyTorch
+
+        # the default random seed is part of the key and must not depend on the hash randomization of the process
+        script = "\n".join([
+            "from autoPyTorch.pipeline.base.pipeline import Pipeline",
+            "from autoPyTorch.pipeline.nodes.autonet_settings import AutoNetSettings",
+            "from autoPyTorch.pipeline.nodes.optimization_algorithm import OptimizationAlgorithm",
+            "from autoPyTorch.utils.evaluation_cache import get_cache_key",
+            "pipeline_config = Pipeline([AutoNetSettings(), OptimizationAlgorithm([])]).get_pipeline_config(run_id='1')",
+            "print(get_cache_key({'hyper': 1}, 3, 'BudgetTypeEpochs', pipeline_config, 'fingerprint'))"])
+        keys = list()
+        for hash_seed in ["1", "2"]:
+            env = dict(os.environ, PYTHONHASHSEED=hash_seed,
+                PYTHONPATH=os.pathsep.join([os.path.dirname(os.path.dirname(autoPyTorch.__file__)), os.environ.get("PYTHONPATH", "")]))
+            output = subprocess.check_output([sys.executable, "-W", "ignore", "-c", script], env=env)
+            keys.append(output.decode().strip().splitlines()[-1])
+        self.assertEqual(keys[0], keys[1])
+
+    def test_run_with_time_deadline(self):
+        import threading
+        from autoPyTorch.core.hpbandster_extensions.run_with_time import run_with_time
+
+        class Master():
+            """Master whose only job never finishes by itself."""
+            def __init__(self, shutdown_grace_period):
+                self.thread_cond = threading.Condition()
+                self.num_running_jobs = 1
+                self.job_queue_sizes = (0, 1)
+                self.logger = logging.getLogger('hpbandster')
+                self.time_ref = None
+                self.config = dict()
+                self.result_logger = None
+                self.iterations = []
+                self.warmstart_iteration = []
+                self.shutdown_grace_period = shutdown_grace_period
+                self.num_cancellations = 0
+
+            def wait_for_workers(self, min_n_workers):
+                pass
+
+            def active_iterations(self):
+                return []
+
+            def on_timelimit(self):
+                self.num_cancellations += 1
+
+        # waiting for the running job stops at the deadline and after the grace period
+        master = Master(shutdown_grace_period=0.5)
+        start_time = time.time()
+        run_with_time(master, runtime=0.5, n_iterations=1)
+        self.assertLess(time.time() - start_time, 5)
+        self.assertEqual(master.num_cancellations, 1)
+
+        # the master stops waiting as soon as the cancelled job reports its partial result
+        master = Master(shutdown_grace_period=60)
+        def finish_job():
+            time.sleep(1)
+            with master.thread_cond:
+                master.num_running_jobs = 0
+                master.thread_cond.notify_all()
+        threading.Thread(target=finish_job).start()
+        start_time = time.time()
+        run_with_time(master, runtime=0.5, n_iterations=1)
+        self.assertLess(time.time() - start_time, 10)
+        self.assertEqual(master.num_cancellations, 1)
+
+    def test_job_cancellation(self):
+        import os, tempfile
+        from unittest.mock import Mock
+        from autoPyTorch.components.training.job_cancellation import JobCancellation, get_job_cancel_file, is_partial_result
+
+        pipeline_config = {"working_dir": tempfile.mkdtemp(), "run_id": "0"}
+        self.addCleanup(shutil.rmtree, pipeline_config["working_dir"])
+        trainer = Mock()
+        technique = JobCancellation(hyperparameter_config_id=(0, 0, 1))
+        technique.check_interval = 0
+        technique.set_up(trainer, pipeline_config)
+        self.assertFalse(technique.on_batch_end(trainer=trainer))
+
+        # cancelling another configuration does not stop this job
+        open(get_job_cancel_file(pipeline_config, (0, 0, 2)), "w").close()
+        self.assertFalse(technique.on_batch_end(trainer=trainer))
+        open(get_job_cancel_file(pipeline_config, (0, 0, 1)), "w").close()
+        self.assertTrue(technique.on_batch_end(trainer=trainer))
+        self.assertTrue(technique.on_epoch_end(trainer=trainer))
+
+        self.assertTrue(is_partial_result({"loss": 1, "info": [{}, {"partial": True}]}))
+        self.assertFalse(is_partial_result({"loss": 1, "info": {"partial": False}}))
+
+    def test_cancel_diverged_jobs(self):
+        import os, tempfile, threading
+        from autoPyTorch.core.hpbandster_extensions.run_with_time import run_with_time
+        from autoPyTorch.components.training.job_cancellation import get_job_cancel_file
+        from autoPyTorch.utils.learning_curves import report_epoch, LearningCurveReader
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        pipeline_config = {"working_dir": directory, "result_logger_dir": directory, "run_id": "0"}
+        optimization_algorithm = OptimizationAlgorithm([])
+        reader = LearningCurveReader(directory)
+        logger = logging.getLogger('autonet')
+
+        report_epoch(directory, (0, 0, 1), 3, 0, 1, {"loss": [0.5]})
+        report_epoch(directory, (0, 0, 2), 3, 0, 1, {"loss": [float("inf")]})
+        optimization_algorithm.cancel_diverged_jobs(pipeline_config, reader, logger)
+        self.assertFalse(os.path.exists(get_job_cancel_file(pipeline_config, (0, 0, 1))))
+        self.assertTrue(os.path.exists(get_job_cancel_file(pipeline_config, (0, 0, 2))))
+
+        # the master monitors the learning curves while waiting for running jobs
+        class Iteration():
+            data = dict()
+
+            def get_next_run(self):
+                return None
+
+        class Master():
+            def __init__(self):
+                self.thread_cond = threading.Condition()
+                self.num_running_jobs = 1
+                self.job_queue_sizes = (0, 2)
+                self.logger = logging.getLogger('hpbandster')
+                self.time_ref = None
+                self.config = dict()
+                self.result_logger = None
+                self.iterations = [Iteration()]
+                self.warmstart_iteration = []
+                self.wait_interval = 0.1
+                self.on_wait = lambda: optimization_algorithm.cancel_diverged_jobs(pipeline_config, reader, logger)
+
+            def wait_for_workers(self, min_n_workers):
+                pass
+
+            def active_iterations(self):
+                return [0] if self.num_running_jobs > 0 else []
+
+        master = Master()
+        def train():
+            time.sleep(0.5)
+            report_epoch(directory, (0, 0, 1), 3, 0, 2, {"loss": [0.5, float("nan")]})
+            time.sleep(0.5)
+            with master.thread_cond:
+                master.num_running_jobs = 0
+                master.thread_cond.notify_all()
+        threading.Thread(target=train).start()
+        run_with_time(master, runtime=float("inf"), n_iterations=0)
+        self.assertTrue(os.path.exists(get_job_cancel_file(pipeline_config, (0, 0, 1))))
@@ -0,0 +1,160 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import os
+import tempfile
+import numpy as np
+import torch
+from unittest import mock
+from sklearn.preprocessing import MinMaxScaler, StandardScaler, MaxAbsScaler
+
+import autoPyTorch.utils.out_of_core as out_of_core
+from autoPyTorch.utils.out_of_core import is_memmap, load_array, create_memmap
+from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
+from autoPyTorch.pipeline.nodes.imputation import Imputation
+from autoPyTorch.pipeline.nodes.normalization_strategy_selector import NormalizationStrategySelector
+from autoPyTorch.pipeline.nodes.one_hot_encoding import OneHotEncoding
+from autoPyTorch.pipeline.nodes.create_dataloader import CreateDataLoader
+from autoPyTorch.pipeline.nodes.cross_validation import CrossValidation
+from autoPyTorch.pipeline.nodes.create_dataset_info import DataSetInfo
+from numpy.testing import assert_array_equal, assert_allclose
+
+
+def to_memmap(array):
+    result = create_memmap(array.shape, array.dtype)
+    result[:] = array
+    return result
+
+
+class TestOutOfCore(unittest.TestCase):
+
+    def setUp(self):
+        # a few rows per chunk
+        self.chunk_patch = mock.patch.object(out_of_core, "CHUNK_BYTES", 64)
+        self.chunk_patch.start()
+
+    def tearDown(self):
+        self.chunk_patch.stop()
+
+    def test_load_array(self):
+        X = np.random.rand(20, 3)
+        path = os.path.join(tempfile.mkdtemp(), "X.npy")
+        np.save(path, X)
+        loaded = load_array(path)
+        self.assertTrue(is_memmap(loaded))
+        assert_array_equal(loaded, X)
+        self.assertTrue(is_memmap(CrossValidation.concat(loaded, X)))
+        assert_array_equal(CrossValidation.concat(loaded, X), np.concatenate([X, X]))
+        self.assertFalse(is_memmap(loaded[[0, 1]]))
+
+    def test_imputation_and_one_hot_encoding(self):
+        X = np.array([[1, np.nan, 3, np.nan], [4, 5, 6, np.nan], [7, 8, np.nan, np.nan],
+            [np.nan, 2, 3, 1], [4, 5, np.nan, 1], [7, np.nan, 9, 1]] * 5)
+        train_indices = np.arange(0, 30, 2)
+        hyperparameter_config = {Imputation.get_name() +  ConfigWrapper.delimiter + "strategy": "median"}
+
+        results = []
+        for data in [X, to_memmap(X)]:
+            dataset_info = DataSetInfo()
+            dataset_info.categorical_features = [False, True, False, False]
+            imputation_result = Imputation().fit(hyperparameter_config=hyperparameter_config, X=data, train_indices=train_indices,
+                dataset_info=dataset_info)
+            encoding_result = OneHotEncoding().fit(pipeline_config=dict(), X=imputation_result['X'], Y=np.zeros(30),
+                dataset_info=imputation_result['dataset_info'])
+            results.append((imputation_result, encoding_result))
+
+        (in_memory_imputation, in_memory_encoding), (memmap_imputation, memmap_encoding) = results
+        self.assertTrue(is_memmap(memmap_imputation['X']))
+        self.assertTrue(is_memmap(memmap_encoding['X']))
+        assert_array_equal(memmap_imputation['X'], in_memory_imputation['X'])
+        assert_array_equal(memmap_imputation['all_nan_columns'], in_memory_imputation['all_nan_columns'])
+        assert_array_equal(memmap_encoding['X'], in_memory_encoding['X'])
+
+        X_test = to_memmap(X[:7])
+        X_test = Imputation().predict(X=X_test, imputation_preprocessor=memmap_imputation['imputation_preprocessor'],
+            all_nan_columns=memmap_imputation['all_nan_columns'])['X']
+        X_test = OneHotEncoding().predict(pipeline_config={"categorical_features": [False, True, False, False]}, X=X_test,
+            one_hot_encoder=memmap_encoding['one_hot_encoder'])['X']
+        self.assertTrue(is_memmap(X_test))
+        assert_array_equal(X_test, in_memory_encoding['X'][:7])
+
+    def test_imputation_strategies(self):
+        random = np.random.RandomState(1)
+        X = random.randint(0, 5, size=(200, 4)).astype(float)
+        X[random.rand(200, 4) < 0.2] = np.nan
+        X[:, 3] = np.nan
+        train_indices = np.arange(0, 200, 3)
+
+        for strategy in Imputation.strategies:
+            hyperparameter_config = {Imputation.get_name() +  ConfigWrapper.delimiter + "strategy": strategy}
+            results = []
+            for data in [X, to_memmap(X)]:
+                dataset_info = DataSetInfo()
+                dataset_info.categorical_features = [False, True, False, False]
+                results.append(Imputation().fit(hyperparameter_config=hyperparameter_config, X=data, train_indices=train_indices,
+                    dataset_info=dataset_info))
+            self.assertTrue(is_memmap(results[1]['X']))
+            assert_allclose(results[1]['X'], results[0]['X'])
+            assert_allclose(Imputation().predict(X=X[:10], imputation_preprocessor=results[1]['imputation_preprocessor'],
+                all_nan_columns=results[1]['all_nan_columns'])['X'], results[0]['X'][:10])
+
+    def test_imputation_does_not_read_training_rows(self):
+        X = np.random.RandomState(1).rand(100, 2)
+        X[::7, 0] = np.nan
+        train_indices = np.arange(80)
+        expected = np.nanmean(X[train_indices, 0])
+
+        with mock.patch.object(out_of_core, "FIT_SUBSAMPLE_ROWS", 5):
+            for strategy in ["mean", "median"]:
+                hyperparameter_config = {Imputation.get_name() +  ConfigWrapper.delimiter + "strategy": strategy}
+                dataset_info = DataSetInfo()
+                dataset_info.categorical_features = [False, False]
+                result = Imputation().fit(hyperparameter_config=hyperparameter_config, X=to_memmap(X), train_indices=train_indices,
+                    dataset_info=dataset_info)
+                self.assertFalse(np.any(np.isnan(result['X'])))
+                if strategy == "mean":
+                    # the mean is exact, it is computed chunk by chunk
+                    assert_allclose(result['X'][::7, 0], expected)
+
+    def test_normalization(self):
+        X = np.random.RandomState(1).rand(50, 3) * 10 - 3
+        train_indices = np.arange(0, 50, 2)
+        selector = NormalizationStrategySelector()
+        for name, normalizer in [("standardize", StandardScaler), ("minmax", MinMaxScaler), ("maxabs", MaxAbsScaler)]:
+            selector.add_normalization_strategy(name, normalizer)
+
+        for name in ["standardize", "minmax", "maxabs"]:
+            hyperparameter_config = {NormalizationStrategySelector.get_name() + ConfigWrapper.delimiter + "normalization_strategy": name}
+            results = []
+            for data in [X, to_memmap(X)]:
+                dataset_info = DataSetInfo()
+                dataset_info.categorical_features = [False, True, False]
+                results.append(selector.fit(hyperparameter_config=hyperparameter_config, X=data, train_indices=train_indices,
+                    dataset_info=dataset_info))
+            self.assertTrue(is_memmap(results[1]['X']))
+            assert_allclose(results[1]['X'], results[0]['X'])
+
+    def test_data_loader(self):
+        X = np.random.rand(30, 4)
+        Y = np.random.rand(30, 2).astype(np.float32)
+        hyperparameter_config = {CreateDataLoader.get_name() + ConfigWrapper.delimiter + "batch_size": 8}
+        train_indices, valid_indices = np.arange(20), np.arange(20, 30)
+
+        loaders = [CreateDataLoader().fit(pipeline_config={"random_seed": 1}, hyperparameter_config=hyperparameter_config,
+            X=data, Y=Y, train_indices=train_indices, valid_indices=valid_indices) for data in [X, to_memmap(X)]]
+
+        for loader in ["train_loader", "valid_loader"]:
+            batches = []
+            for result in loaders:
+                torch.manual_seed(1)
+                batches.append(list(result[loader]))
+            self.assertEqual(len(batches[0]), len(batches[1]))
+            for (X_batch, Y_batch), (X_memmap_batch, Y_memmap_batch) in zip(*batches):
+                assert_array_equal(X_batch.numpy(), X_memmap_batch.numpy())
+                assert_array_equal(Y_batch.numpy(), Y_memmap_batch.numpy())
+                self.assertEqual(X_memmap_batch.dtype, X_batch.dtype)
+
+        predict_loader = CreateDataLoader().predict(pipeline_config=dict(), X=to_memmap(X), batch_size=8)['predict_loader']
+        assert_array_equal(np.concatenate([X_batch.numpy() for X_batch, _ in predict_loader]), X.astype(np.float32))
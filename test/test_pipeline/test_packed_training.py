@@ -0,0 +1,218 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import logging
+import shutil
+import tempfile
+import threading
+import time
+import numpy as np
+
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader, TensorDataset
+from torch.utils.data.dataset import Subset
+
+import ConfigSpace as CS
+import ConfigSpace.hyperparameters as CSH
+
+from autoPyTorch.pipeline.base.pipeline import Pipeline
+from autoPyTorch.pipeline.base.pipeline_node import PipelineNode
+from autoPyTorch.pipeline.nodes.train_node import TrainNode
+from autoPyTorch.pipeline.nodes.metric_selector import AutoNetMetric
+from autoPyTorch.pipeline.nodes.optimization_algorithm import OptimizationAlgorithm
+from autoPyTorch.components.networks.feature.embedding import NoEmbedding
+from autoPyTorch.components.networks.feature.mlpnet import MlpNet
+from autoPyTorch.components.networks.feature.packed_mlpnet import PackedMlpNet, group_packable_networks
+from autoPyTorch.components.training.budget_types import BudgetTypeEpochs
+from autoPyTorch.components.training.packed_training import PackedEvaluation
+from autoPyTorch.core.hpbandster_extensions.local_dispatcher import LocalDispatcher
+from autoPyTorch.utils.config.config_option import ConfigOption
+from hpbandster.core.result import json_result_logger
+
+
+def create_network(num_units=8, num_layers=2, use_dropout=False, activation="relu"):
+    config = {"activation": activation, "num_layers": num_layers, "num_units_1": num_units, "num_units_2": 4, "num_units_3": 6,
+        "use_dropout": use_dropout, "dropout_1": 0.5, "dropout_2": 0.1, "dropout_3": 0.2}
+    return MlpNet(config=config, in_features=3, out_features=1, embedding=NoEmbedding(dict(), 3, None))
+
+
+class TestPackedTraining(unittest.TestCase):
+
+    def setUp(self):
+        self.X = torch.rand(64, 3)
+        self.Y = torch.rand(64, 1)
+
+    def fit(self, network, train_node, results, index, pipeline_config=None):
+        torch.manual_seed(0)
+        hyperparameter_config = {"NetworkSelector:use_swa": False, "NetworkSelector:use_lookahead": False, "NetworkSelector:use_se": False,
+            "TrainNode:batch_loss_computation_technique": "standard", "TrainNode:use_adversarial_training": False}
+        pipeline_config = dict({"thread_allocation": "fixed", "torch_num_threads": 0, "cuda": False, "full_eval_each_epoch": True,
+            "stream_learning_curves": False, "best_over_epochs": False, "oom_batch_size_backoffs": 0}, **(pipeline_config or dict()))
+        dataset = TensorDataset(self.X, self.Y)
+        train_loader = DataLoader(dataset, batch_size=16)
+        valid_loader = DataLoader(Subset(dataset, list(range(32))), batch_size=16)
+        metric = AutoNetMetric(name="mse", metric=lambda y_pred, y_true: float(np.mean((y_pred - y_true) ** 2)), loss_transform=lambda x: x,
+            ohe_transform=lambda x: x)
+        results[index] = train_node.fit(hyperparameter_config=hyperparameter_config, pipeline_config=pipeline_config,
+            train_loader=train_loader, valid_loader=valid_loader, network=network, optimizer=torch.optim.SGD(network.parameters(), lr=0.1),
+            optimize_metric=metric, additional_metrics=[], log_functions=[], budget=3, loss_function=nn.MSELoss(),
+            training_techniques=[BudgetTypeEpochs()], fit_start_time=time.time(), refit=False)
+
+    def test_packed_network(self):
+        networks = [create_network(activation="sigmoid"), create_network(num_units=5, activation="sigmoid", use_dropout=True),
+            create_network(num_layers=3, activation="sigmoid")]
+        self.assertEqual(group_packable_networks(networks), [[0, 1], [2]])
+        self.assertEqual(group_packable_networks(networks, batch_sizes=[16, 32, 16]), [[0], [1], [2]])
+        self.assertEqual(group_packable_networks(networks, keys=["a", None, "a"]), [[1], [0], [2]])
+        with self.assertRaises(ValueError):
+            PackedMlpNet(networks)
+
+        # the narrower network is padded, its padded units do not change the outputs
+        packed = PackedMlpNet(networks[:2])
+        packed.eval()
+        for network in networks[:2]:
+            network.eval()
+        outputs = packed(self.X)
+        self.assertEqual(tuple(outputs.shape), (2, 64, 1))
+        for network, output in zip(networks, outputs):
+            np.testing.assert_allclose(network(self.X).detach().numpy(), output.detach().numpy(), rtol=1e-5, atol=1e-6)
+
+    def test_packed_training(self):
+        torch.manual_seed(1)
+        networks = [create_network(), create_network(num_units=5), create_network(num_layers=3)]
+        initial_states = [{k: v.clone() for k, v in network.state_dict().items()} for network in networks]
+
+        # the third job cannot be packed and is trained separately. The fourth job fails before training.
+        packing = PackedEvaluation(4)
+        train_nodes = [TrainNode() for _ in range(3)]
+        results = [None] * 3
+        threads = list()
+        for i, (network, train_node) in enumerate(zip(networks, train_nodes)):
+            train_node.packing = packing
+            threads.append(threading.Thread(target=self.fit, args=(network, train_node, results, i)))
+        for thread in threads:
+            thread.start()
+        packing.leave()
+        for thread in threads:
+            thread.join(timeout=60)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertTrue(all(train_node.packing is None for train_node in train_nodes))
+        self.assertEqual([result["info"].get("pack_size") for result in results], [2, 2, None])
+
+        # each configuration gets its own result and learning curve, equal to training it separately
+        for network, initial_state, result in zip(networks, initial_states, results):
+            self.assertEqual(network.epochs_trained, 3)
+            self.assertEqual(len(network.logs), 4)
+            separate_network = create_network(num_units=network.config["num_units_1"], num_layers=network.config["num_layers"])
+            separate_network.load_state_dict(initial_state)
+            separate_results = [None]
+            self.fit(separate_network, TrainNode(), separate_results, 0)
+            np.testing.assert_allclose(result["loss"], separate_results[0]["loss"], rtol=1e-4)
+            np.testing.assert_allclose([log["loss"] for log in network.logs], [log["loss"] for log in separate_network.logs], rtol=1e-4)
+            for parameter, separate_parameter in zip(network.parameters(), separate_network.parameters()):
+                np.testing.assert_allclose(parameter.detach().numpy(), separate_parameter.detach().numpy(), rtol=1e-4, atol=1e-6)
+
+    def test_packed_training_with_dropout(self):
+        networks = [create_network(use_dropout=True), create_network(use_dropout=True)]
+        packing = PackedEvaluation(2)
+        results = [None] * 2
+        threads = list()
+        for i, network in enumerate(networks):
+            train_node = TrainNode()
+            train_node.packing = packing
+            threads.append(threading.Thread(target=self.fit, args=(network, train_node, results, i)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+        self.assertTrue(all(np.all(np.isfinite(result["loss"])) for result in results))
+        self.assertTrue(all(network.epochs_trained == 3 for network in networks))
+        self.assertTrue(all(result["info"]["pack_size"] == 2 for result in results))
+
+    def test_dispatch_packed_jobs(self):
+
+        class Worker():
+            worker_id = "worker"
+
+            def __init__(self):
+                self.packs = list()
+
+            def compute(self, config_id, config, budget, working_directory):
+                self.packs.append([config_id])
+                return {"loss": budget, "info": dict()}
+
+            def compute_packed(self, jobs):
+                self.packs.append([job["config_id"] for job in jobs])
+                return [({"loss": job["budget"], "info": dict()}, None) if job["config_id"] != (0, 0, 2) else (None, "error") for job in jobs]
+
+        finished = list()
+        queue_sizes = list()
+        dispatcher = LocalDispatcher(new_result_callback=finished.append, queue_callback=queue_sizes.append)
+        for i, budget in enumerate([1, 3, 1, 1, 1]):
+            dispatcher.submit_job((0, 0, i), config=dict(), budget=budget, working_directory=".")
+
+        worker = Worker()
+        dispatcher.add_worker(worker, pack_size=3, pack_timeout=0.1)
+        self.assertEqual(queue_sizes, [3])
+        thread = threading.Thread(target=dispatcher.run)
+        thread.start()
+        for _ in range(100):
+            if len(finished) == 5:
+                break
+            time.sleep(0.1)
+        dispatcher.shutdown()
+        thread.join()
+
+        # jobs with equal budget are packed, the order of the other jobs is kept
+        self.assertEqual(worker.packs, [[(0, 0, 0), (0, 0, 2), (0, 0, 3)], [(0, 0, 1)], [(0, 0, 4)]])
+        self.assertEqual([job.id for job in finished], [(0, 0, 0), (0, 0, 2), (0, 0, 3), (0, 0, 1), (0, 0, 4)])
+        self.assertEqual(finished[1].exception, "error")
+        self.assertEqual(finished[0].result["loss"], 1)
+
+    def test_packed_evaluation_in_optimization(self):
+
+        class ResultNode(PipelineNode):
+            pipelines = set()
+
+            def fit(self, X_train, hyperparameter_config):
+                ResultNode.pipelines.add(id(self.pipeline))
+                return {'loss': hyperparameter_config[ResultNode.get_name() + ":hyper"], 'info': dict()}
+
+            def get_hyperparameter_search_space(self, **pipeline_config):
+                cs = CS.ConfigurationSpace()
+                cs.add_hyperparameter(CSH.UniformIntegerHyperparameter('hyper', lower=0, upper=30))
+                return cs
+
+            def get_pipeline_config_options(self):
+                return [
+                    ConfigOption("result_logger_dir", default=".", type="directory"),
+                    ConfigOption("optimize_metric", default="a", type=str),
+                ]
+
+        logging.getLogger('hpbandster').setLevel(logging.ERROR)
+        logging.getLogger('autonet').setLevel(logging.ERROR)
+        pipeline = Pipeline([
+            OptimizationAlgorithm([
+                ResultNode()
+            ])
+        ])
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        with self.assertRaises(ValueError):
+            pipeline.get_pipeline_config(packed_evaluation_size=3)
+
+        pipeline_config = pipeline.get_pipeline_config(num_iterations=1, budget_type='epochs', min_budget=1, max_budget=9,
+            result_logger_dir=directory, working_dir=directory, use_pynisher=False, packed_evaluation_size=3)
+        pipeline.fit_pipeline(pipeline_config=pipeline_config, X_train=np.random.rand(15, 10), Y_train=np.random.rand(15, 5), X_valid=None, Y_valid=None,
+            result_loggers=[json_result_logger(directory=directory, overwrite=True)], dataset_info=None, shutdownables=[])
+
+        # the jobs are evaluated on copies of the pipeline and all of them report their result
+        fit_output = pipeline[OptimizationAlgorithm.get_name()].fit_output
+        self.assertEqual(fit_output['loss'], fit_output['optimized_hyperparameter_config'][ResultNode.get_name() + ":hyper"])
+        self.assertGreater(len(ResultNode.pipelines), 1)
+        with open(directory + "/results.json") as f:
+            self.assertEqual(len(f.readlines()), 13)
@@ -0,0 +1,77 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import numpy as np
+
+from autoPyTorch.pipeline.base.pipeline import Pipeline, get_fingerprint
+from autoPyTorch.pipeline.nodes.lr_scheduler_selector import LearningrateSchedulerSelector
+from autoPyTorch.pipeline.nodes.create_dataset_info import DataSetInfo
+from autoPyTorch.components.lr_scheduler.lr_schedulers import SchedulerStepLR, SchedulerExponentialLR
+from autoPyTorch.utils.hyperparameter_search_space_update import HyperparameterSearchSpaceUpdates
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_config_space_cache(self):
+        pipeline = Pipeline([LearningrateSchedulerSelector()])
+        selector = pipeline[LearningrateSchedulerSelector.get_name()]
+        selector.add_lr_scheduler("step", SchedulerStepLR)
+        name = LearningrateSchedulerSelector.get_name() + ":lr_scheduler"
+
+        cs = pipeline.get_hyperparameter_search_space()
+        self.assertEqual(list(cs.get_hyperparameter(name).choices), ["step"])
+        self.assertEqual(len(pipeline._config_space_cache), 1)
+
+        # cached spaces are copies
+        cs.seed(1)
+        sample = cs.sample_configuration()
+        cs = pipeline.get_hyperparameter_search_space()
+        self.assertIsNot(cs, pipeline._config_space_cache[next(iter(pipeline._config_space_cache))][0])
+        cs.seed(1)
+        self.assertEqual(cs.sample_configuration(), sample)
+        self.assertEqual(len(pipeline._config_space_cache), 1)
+
+        # adding and removing components
+        selector.add_lr_scheduler("exponential", SchedulerExponentialLR)
+        cs = pipeline.get_hyperparameter_search_space()
+        self.assertEqual(sorted(cs.get_hyperparameter(name).choices), ["exponential", "step"])
+        selector.remove_lr_scheduler("exponential")
+        cs = pipeline.get_hyperparameter_search_space()
+        self.assertEqual(list(cs.get_hyperparameter(name).choices), ["step"])
+
+        # replacing a component under the same name
+        selector.add_lr_scheduler("step", SchedulerExponentialLR)
+        cs = pipeline.get_hyperparameter_search_space()
+        self.assertNotIn(LearningrateSchedulerSelector.get_name() + ":step:step_size", cs.get_hyperparameter_names())
+
+        # search space updates
+        gamma = LearningrateSchedulerSelector.get_name() + ":step:gamma"
+        for value_range in [(0.85, 0.9), (0.81, 0.82)]:
+            updates = HyperparameterSearchSpaceUpdates()
+            updates.append(node_name=LearningrateSchedulerSelector.get_name(), hyperparameter="step:gamma", value_range=value_range)
+            updates.apply(pipeline, pipeline.get_pipeline_config())
+            cs = pipeline.get_hyperparameter_search_space()
+            self.assertEqual((cs.get_hyperparameter(gamma).lower, cs.get_hyperparameter(gamma).upper), value_range)
+
+        # the dataset info is part of the key
+        dataset_info = DataSetInfo()
+        dataset_info.x_shape = (10, 2)
+        num_cached = len(pipeline._config_space_cache)
+        pipeline.get_hyperparameter_search_space(dataset_info=dataset_info)
+        self.assertEqual(len(pipeline._config_space_cache), num_cached + 1)
+        dataset_info.x_shape = (10, 3)
+        pipeline.get_hyperparameter_search_space(dataset_info=dataset_info)
+        self.assertEqual(len(pipeline._config_space_cache), num_cached + 2)
+
+    def test_fingerprint(self):
+        config = {"a": [1, 2], "b": {"c": np.arange(3)}, "d": None}
+        self.assertEqual(get_fingerprint(config), get_fingerprint({"d": None, "b": {"c": np.arange(3)}, "a": [1, 2]}))
+        self.assertNotEqual(get_fingerprint(config), get_fingerprint({"a": [1, 2], "b": {"c": np.arange(4)}, "d": None}))
+        self.assertNotEqual(get_fingerprint({"a": 1}), get_fingerprint({"a": True}))
+        self.assertNotEqual(get_fingerprint({"a": [1]}), get_fingerprint({"a": (1, )}))
+
+        # recursive structures do not recurse infinitely
+        config["self"] = config
+        hash(get_fingerprint(config))
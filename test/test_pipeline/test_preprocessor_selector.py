@@ -0,0 +1,72 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import numpy as np
+from unittest import mock
+
+import autoPyTorch.pipeline.nodes.preprocessor_selector as preprocessor_selector
+from autoPyTorch.pipeline.nodes.preprocessor_selector import PreprocessorSelector, transform_in_parallel
+from autoPyTorch.components.preprocessing.preprocessor_base import PreprocessorBase
+from numpy.testing import assert_array_equal
+
+
+class ExpensivePreprocessor(PreprocessorBase):
+    fit_cost_exponent = 1
+
+    def transform(self, X):
+        return X * 2
+
+
+class TestPreprocessorSelector(unittest.TestCase):
+
+    def setUp(self):
+        self.selector = PreprocessorSelector()
+        self.preprocessor = ExpensivePreprocessor(dict())
+        self.train_indices = np.arange(0, 2000, 2)
+
+    def test_fit_indices(self):
+        Y = np.random.RandomState(1).rand(2000, 1)
+        pipeline_config = {"max_fit_samples": 100, "random_seed": 1}
+        self.assertIs(self.selector.get_fit_indices(PreprocessorBase(dict()), pipeline_config, Y, self.train_indices), self.train_indices)
+        self.assertIs(self.selector.get_fit_indices(self.preprocessor, {"max_fit_samples": -1}, Y, self.train_indices), self.train_indices)
+        self.assertIs(self.selector.get_fit_indices(self.preprocessor, {"max_fit_samples": 5000}, Y, self.train_indices), self.train_indices)
+
+        fit_indices = self.selector.get_fit_indices(self.preprocessor, pipeline_config, Y, self.train_indices)
+        self.assertEqual(len(fit_indices), 100)
+        assert_array_equal(fit_indices, np.unique(fit_indices))
+        self.assertTrue(np.all(np.isin(fit_indices, self.train_indices)))
+        assert_array_equal(fit_indices, self.selector.get_fit_indices(self.preprocessor, pipeline_config, Y, self.train_indices))
+
+        # superlinear cost: 100 ** (2 / 4) samples
+        self.preprocessor.fit_cost_exponent = 3
+        self.assertEqual(len(self.selector.get_fit_indices(self.preprocessor, pipeline_config, Y, self.train_indices)), 10)
+
+    def test_stratified_fit_indices(self):
+        labels = np.zeros(2000, dtype=int)
+        labels[1::2][:300] = 1
+        labels[1::2][300:302] = 2  # rare class with two training samples
+        labels[1::2][302:500] = 3
+        Y = np.eye(4)[labels]
+        train_indices = np.arange(1, 2000, 2)
+
+        fit_indices = self.selector.get_fit_indices(self.preprocessor, {"max_fit_samples": 100}, Y, train_indices)
+        self.assertTrue(np.all(np.isin(fit_indices, train_indices)))
+        self.assertEqual(len(fit_indices), len(np.unique(fit_indices)))
+        counts = np.bincount(labels[fit_indices], minlength=4)
+        # the class distribution is kept, every class is present
+        assert_array_equal(counts, [50, 30, 1, 19])
+
+    def test_transform_in_parallel(self):
+        X = np.random.rand(10000, 3)
+        for pipeline_config, num_threads in [({"thread_allocation": "fixed", "torch_num_threads": 3}, 3),
+                                             ({"thread_allocation": "fixed", "torch_num_threads": 1}, None)]:
+            with mock.patch.object(preprocessor_selector, "ThreadPoolExecutor", wraps=preprocessor_selector.ThreadPoolExecutor) as executor:
+                X_transformed = self.selector.predict(pipeline_config=pipeline_config, preprocessor=self.preprocessor, X=X)['X']
+            assert_array_equal(X_transformed, X * 2)
+            if num_threads is None:
+                executor.assert_not_called()
+            else:
+                executor.assert_called_once_with(max_workers=num_threads)
+        assert_array_equal(transform_in_parallel(lambda chunk: chunk + 1, X, chunk_rows=100, n_jobs=4), X + 1)
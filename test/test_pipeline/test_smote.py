@@ -0,0 +1,97 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import shutil
+import tempfile
+import numpy as np
+import pynisher
+import sklearn.neighbors
+from unittest import mock
+
+import autoPyTorch.components.preprocessing.resampling.smote as smote
+from autoPyTorch.components.preprocessing.resampling.smote import SMOTE, NeighborsCache, compute_neighbors
+from autoPyTorch.pipeline.nodes.resampling_strategy_selector import ResamplingStrategySelector
+from autoPyTorch.components.preprocessing.resampling import TargetSizeStrategyUpsample
+from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
+from numpy.testing import assert_array_equal
+
+
+class TestSMOTE(unittest.TestCase):
+
+    def setUp(self):
+        random = np.random.RandomState(1)
+        self.X = random.rand(200, 4)
+        self.y = np.array([0] * 180 + [1] * 20)
+        self.cache_patch = mock.patch.object(smote, "neighbors_cache", NeighborsCache())
+        self.cache_patch.start()
+
+    def tearDown(self):
+        self.cache_patch.stop()
+
+    def test_exact_neighbors(self):
+        for k_neighbors in [1, 5]:
+            expected = sklearn.neighbors.NearestNeighbors(n_neighbors=k_neighbors + 1).fit(self.X).kneighbors(self.X, return_distance=False)
+            assert_array_equal(compute_neighbors(self.X, k_neighbors, n_jobs=1), expected[:, 1:])
+
+    def test_synthetic_samples_on_segments(self):
+        X_resampled, y_resampled = SMOTE({"k_neighbors": 3}).resample(self.X, self.y, {1: 180}, seed=1)
+        self.assertEqual(X_resampled.shape, (360, 4))
+        assert_array_equal(np.bincount(y_resampled), [180, 180])
+        assert_array_equal(X_resampled[:200], self.X)
+
+        # every synthetic sample lies on the segment between a sample of the class and one of its neighbours
+        X_class = self.X[self.y == 1]
+        neighbors = compute_neighbors(X_class, 3)
+        start = X_class[np.repeat(np.arange(20), 3)]
+        direction = X_class[neighbors.reshape(-1)] - start
+        for sample in X_resampled[200:]:
+            step = np.sum((sample - start) * direction, axis=1) / np.sum(direction ** 2, axis=1)
+            distance = np.linalg.norm(start + np.clip(step, 0, 1)[:, np.newaxis] * direction - sample, axis=1)
+            self.assertLess(np.min(distance), 1e-9)
+
+    def test_cache_across_k_neighbors(self):
+        with mock.patch.object(smote, "compute_neighbors", wraps=compute_neighbors) as compute:
+            results = [SMOTE({"k_neighbors": k}).resample(self.X, self.y, {1: 100}, seed=1) for k in [3, 7, 5, 3]]
+            self.assertEqual(compute.call_count, 1)
+            assert_array_equal(results[0][0], results[3][0])
+
+            # more neighbours than cached
+            SMOTE({"k_neighbors": 15}).resample(self.X, self.y, {1: 100}, seed=1)
+            self.assertEqual(compute.call_count, 2)
+            SMOTE({"k_neighbors": 12}).resample(self.X, self.y, {1: 100}, seed=1)
+            self.assertEqual(compute.call_count, 2)
+
+    def test_cache_across_processes(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        resampler = SMOTE({"k_neighbors": 3})
+        resampler.cache_dir = directory
+
+        # the neighbours computed in an evaluation with pynisher are reused by later evaluations in other processes
+        limited_resample = pynisher.enforce_limits(mem_in_mb=None)(resampler.resample)
+        X_resampled, _ = limited_resample(self.X, self.y, {1: 100}, 1)
+        self.assertEqual(limited_resample.exit_status, 0)
+        self.assertEqual(len(smote.neighbors_cache.neighbors), 0)
+
+        with mock.patch.object(smote, "compute_neighbors", side_effect=AssertionError("The neighbours have been computed again")):
+            assert_array_equal(resampler.resample(self.X, self.y, {1: 100}, seed=1)[0], X_resampled)
+
+    def test_num_threads(self):
+        resampler_node = ResamplingStrategySelector()
+        resampler_node.add_over_sampling_method("smote", SMOTE)
+        resampler_node.add_target_size_strategy("up", TargetSizeStrategyUpsample)
+        hyperparameter_config = {
+            ResamplingStrategySelector.get_name() + ConfigWrapper.delimiter + "over_sampling_method": "smote",
+            ResamplingStrategySelector.get_name() + ConfigWrapper.delimiter + "under_sampling_method": "none",
+            ResamplingStrategySelector.get_name() + ConfigWrapper.delimiter + "target_size_strategy": "up",
+            ResamplingStrategySelector.get_name() + ConfigWrapper.delimiter + "smote" + ConfigWrapper.delimiter + "k_neighbors": 3,
+        }
+        pipeline_config = {"random_seed": 1, "thread_allocation": "fixed", "torch_num_threads": 2}
+
+        with mock.patch.object(sklearn.neighbors, "NearestNeighbors", wraps=sklearn.neighbors.NearestNeighbors) as nearest_neighbors:
+            result = resampler_node.fit(pipeline_config=pipeline_config, hyperparameter_config=hyperparameter_config,
+                X=self.X, Y=np.eye(2)[self.y], train_indices=np.arange(200), valid_indices=None)
+        self.assertEqual(result['X'].shape, (360, 4))
+        self.assertEqual(nearest_neighbors.call_args[1]["n_jobs"], 2)
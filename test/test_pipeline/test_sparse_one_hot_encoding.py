@@ -0,0 +1,82 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import numpy as np
+import scipy.sparse
+from unittest import mock
+
+from autoPyTorch.pipeline.base.pipeline import Pipeline
+from autoPyTorch.pipeline.nodes.one_hot_encoding import OneHotEncoding
+from autoPyTorch.pipeline.nodes.preprocessor_selector import PreprocessorSelector
+from autoPyTorch.pipeline.nodes.create_dataset_info import DataSetInfo
+from autoPyTorch.components.preprocessing.feature_preprocessing.fast_ica import FastICA
+from autoPyTorch.components.preprocessing.feature_preprocessing.power_transformer import PowerTransformer
+from autoPyTorch.utils.configspace_wrapper import ConfigWrapper
+from numpy.testing import assert_array_equal, assert_allclose
+
+
+class TestSparseOneHotEncoding(unittest.TestCase):
+
+    def setUp(self):
+        random = np.random.RandomState(1)
+        self.X = np.c_[random.randint(0, 30, 200), random.rand(200), random.randint(0, 3, 200)].astype(float)
+        self.X_test = np.r_[self.X[:5], [[99, 0.5, 7]]]  # unknown categories
+        self.categorical_features = [True, False, True]
+
+    def encode(self, sparse_one_hot_threshold):
+        dataset_info = DataSetInfo()
+        dataset_info.categorical_features = list(self.categorical_features)
+        encoding = OneHotEncoding()
+        result = encoding.fit(pipeline_config={"sparse_one_hot_threshold": sparse_one_hot_threshold}, X=self.X, Y=np.zeros(200),
+            dataset_info=dataset_info)
+        X_test = encoding.predict(pipeline_config={"categorical_features": self.categorical_features}, X=self.X_test,
+            one_hot_encoder=result['one_hot_encoder'])['X']
+        return result['X'], X_test
+
+    def test_sparse_threshold(self):
+        # 33 categories: sparse if the threshold is below
+        dense_X, dense_X_test = self.encode(-1)
+        self.assertFalse(scipy.sparse.issparse(dense_X))
+        self.assertFalse(scipy.sparse.issparse(self.encode(33)[0]))
+
+        sparse_X, sparse_X_test = self.encode(32)
+        self.assertTrue(scipy.sparse.isspmatrix_csr(sparse_X))
+        self.assertTrue(scipy.sparse.isspmatrix_csr(sparse_X_test))
+        self.assertEqual(sparse_X.shape, (200, 34))
+        assert_array_equal(sparse_X.toarray(), dense_X)
+        assert_array_equal(sparse_X_test.toarray(), dense_X_test)
+        self.assertEqual(sparse_X_test[5].sum(), 0.5)  # unknown categories are all-zero
+
+    def test_dense_preprocessors(self):
+        dense_X, dense_X_test = self.encode(-1)
+        sparse_X, sparse_X_test = self.encode(0)
+        train_indices = np.arange(200)
+        Y = np.zeros((200, 1))
+
+        for name, preprocessor_type, config in [
+                ("power_transformer", PowerTransformer, {"standardize": True}),
+                ("fast_ica", FastICA, {"algorithm": "parallel", "whiten": False, "fun": "logcosh"})]:
+            selector = PreprocessorSelector()
+            selector.add_preprocessor(name, preprocessor_type)
+            hyperparameter_config = {PreprocessorSelector.get_name() + ConfigWrapper.delimiter + "preprocessor": name}
+            hyperparameter_config.update({PreprocessorSelector.get_name() + ConfigWrapper.delimiter + name + ConfigWrapper.delimiter + k: v
+                for k, v in config.items()})
+
+            results = []
+            for X, X_test in [(dense_X, dense_X_test), (sparse_X, sparse_X_test)]:
+                with mock.patch.object(preprocessor_type, "fit", autospec=True, side_effect=preprocessor_type.fit) as fit:
+                    result = selector.fit(hyperparameter_config=hyperparameter_config, pipeline_config={"max_fit_samples": -1},
+                        X=X, Y=Y, train_indices=train_indices, one_hot_encoder=None)
+                # the preprocessor gets dense data
+                self.assertIsInstance(fit.call_args[0][1], np.ndarray)
+                X_predicted = selector.predict(pipeline_config=dict(), preprocessor=result['preprocessor'], X=X_test)['X']
+                self.assertFalse(scipy.sparse.issparse(result['X']))
+                self.assertFalse(scipy.sparse.issparse(X_predicted))
+                results.append((result['X'], X_predicted))
+
+            if preprocessor_type is PowerTransformer:
+                # deterministic: the sparse path matches the dense path
+                assert_allclose(results[1][0], results[0][0])
+                assert_allclose(results[1][1], results[0][1])
@@ -0,0 +1,90 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import time
+import numpy as np
+
+import torch
+import torch.nn as nn
+from torch.optim.lr_scheduler import StepLR
+from torch.utils.data import DataLoader, TensorDataset
+
+from autoPyTorch.pipeline.nodes.train_node import TrainNode
+from autoPyTorch.pipeline.nodes.metric_selector import AutoNetMetric
+from autoPyTorch.components.networks.base_net import BaseNet
+from autoPyTorch.components.training.budget_types import BudgetTypeEpochs, BudgetTypeDataFraction
+from autoPyTorch.components.training.lr_scheduling import LrScheduling
+
+
+class OutOfMemoryNet(BaseNet):
+    """Network that runs out of memory in the first forward pass with a batch size larger than max_batch_size."""
+
+    def __init__(self, max_batch_size):
+        super(OutOfMemoryNet, self).__init__(config=dict(), in_features=3, out_features=1, final_activation=None)
+        self.layers = nn.Linear(3, 1)
+        self.max_batch_size = max_batch_size
+        self.batch_sizes = list()
+
+    def forward(self, x):
+        self.batch_sizes.append(x.shape[0])
+        if x.shape[0] > self.max_batch_size:
+            raise RuntimeError("CUDA out of memory. Tried to allocate 2.00 GiB")
+        return super(OutOfMemoryNet, self).forward(x)
+
+
+class TestTrainNode(unittest.TestCase):
+
+    def fit(self, network, pipeline_config, train_node=None, budget=2, training_techniques=None, hyperparameter_config=None):
+        hyperparameter_config = dict({"NetworkSelector:use_swa": False, "NetworkSelector:use_lookahead": False, "NetworkSelector:use_se": False,
+            "TrainNode:batch_loss_computation_technique": "standard", "TrainNode:use_adversarial_training": False}, **(hyperparameter_config or dict()))
+        pipeline_config = dict({"thread_allocation": "fixed", "torch_num_threads": 0, "cuda": False, "full_eval_each_epoch": False,
+            "stream_learning_curves": False, "best_over_epochs": False}, **pipeline_config)
+        train_loader = DataLoader(TensorDataset(torch.rand(64, 3), torch.rand(64, 1)), batch_size=32)
+        metric = AutoNetMetric(name="mean", metric=lambda y_true, y_pred: float(np.mean(y_pred)), loss_transform=lambda x: x,
+            ohe_transform=lambda x: x)
+        optimizer = torch.optim.SGD(network.parameters(), lr=0.01)
+        if training_techniques is None:
+            training_techniques = [BudgetTypeEpochs()]
+        if hyperparameter_config["NetworkSelector:use_se"]:
+            lr_scheduler = StepLR(optimizer, step_size=10)
+            lr_scheduler.snapshot_before_restart = False
+            training_techniques = training_techniques + [LrScheduling(training_components={"lr_scheduler": lr_scheduler},
+                lr_step_after_batch=False, lr_step_with_time=False, allow_snapshot=True)]
+        return (train_node or TrainNode()).fit(hyperparameter_config=hyperparameter_config, pipeline_config=pipeline_config,
+            train_loader=train_loader, valid_loader=None, network=network, optimizer=optimizer,
+            optimize_metric=metric, additional_metrics=[], log_functions=[], budget=budget, loss_function=nn.MSELoss(),
+            training_techniques=training_techniques, fit_start_time=time.time(), refit=False)
+
+    def test_out_of_memory_backoff(self):
+        network = OutOfMemoryNet(max_batch_size=16)
+        result = self.fit(network, {"oom_batch_size_backoffs": 3})
+
+        # the first batch runs out of memory, training continues with half the batch size
+        self.assertEqual(network.batch_sizes[:2], [32, 16])
+        self.assertEqual(set(network.batch_sizes[1:]), {16})
+        self.assertEqual(result["info"]["effective_batch_size"], 16)
+
+        # the failed epoch is repeated, all following epochs process all 64 samples
+        self.assertEqual(len(network.batch_sizes) - 1, 4 * (network.epochs_trained + 1))
+
+    def test_out_of_memory_without_backoff(self):
+        network = OutOfMemoryNet(max_batch_size=16)
+        with self.assertRaises(RuntimeError):
+            self.fit(network, {"oom_batch_size_backoffs": 0})
+
+        # other errors are not retried
+        network = OutOfMemoryNet(max_batch_size=16)
+        network.forward = lambda x: (_ for _ in ()).throw(RuntimeError("size mismatch"))
+        with self.assertRaises(RuntimeError):
+            self.fit(network, {"oom_batch_size_backoffs": 3})
+
+    def test_snapshot_ensemble_with_data_fraction_budget(self):
+        # with budget type data_fraction, the snapshots are taken in the last quarter of data_fraction_max_epochs
+        train_node = TrainNode()
+        network = OutOfMemoryNet(max_batch_size=64)
+        self.fit(network, {"oom_batch_size_backoffs": 0, "data_fraction_max_epochs": 8}, train_node=train_node, budget=0.5,
+            training_techniques=[BudgetTypeDataFraction()], hyperparameter_config={"NetworkSelector:use_se": True, "NetworkSelector:se_lastk": 5})
+        self.assertEqual(network.epochs_trained, 8)
+        self.assertEqual(len(train_node.ensemble_models), 4)
@@ -0,0 +1,44 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import unittest.mock
+
+from autoPyTorch.core.worker import AutoNetWorker
+from autoPyTorch.pipeline.nodes.create_dataset_info import DataSetInfo
+from autoPyTorch.components.training.budget_types import BudgetTypeEpochs
+
+
+class TestCostModel(unittest.TestCase):
+
+    def test_worker_calibrates_memory_with_cross_validation(self):
+        pipeline = unittest.mock.Mock()
+        # cross validation reports the info of each split
+        pipeline.fit_pipeline.return_value = {"loss": 0.5, "info": [{"loss": 0.4}, {"loss": 0.6}]}
+
+        dataset_info = DataSetInfo()
+        dataset_info.x_shape = (1000, 10)
+        dataset_info.y_shape = (1000, 1)
+        pipeline_config = {"use_cost_model": True, "memory_limit_mb": 300, "budget_type": "epochs"}
+
+        worker = AutoNetWorker(pipeline=pipeline, pipeline_config=pipeline_config, X_train=None, Y_train=None, X_valid=None, Y_valid=None,
+            dataset_info=dataset_info, budget_type=BudgetTypeEpochs, max_budget=10, shutdownables=[], use_pynisher=False, run_id="0")
+        config = {"CreateDataLoader:batch_size": 64}
+
+        # the memory limit is below the prior, but configurations are not rejected before the model is calibrated
+        self.assertGreater(worker.cost_model.predict_memory(config), pipeline_config["memory_limit_mb"])
+        with unittest.mock.patch("autoPyTorch.core.worker.get_peak_memory_mb", return_value=100):
+            for i in range(worker.cost_model.min_observations):
+                result = worker.compute(config=config, budget=1, working_directory=".", config_id=(0, 0, i))
+                self.assertEqual(result["peak_memory_mb"], 100)
+
+        self.assertEqual(len(worker.cost_model.memory_observations), worker.cost_model.min_observations)
+        self.assertTrue(worker.cost_model.is_memory_calibrated())
+        self.assertAlmostEqual(worker.cost_model.predict_memory(config), 100)
+
+        # a calibrated model rejects configurations exceeding the limit
+        pipeline_config["memory_limit_mb"] = 50
+        with self.assertRaises(Exception):
+            worker.compute(config=config, budget=1, working_directory=".", config_id=(0, 0, 5))
+        self.assertEqual(pipeline.fit_pipeline.call_count, worker.cost_model.min_observations)
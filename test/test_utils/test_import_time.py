@@ -0,0 +1,31 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import unittest
+import os
+import subprocess
+import sys
+import json
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_import_time(self):
+        # the import time itself depends on the machine. Check that the heavy dependencies are imported lazily instead.
+        script = ("import sys, json; import autoPyTorch, autoPyTorch.pipeline.nodes, autoPyTorch.components.networks.feature; "
+                  "print(json.dumps(sorted(sys.modules)))")
+        repo = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([repo, os.environ.get("PYTHONPATH", "")]))
+        output = subprocess.check_output([sys.executable, "-c", script], env=env)
+        modules = json.loads(output.decode().strip().splitlines()[-1])
+
+        for heavy_dependency in ["torch", "torchvision", "sklearn", "hpbandster", "Pyro4", "netifaces", "ConfigSpace", "pandas", "scipy"]:
+            self.assertNotIn(heavy_dependency, modules)
+
+        # attributes are still available
+        import autoPyTorch
+        self.assertIn("AutoNetClassification", dir(autoPyTorch))
+        self.assertEqual(autoPyTorch.AutoNetClassification.__name__, "AutoNetClassification")
+        with self.assertRaises(AttributeError):
+            autoPyTorch.DoesNotExist
@@ -0,0 +1,48 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from autoPyTorch.utils.learning_curves import report_epoch, LearningCurveReader, LEARNING_CURVES_FILE
+
+
+class TestLearningCurves(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_incremental_read(self):
+        reader = LearningCurveReader(self.directory)
+        self.assertEqual(reader.update(), [])
+
+        # the log contains a value per epoch
+        report_epoch(self.directory, (0, 0, 1), 3.0, 0, 1, {"loss": [0.5], "val_accuracy": [0.7], "lr_scheduler_converged": False,
+            "predictions": np.zeros(3)})
+        new_epochs = reader.update()
+        self.assertEqual(len(new_epochs), 1)
+        self.assertEqual(new_epochs[0][:4], ((0, 0, 1), 3.0, 0, 1))
+        self.assertEqual(new_epochs[0][5], {"loss": 0.5, "val_accuracy": 0.7})
+
+        # only new lines are read, a line that is still being written is read once complete
+        report_epoch(self.directory, (0, 0, 1), 3.0, 0, 2, {"loss": [0.5, 0.4], "näme": 1})
+        report_epoch(self.directory, (0, 0, 2), 3.0, 0, 1, {"loss": [float("nan")]})
+        with open(os.path.join(self.directory, LEARNING_CURVES_FILE), "a") as f:
+            f.write('[[0, 0, 1], 3.0, 0, 3, 0.0, {"lo')
+        new_epochs = reader.update()
+        self.assertEqual([(e[0], e[3]) for e in new_epochs], [((0, 0, 1), 2), ((0, 0, 2), 1)])
+        self.assertTrue(np.isnan(new_epochs[1][5]["loss"]))
+
+        with open(os.path.join(self.directory, LEARNING_CURVES_FILE), "a") as f:
+            f.write('ss": 0.3}]\n')
+        self.assertEqual([e[3] for e in reader.update()], [3])
+        self.assertEqual(reader.update(), [])
+        self.assertEqual([metrics["loss"] for _, _, metrics in reader.get_learning_curve((0, 0, 1), 3.0)], [0.5, 0.4, 0.3])
+        self.assertEqual(reader.get_learning_curve((0, 0, 1), 9.0), [])
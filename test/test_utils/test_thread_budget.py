@@ -0,0 +1,95 @@
+__author__ = "Max Dippel, Michael Burkart and Matthias Urban"
+__version__ = "0.0.1"
+__license__ = "BSD"
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+import functools
+
+from autoPyTorch.pipeline.nodes.train_node import TrainNode
+import autoPyTorch.utils.thread_budget as thread_budget_module
+from autoPyTorch.utils.thread_budget import ThreadBudgetManager, get_num_threads
+
+
+class TestThreadBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.registry_file = os.path.join(self.tmp_dir, "registry.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def read_registry(self):
+        with open(self.registry_file, "r") as f:
+            return json.load(f)
+
+    def test_allocation(self):
+        manager = ThreadBudgetManager(num_cores=10, registry_file=self.registry_file)
+        self.assertEqual(manager.compute_allocation({"1": 1}), {"1": (10, 2)})
+        self.assertEqual(manager.compute_allocation({"1": 1, "2": 1}), {"1": (5, 1), "2": (5, 1)})
+
+        # proportional to the weight, all cores used, at least one thread per job
+        allocation = manager.compute_allocation({"1": 1, "2": 2, "3": 4})
+        self.assertEqual(sum(intra for intra, _ in allocation.values()), 10)
+        self.assertEqual([allocation[pid][0] for pid in "123"], [1, 3, 6])
+        allocation = manager.compute_allocation({"1": 1000, "2": 1})
+        self.assertEqual(allocation["2"], (1, 1))
+
+    def test_register_and_release(self):
+        manager = ThreadBudgetManager(num_cores=8, registry_file=self.registry_file)
+        self.assertEqual(manager.register(), (8, 2))
+        self.assertIn(manager.pid, self.read_registry())
+
+        # another running process joins and gets half of the cores
+        with open(self.registry_file, "w") as f:
+            json.dump({manager.pid: 1, str(os.getppid()): 1}, f)
+        self.assertEqual(manager.get_allocation(), (4, 1))
+
+        manager.unregister()
+        self.assertNotIn(manager.pid, self.read_registry())
+        self.assertIn(str(os.getppid()), self.read_registry())
+
+    def test_dead_processes_are_dropped(self):
+        manager = ThreadBudgetManager(num_cores=8, registry_file=self.registry_file)
+        with open(self.registry_file, "w") as f:
+            json.dump({"999999999": 1}, f)
+        self.assertEqual(manager.register(), (8, 2))
+        self.assertEqual(list(self.read_registry().keys()), [manager.pid])
+
+    def test_release_on_failure(self):
+        pipeline_config = {"thread_allocation": "uniform", "thread_allocation_cores": 4}
+        node = TrainNode()
+        registry_file = self.registry_file
+
+        def manager(num_cores):
+            return ThreadBudgetManager(num_cores=num_cores, registry_file=registry_file)
+
+        with unittest.mock.patch("autoPyTorch.pipeline.nodes.train_node.ThreadBudgetManager", side_effect=manager), \
+                unittest.mock.patch.object(TrainNode, "train", side_effect=RuntimeError("CUDA out of memory")):
+            with self.assertRaises(RuntimeError):
+                node.fit(hyperparameter_config=dict(), pipeline_config=pipeline_config, train_loader=None, valid_loader=None,
+                    network=None, optimizer=None, optimize_metric=None, additional_metrics=[], log_functions=[], budget=1,
+                    loss_function=None, training_techniques=[], fit_start_time=0, refit=False)
+        self.assertEqual(self.read_registry(), dict())
+
+    def test_num_threads(self):
+        self.assertEqual(get_num_threads({"thread_allocation": "fixed", "torch_num_threads": 3}), 3)
+        self.assertIsNone(get_num_threads({"thread_allocation": "fixed", "torch_num_threads": -1}))
+
+        thread_budget = functools.partial(ThreadBudgetManager, registry_file=self.registry_file)
+        with unittest.mock.patch.object(thread_budget_module, "ThreadBudgetManager", thread_budget):
+            pipeline_config = {"thread_allocation": "uniform", "thread_allocation_cores": 6}
+            self.assertEqual(get_num_threads(pipeline_config), 6)
+
+            # another process trains
+            other = thread_budget(num_cores=6)
+            other.pid = str(os.getppid())
+            other.register()
+            self.assertEqual(get_num_threads(pipeline_config), 3)
+            # nothing is registered for the current process
+            self.assertEqual(set(self.read_registry()), {other.pid})